@@ -2,7 +2,6 @@ from .networks import (
     random_network,
     single_strand,
     single_spring,
-    ISV_network,
     regular,
     random_directed_network,
     laminin,
@@ -11,4 +10,15 @@ from .networks import (
     two_crosslinked_strands,
     triangle_grid,
 )
-from .network import Network, rotate_network
+from .network import (
+    Network,
+    rotate_network,
+    transform_network,
+    transform_networks,
+    wrap_network,
+    compose,
+    translation_matrix,
+    rotation_matrix,
+    scaling_matrix,
+    shear_matrix,
+)
@@ -0,0 +1,178 @@
+import numpy as np
+import numpy.typing as npt
+from typing import Dict, Iterable, List, Optional, Tuple
+from scipy.sparse.csgraph import connected_components as _connected_components
+
+from .network import Network, BONDTYPE, is_crosslink_type
+
+
+def _selected_bonds(network: Network, bond_types: Optional[Iterable[BONDTYPE]]):
+    return network.bonds_array()[network._bond_selection(bond_types)]
+
+
+def bond_vectors(
+    network: Network, bond_types: Optional[Iterable[BONDTYPE]] = None
+) -> npt.NDArray[np.float64]:
+    """Returns the (M, 2) vectors pointing from the first to the second bead of every selected bond."""
+    pos = network.positions_array()
+    bonds = _selected_bonds(network, bond_types)
+    return (pos[bonds[:, 1], :2] - pos[bonds[:, 0], :2]).astype(np.float64)
+
+
+def bond_lengths(
+    network: Network, bond_types: Optional[Iterable[BONDTYPE]] = None
+) -> npt.NDArray[np.float64]:
+    """Returns the lengths of all bonds with one of the given types (all bonds if None)."""
+    return np.linalg.norm(bond_vectors(network, bond_types), axis=1)
+
+
+def bond_length_histograms(
+    network: Network, bins: int = 20, range: Optional[Tuple[float, float]] = None
+) -> Tuple[npt.NDArray[np.float64], Dict[BONDTYPE, npt.NDArray[np.int64]]]:
+    """
+    Histograms the bond lengths of every bond type with shared bin edges.
+
+    Returns:
+        The bin edges and a dictionary mapping each bond type to its counts.
+    """
+    lengths = bond_lengths(network)
+    types, codes = np.unique(np.array(network.bonds_types, dtype=str), return_inverse=True)
+    if range is None:
+        range = (0.0, float(lengths.max())) if len(lengths) else (0.0, 1.0)
+    edges = np.linspace(range[0], range[1], bins + 1)
+    which = np.clip(np.searchsorted(edges, lengths, side="right") - 1, 0, bins - 1)
+    inside = (lengths >= range[0]) & (lengths <= range[1])
+    counts = np.bincount(
+        codes[inside] * bins + which[inside], minlength=len(types) * bins
+    ).reshape(len(types), bins)
+    return edges, {typ: counts[k] for k, typ in enumerate(types)}
+
+
+def crosslink_mask(network: Network) -> npt.NDArray[np.bool_]:
+    """Returns a boolean array marking which bonds are crosslinkers."""
+    if len(network.bonds_types) == 0:
+        return np.zeros(0, dtype=bool)
+    types, codes = np.unique(np.array(network.bonds_types, dtype=str), return_inverse=True)
+    return np.array([is_crosslink_type(typ) for typ in types])[codes]
+
+
+def crosslink_density(network: Network) -> float:
+    """Number of crosslinkers per unit area of the domain."""
+    area = network.domain.sizex * network.domain.sizey
+    return float(np.count_nonzero(crosslink_mask(network))) / area
+
+
+def fiber_orientations(
+    network: Network, bond_types: Iterable[BONDTYPE] = ("polymer",)
+) -> npt.NDArray[np.float64]:
+    """Returns the orientation of each fiber segment as an angle in [0, pi)."""
+    v = bond_vectors(network, bond_types)
+    return np.mod(np.arctan2(v[:, 1], v[:, 0]), np.pi)
+
+
+def orientation_distribution(
+    network: Network, bins: int = 36, bond_types: Iterable[BONDTYPE] = ("polymer",)
+) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Segment-length weighted distribution of fiber orientations on [0, pi).
+
+    Returns:
+        The bin edges and the probability density in each bin.
+    """
+    v = bond_vectors(network, bond_types)
+    theta = np.mod(np.arctan2(v[:, 1], v[:, 0]), np.pi)
+    density, edges = np.histogram(
+        theta, bins=bins, range=(0.0, np.pi), weights=np.linalg.norm(v, axis=1), density=True
+    )
+    return edges, density
+
+
+def nematic_order_per_bin(
+    network: Network,
+    bin_size: float,
+    bond_types: Iterable[BONDTYPE] = ("polymer",),
+) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Computes the local nematic order on the same grid as FiberBin (int(size / bin_size) bins in each
+    direction). Each segment contributes to the bin of its midpoint, weighted by its length.
+
+    Returns:
+        The scalar order parameter S in [0, 1] and the director angle in [0, pi), both as arrays of
+        shape (num_bins_y, num_bins_x). Empty bins are NaN.
+    """
+    num_bins_x = int(network.domain.sizex / bin_size)
+    num_bins_y = int(network.domain.sizey / bin_size)
+
+    pos = network.positions_array()
+    bonds = _selected_bonds(network, bond_types)
+    v = (pos[bonds[:, 1], :2] - pos[bonds[:, 0], :2]).astype(np.float64)
+    mid = 0.5 * (pos[bonds[:, 1], :2] + pos[bonds[:, 0], :2])
+
+    nx = np.floor(mid[:, 0] / bin_size).astype(np.int64)
+    ny = np.floor(mid[:, 1] / bin_size).astype(np.int64)
+    inside = (nx >= 0) & (ny >= 0) & (nx < num_bins_x) & (ny < num_bins_y)
+    flat = ny[inside] * num_bins_x + nx[inside]
+    v = v[inside]
+
+    length = np.linalg.norm(v, axis=1)
+    theta = np.arctan2(v[:, 1], v[:, 0])
+    size = num_bins_x * num_bins_y
+    weight = np.bincount(flat, weights=length, minlength=size)
+    qxx = np.bincount(flat, weights=length * np.cos(2 * theta), minlength=size)
+    qxy = np.bincount(flat, weights=length * np.sin(2 * theta), minlength=size)
+
+    Q = np.empty((size, 2, 2))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        Q[:, 0, 0] = qxx / weight
+        Q[:, 0, 1] = Q[:, 1, 0] = qxy / weight
+    Q[:, 1, 1] = -Q[:, 0, 0]
+
+    empty = weight == 0
+    Q[empty] = 0.0
+    eigenvalues, eigenvectors = np.linalg.eigh(Q)
+    order = eigenvalues[:, -1]
+    director = np.mod(np.arctan2(eigenvectors[:, 1, -1], eigenvectors[:, 0, -1]), np.pi)
+    order[empty] = np.nan
+    director[empty] = np.nan
+
+    return (
+        order.reshape(num_bins_y, num_bins_x),
+        director.reshape(num_bins_y, num_bins_x),
+    )
+
+
+def connected_components(
+    network: Network, bond_types: Optional[Iterable[BONDTYPE]] = None
+) -> Tuple[int, npt.NDArray[np.int32]]:
+    """Returns the number of connected components and the component label of every bead."""
+    return _connected_components(network.adjacency(bond_types), directed=False)
+
+
+def summarize(network: Network) -> Dict[str, float]:
+    """Scalar summary of a network."""
+    n_components, labels = connected_components(network)
+    sizes = np.bincount(labels) if len(labels) else np.zeros(1, dtype=np.int64)
+    polymer_lengths = bond_lengths(network, ("polymer",))
+    theta = fiber_orientations(network)
+    return {
+        "number_of_beads": float(len(network.beads_positions)),
+        "number_of_bonds": float(len(network.bonds_groups)),
+        "number_of_crosslinks": float(np.count_nonzero(crosslink_mask(network))),
+        "crosslink_density": crosslink_density(network),
+        "mean_polymer_bond_length": (
+            float(polymer_lengths.mean()) if len(polymer_lengths) else np.nan
+        ),
+        "global_nematic_order": (
+            float(np.abs(np.mean(np.exp(2j * theta)))) if len(theta) else np.nan
+        ),
+        "number_of_components": float(n_components),
+        "largest_component_fraction": float(sizes.max() / max(len(labels), 1)),
+    }
+
+
+def summarize_ensemble(networks: Iterable[Network]) -> Dict[str, npt.NDArray[np.float64]]:
+    """Applies 'summarize' to every network and stacks the results into one array per quantity."""
+    summaries: List[Dict[str, float]] = [summarize(network) for network in networks]
+    if not summaries:
+        return {}
+    return {key: np.array([s[key] for s in summaries]) for key in summaries[0]}
@@ -2,8 +2,7 @@ import numpy as np
 import math
 import operator
 import copy
-from scipy.stats import binned_statistic_2d
-from itertools import product
+from . import kernels
 
 
 class FiberBin:
@@ -20,6 +19,8 @@ class FiberBin:
         offset_x=0,
         offset_y=0,
         precision=8,
+        backend=None,
+        chunk_size=100_000,
     ):
         self.num_bins_x = num_bins_x
         self.num_bins_y = num_bins_y
@@ -32,6 +33,8 @@ class FiberBin:
         self.precision = precision
         self.num_beads = beads
         self.num_strands = strands
+        self.backend = backend
+        self.chunk_size = chunk_size
         # initialize default coordinate conversion
         self.set_coord_to_bin()
 
@@ -77,36 +80,20 @@ class FiberBin:
             raise ValueError
         return nx, ny
 
-    def _interpolate_beads(self, pos, interpolation_number):
-        inter = np.zeros(
-            (interpolation_number * self.num_strands * (self.num_beads - 1), 2)
-        )
-        t = np.linspace(0, 1, interpolation_number, endpoint=False)
-        for strand in range(self.num_strands):
-            for k in range(self.num_beads)[:-1]:
-                bondid = strand * (self.num_beads - 1) + k
-                beadid = strand * self.num_beads + k
-                P = pos[beadid]
-                Q = pos[beadid + 1]
-                inter[
-                    bondid * interpolation_number : (bondid + 1) * interpolation_number,
-                    0,
-                ] = P[0] + t * (Q[0] - P[0])
-                inter[
-                    bondid * interpolation_number : (bondid + 1) * interpolation_number,
-                    1,
-                ] = P[1] + t * (Q[1] - P[1])
-        return inter
+    def _segment_ends(self, bonds_group, pos):
+        bonds = np.asarray(bonds_group, dtype=np.int64).reshape(-1, 2)
+        return pos[bonds[:, 0], :2], pos[bonds[:, 1], :2]
 
     def bin_network(self, bonds_group, pos):
-        # bins the network
+        # bins the bonds in bonds_group, the bins hold indices into bonds_group
 
         # initialize / clear the bins
         self.initialize_bins()
         N = 100
-        inter = self._interpolate_beads(pos, N)
-        X_inter = inter[:, 0]
-        Y_inter = inter[:, 1]
+        pos = np.asarray(pos, dtype=np.float64)
+        P, Q = self._segment_ends(bonds_group, pos)
+        num_bonds = len(P)
+        t = np.linspace(0, 1, N, endpoint=False)
         bin_x = np.linspace(
             0.0 - self.offset_x, self.sizex - self.offset_x, self.num_bins_x
         )
@@ -115,32 +102,51 @@ class FiberBin:
         )
         num_bin_x = len(bin_x) - 1
         num_bin_y = len(bin_y) - 1
-        binning_range = np.array(
-            [
-                [0.0 - self.offset_x, self.sizex - self.offset_x],
-                [0.0 - self.offset_y, self.sizey - self.offset_y],
-            ]
-        )
-        counts, x_edge, y_edge, binnumber = binned_statistic_2d(
-            X_inter,
-            Y_inter,
-            values=[],
-            statistic="count",
-            bins=[bin_x, bin_y],
-            expand_binnumbers=True,
-            range=binning_range,
-        )
-        self.counts = counts
-        for k, [nx, ny] in enumerate(binnumber.T):
-            if nx >= self.num_bins_x or ny >= self.num_bins_y:
-                self.parent_bin[ny - 1][nx - 1] = []
-                continue
-            #            if nx == self.num_bins_x or ny == self.num_bins_y:
-            #                continue
-            #            self.density_bin[ny-1][nx-1] = counts[nx-1][ny-1]
-            #            self.parent_bin[ny-1][nx-1].append(k// N)
-            parent_bin_set = set(self.parent_bin[ny - 1][nx - 1])
-            parent_bin_set.add(k // N)
-            self.parent_bin[ny - 1][nx - 1] = list(parent_bin_set)
-        for nx, ny in product(range(self.num_bins_x), range(self.num_bins_y)):
-            self.density_bin[ny][nx] = len(self.parent_bin[ny][nx])
+        nbins = self.num_bins_x * self.num_bins_y
+
+        # Every interpolation point k (of bond k // N) that falls in a bin adds the bond to
+        # parent_bin[ny - 1][nx - 1], every point outside the binning range clears that entry
+        # (negative indices wrap around). So a bin ends up with the bonds that have a point in
+        # it after the last point that cleared it.
+        last_clear = np.full(nbins, -1, dtype=np.int64)
+        counts = np.zeros(num_bin_x * num_bin_y)
+        add_keys, add_last = [], []
+        for start in range(0, num_bonds, self.chunk_size):
+            stop = min(start + self.chunk_size, num_bonds)
+            nx, ny = kernels.bin_segments(
+                P[start:stop], Q[start:stop], t, bin_x, bin_y, self.backend
+            )
+            k = np.arange(start * N, stop * N)
+            target = ((ny - 1) % self.num_bins_y) * self.num_bins_x + (
+                nx - 1
+            ) % self.num_bins_x
+            clear = (nx >= self.num_bins_x) | (ny >= self.num_bins_y)
+            np.maximum.at(last_clear, target[clear], k[clear])
+
+            inside = (nx >= 1) & (ny >= 1) & (nx <= num_bin_x) & (ny <= num_bin_y)
+            counts += np.bincount(
+                (nx[inside] - 1) * num_bin_y + ny[inside] - 1,
+                minlength=len(counts),
+            )
+
+            # last add of every (bin, bond) combination
+            key = (target[~clear] * num_bonds + k[~clear] // N)[::-1]
+            key, last = np.unique(key, return_index=True)
+            add_keys.append(key)
+            add_last.append(k[~clear][::-1][last])
+        self.counts = counts.reshape(num_bin_x, num_bin_y)
+
+        key = np.concatenate(add_keys) if add_keys else np.zeros(0, dtype=np.int64)
+        last = np.concatenate(add_last) if add_last else np.zeros(0, dtype=np.int64)
+        bin_of = key // max(num_bonds, 1)
+        key = np.sort(key[last > last_clear[bin_of]])
+        bin_of = key // max(num_bonds, 1)
+        bond_of = key % max(num_bonds, 1)
+
+        density = np.bincount(bin_of, minlength=nbins)
+        bonds_per_bin = np.split(bond_of, np.cumsum(density)[:-1])
+        self.parent_bin = [
+            [b.tolist() for b in bonds_per_bin[ny * self.num_bins_x : (ny + 1) * self.num_bins_x]]
+            for ny in range(self.num_bins_y)
+        ]
+        self.density_bin = density.reshape(self.num_bins_y, self.num_bins_x).tolist()
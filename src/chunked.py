@@ -0,0 +1,390 @@
+import json
+import os
+import numpy as np
+import numpy.typing as npt
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+from .network import Network
+from .storage import CategoryArray, RowArray
+from .parameters import (
+    DomainParameters,
+    DtypePolicy,
+    StrandDensityCrosslinkDistributerParameters,
+)
+from .strandgens import RandomStrandGenerator, boundary_mask
+from .crosslink_distributors import _CrosslinkQuantizer
+from .density_crosslinker import _pairs_sharing_bins
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+_META = "meta.json"
+
+
+class _NpyAppender:
+    """
+    Writes a .npy file row block by row block. The header has a fixed length and is rewritten with
+    the final shape on close, so rows never have to be held in memory or copied afterwards.
+    """
+
+    _HEADER_LENGTH = 128
+
+    def __init__(self, path, dtype, width: Optional[int] = None):
+        self._file = open(path, "wb")
+        self._dtype = np.dtype(dtype)
+        self._width = width
+        self.rows = 0
+        self._write_header()
+
+    def _write_header(self):
+        shape = (self.rows,) if self._width is None else (self.rows, self._width)
+        header = repr(
+            {
+                "descr": np.lib.format.dtype_to_descr(self._dtype),
+                "fortran_order": False,
+                "shape": shape,
+            }
+        )
+        header = header.ljust(self._HEADER_LENGTH - 10 - 1) + "\n"
+        self._file.seek(0)
+        self._file.write(b"\x93NUMPY\x01\x00")
+        self._file.write(np.uint16(len(header)).astype("<u2").tobytes())
+        self._file.write(header.encode("latin1"))
+
+    def append(self, rows):
+        rows = np.ascontiguousarray(rows, dtype=self._dtype)
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(rows.tobytes())
+        self.rows += len(rows)
+
+    def close(self):
+        self._write_header()
+        self._file.close()
+
+
+class MemmapNetwork:
+    """
+    A network stored in a directory as .npy files, opened memory-mapped so that arrays are only
+    read from disk when they are accessed. Types are stored as small integer codes into the type
+    names in meta.json. Use to_network() to load it as a Network.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, _META)) as f:
+            self._meta = json.load(f)
+
+        self.domain = DomainParameters(**self._meta["domain"])
+        self.dtypes = DtypePolicy(
+            np.dtype(self._meta["dtypes"]["position"]).type,
+            np.dtype(self._meta["dtypes"]["index"]).type,
+        )
+        self.details_of_bondtypes: Dict = self._meta["details_of_bondtypes"]
+        self.details_of_angletypes: Dict = self._meta["details_of_angletypes"]
+        self.bead_type_names: List[str] = self._meta["bead_types"]
+        self.bond_type_names: List[str] = self._meta["bond_types"]
+        self.angle_type_names: List[str] = self._meta["angle_types"]
+
+        self.beads_positions = self._load("beads_positions")
+        self.beads_types = self._load("beads_types")
+        self.bonds_groups = self._load("bonds_groups")
+        self.bonds_types = self._load("bonds_types")
+        self.angle_groups = self._load("angle_groups")
+        self.angle_types = self._load("angle_types")
+        # optional, only for networks that track fibers
+        self.beads_fibers = (
+            self._load("beads_fibers")
+            if os.path.exists(os.path.join(directory, "beads_fibers.npy"))
+            else None
+        )
+
+    def _load(self, name) -> npt.NDArray:
+        return np.load(os.path.join(self.directory, name + ".npy"), mmap_mode="r")
+
+    @property
+    def number_of_beads(self) -> int:
+        return len(self.beads_positions)
+
+    def to_network(self) -> Network:
+        """Loads the whole network into memory."""
+        network = Network(self.domain, dtypes=self.dtypes)
+        network.beads_positions = self.beads_positions
+        network.beads_types = _decode(self.beads_types, self.bead_type_names)
+        if self.beads_fibers is not None:
+            network.beads_fibers = self.beads_fibers
+        network.bonds_groups = self.bonds_groups
+        network.bonds_types = _decode(self.bonds_types, self.bond_type_names)
+        network.angle_groups = self.angle_groups
+        network.angle_types = _decode(self.angle_types, self.angle_type_names)
+        network.details_of_bondtypes = dict(self.details_of_bondtypes)
+        network.details_of_angletypes = dict(self.details_of_angletypes)
+        return network
+
+
+def _decode(codes, names) -> CategoryArray:
+    return CategoryArray(names, RowArray.of(codes, np.asarray(codes).dtype))
+
+
+def _encode(types):
+    names, codes = np.unique(np.array(types, dtype=str), return_inverse=True)
+    return names.tolist(), codes.astype(np.uint8)
+
+
+def _write_meta(directory, domain, dtypes, type_names, bond_details, angle_details, **extra):
+    meta = dict(
+        domain=asdict(domain),
+        dtypes=dict(
+            position=np.dtype(dtypes.position).name, index=np.dtype(dtypes.index).name
+        ),
+        bead_types=type_names["beads"],
+        bond_types=type_names["bonds"],
+        angle_types=type_names["angles"],
+        details_of_bondtypes=bond_details,
+        details_of_angletypes=angle_details,
+        **extra,
+    )
+    with open(os.path.join(directory, _META), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def save_network(network: Network, directory) -> MemmapNetwork:
+    """Writes a network to a directory in the format read by MemmapNetwork."""
+    os.makedirs(directory, exist_ok=True)
+    type_names = dict()
+    for key, name, array, types, width in (
+        ("beads", "beads", network.positions_array(), network.beads_types, 2),
+        ("bonds", "bonds", network.bonds_array(), network.bonds_types, 2),
+        ("angles", "angle", network.angles_array(), network.angle_types, 3),
+    ):
+        names, codes = _encode(types)
+        type_names[key] = names
+        np.save(
+            os.path.join(directory, f"{name}_{'positions' if key == 'beads' else 'groups'}.npy"),
+            array.reshape(-1, width),
+        )
+        np.save(os.path.join(directory, f"{name}_types.npy"), codes)
+    if network.beads_fibers:
+        np.save(os.path.join(directory, "beads_fibers.npy"), network.beads_fibers.array)
+
+    _write_meta(
+        directory,
+        network.domain,
+        network.dtypes,
+        type_names,
+        network.details_of_bondtypes,
+        network.details_of_angletypes,
+    )
+    return MemmapNetwork(directory)
+
+
+def _strand_groups(first_strand, num_strands, num_beads, width):
+    """Bonds (width 2) or angles (width 3) of consecutive beads along strands first_strand, ..."""
+    start = (first_strand + np.arange(num_strands, dtype=np.int64)) * num_beads
+    local = np.arange(num_beads - width + 1)[:, None] + np.arange(width)[None, :]
+    return (start[:, None, None] + local[None, :, :]).reshape(-1, width)
+
+
+def generate_chunked_network(
+    directory,
+    domain: DomainParameters,
+    strand_generator: RandomStrandGenerator,
+    crosslink_par: Optional[StrandDensityCrosslinkDistributerParameters],
+    number_of_stripes: int,
+    seed: Optional[int] = None,
+    dtypes: Optional[DtypePolicy] = None,
+    strands_per_chunk: int = 100_000,
+    backend: Optional[str] = None,
+) -> MemmapNetwork:
+    """
+    Generates a network directly to disk, for networks that do not fit in memory. The domain is
+    cut into number_of_stripes vertical stripes. Strands are generated in chunks, sorted into the
+    stripe that contains their middle bead and written stripe by stripe, so the beads of every
+    stripe have consecutive ids. Crosslinkers are then distributed stripe by stripe as in
+    StrandDensityCrosslinkDistributerFast, looking at the beads of a stripe plus a halo of
+    max(crosslink_max_r, crosslink_bin_size) around it. Peak memory is set by strands_per_chunk and
+    the number of beads in three neighbouring stripes, not by the size of the domain.
+
+    Every stripe must be at least half a contour length plus the halo wide, so that only the
+    neighbouring stripes have beads in the halo.
+
+    Returns:
+        The generated network, opened memory-mapped from the directory.
+    """
+    dtypes = dtypes or DtypePolicy()
+    par = strand_generator._par
+    if strand_generator._placement is not None:
+        raise ValueError("Excluded volume placement needs all strands at once")
+
+    num_beads = par.number_of_beads_per_strand
+    dtypes.check_indices(par.number_of_strands * num_beads)
+    width = domain.sizex / number_of_stripes
+    halo = 0.0
+    if crosslink_par is not None:
+        halo = max(crosslink_par.crosslink_max_r, crosslink_par.crosslink_bin_size)
+    if width < 0.5 * par.contour_length_of_strand + halo:
+        raise ValueError(
+            f"Stripes of width {width} are too narrow for strands of length "
+            f"{par.contour_length_of_strand} and a halo of {halo}, use fewer stripes"
+        )
+
+    os.makedirs(directory, exist_ok=True)
+
+    def path(name):
+        return os.path.join(directory, name + ".npy")
+
+    # Generate strands and sort them into stripes
+    stripe_files = [
+        _NpyAppender(path(f"stripe_{s}"), dtypes.position, 2)
+        for s in range(number_of_stripes)
+    ]
+    for start in range(0, par.number_of_strands, strands_per_chunk):
+        pos = strand_generator._strand_positions(
+            min(strands_per_chunk, par.number_of_strands - start)
+        )
+        center = pos[:, num_beads // 2, 0]
+        stripe = np.clip(np.floor(center / width), 0, number_of_stripes - 1)
+        for s in np.unique(stripe).astype(int):
+            stripe_files[s].append(pos[stripe == s].reshape(-1, 2))
+    for stripe_file in stripe_files:
+        stripe_file.close()
+
+    # Write the beads, polymer bonds and angles stripe by stripe
+    positions = _NpyAppender(path("beads_positions"), dtypes.position, 2)
+    beads_types = _NpyAppender(path("beads_types"), np.uint8)
+    beads_fibers = _NpyAppender(path("beads_fibers"), dtypes.fiber)
+    bonds = _NpyAppender(path("bonds_groups"), dtypes.index, 2)
+    bonds_types = _NpyAppender(path("bonds_types"), np.uint8)
+    angles = _NpyAppender(path("angle_groups"), dtypes.index, 3)
+    angle_types = _NpyAppender(path("angle_types"), np.uint8)
+
+    stripe_offsets = [0]
+    for s in range(number_of_stripes):
+        stripe_pos = np.load(path(f"stripe_{s}"), mmap_mode="r")
+        first_strand = positions.rows // num_beads
+        for start in range(0, len(stripe_pos), strands_per_chunk * num_beads):
+            chunk = np.array(stripe_pos[start : start + strands_per_chunk * num_beads])
+            positions.append(chunk)
+            # bead types: 0 = free, 1 = boundary
+            beads_types.append(boundary_mask(chunk, domain))
+
+            strands = len(chunk) // num_beads
+            beads_fibers.append(np.repeat(first_strand + np.arange(strands), num_beads))
+            strand_bonds = _strand_groups(first_strand, strands, num_beads, 2)
+            bonds.append(strand_bonds)
+            bonds_types.append(np.zeros(len(strand_bonds)))
+            strand_angles = _strand_groups(first_strand, strands, num_beads, 3)
+            angles.append(strand_angles)
+            angle_types.append(np.zeros(len(strand_angles)))
+            first_strand += strands
+        del stripe_pos
+        os.remove(path(f"stripe_{s}"))
+        stripe_offsets.append(positions.rows)
+    for appender in (positions, beads_types, beads_fibers, angles, angle_types):
+        appender.close()
+
+    bond_type_names = ["polymer"]
+    bond_details: Dict = dict()
+    if crosslink_par is not None:
+        quantizer = _CrosslinkQuantizer(crosslink_par.crosslink_max_r, 10)
+        bond_type_names += quantizer.types
+        for crosslinks, lengths in _crosslink_stripes(
+            np.load(path("beads_positions"), mmap_mode="r"),
+            stripe_offsets,
+            width,
+            halo,
+            domain,
+            crosslink_par,
+            np.random.default_rng(seed),
+            backend,
+            path("crosslinked"),
+        ):
+            bond_types = [quantizer.computetype(float(r)) for r in lengths]
+            bonds.append(crosslinks)
+            bonds_types.append([bond_type_names.index(typ) for typ in bond_types])
+            for typ in set(bond_types):
+                bond_details[typ] = {
+                    "r0": quantizer.spring_options(0.0)[typ]["r0"],
+                    "k": 1,
+                }
+    bonds.close()
+    bonds_types.close()
+
+    _write_meta(
+        directory,
+        domain,
+        dtypes,
+        dict(beads=["free", "boundary"], bonds=bond_type_names, angles=["polymer_bend"]),
+        bond_details,
+        dict(),
+        stripe_offsets=stripe_offsets,
+    )
+    return MemmapNetwork(directory)
+
+
+def _crosslink_stripes(
+    positions, stripe_offsets, width, halo, domain, par, rng, backend, crosslinked_path
+):
+    """
+    Candidates are the pairs of beads sharing a bin of the crosslink grid or of the grid displaced
+    by half a bin. Every bin belongs to the stripe that contains its left edge, which splits the
+    candidates of StrandDensityCrosslinkDistributerFast over the stripes without overlap. A first
+    pass counts all candidates to get the global acceptance probability, the second accepts them
+    stripe by stripe. A bead-sized on-disk bitmap keeps one crosslinker per bead across stripes.
+    Yields the crosslinks and their lengths per stripe.
+    """
+    number_of_stripes = len(stripe_offsets) - 1
+    domain_size = (domain.sizex, domain.sizey)
+    num_beads = par.number_of_beads_per_strand
+
+    def stripe_candidates(s):
+        lo = stripe_offsets[max(s - 1, 0)]
+        hi = stripe_offsets[min(s + 2, number_of_stripes)]
+        pos = np.array(positions[lo:hi], dtype=np.float64)
+        x0, x1 = s * width, (s + 1) * width
+        window = np.flatnonzero((pos[:, 0] >= x0 - halo) & (pos[:, 0] < x1 + halo))
+        pos = pos[window]
+        pairs = []
+        for shift in (0.0, 0.5 * par.crosslink_bin_size):
+            grid_pairs, column = _pairs_sharing_bins(
+                pos + shift, domain_size, par.crosslink_bin_size, backend
+            )
+            owner = np.floor(column * par.crosslink_bin_size / width)
+            if s == 0:
+                owner = np.maximum(owner, 0)
+            if s == number_of_stripes - 1:
+                owner = np.minimum(owner, s)
+            pairs.append(grid_pairs[owner == s])
+        pairs = np.concatenate(pairs)
+        r = np.linalg.norm(pos[pairs[:, 0]] - pos[pairs[:, 1]], axis=1)
+        return (window[pairs] + lo), r
+
+    number_of_combinations = sum(len(stripe_candidates(s)[0]) for s in range(number_of_stripes))
+    if number_of_combinations == 0:
+        return
+    prob = par.maximal_number_of_initial_crosslinks / number_of_combinations
+    _logger.info(
+        "%s candidate crosslinks, accepting with probability %s",
+        number_of_combinations,
+        prob,
+    )
+
+    crosslinked = np.lib.format.open_memmap(
+        crosslinked_path, mode="w+", dtype=bool, shape=(stripe_offsets[-1],)
+    )
+    for s in range(number_of_stripes):
+        pairs, r = stripe_candidates(s)
+        accept = rng.random(len(pairs)) <= prob
+        accept &= pairs[:, 0] // num_beads != pairs[:, 1] // num_beads
+        accept &= r <= par.crosslink_max_r
+        crosslinks, lengths = [], []
+        for (b0, b1), length in zip(pairs[accept], r[accept]):
+            if crosslinked[b0] or crosslinked[b1]:
+                continue
+            crosslinked[b0] = crosslinked[b1] = True
+            crosslinks.append((b0, b1))
+            lengths.append(length)
+        yield np.array(crosslinks, dtype=np.int64).reshape(-1, 2), np.array(lengths)
+    del crosslinked
+    os.remove(crosslinked_path)
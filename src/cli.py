@@ -0,0 +1,167 @@
+import argparse
+import inspect
+import json
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+from . import networks
+from .network import Network
+from .chunked import save_network
+from .export import write_parquet
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def _save_npz(network: Network, path):
+    names = dict()
+    arrays: Dict[str, Any] = dict(
+        beads_positions=network.positions_array(),
+        bonds_groups=network.bonds_array(),
+        angle_groups=network.angles_array(),
+    )
+    for key, types in (
+        ("beads", network.beads_types),
+        ("bonds", network.bonds_types),
+        ("angle", network.angle_types),
+    ):
+        names[key], arrays[f"{key}_types"] = np.unique(
+            np.array(types, dtype=str), return_inverse=True
+        )
+        names[key] = names[key].tolist()
+    meta = dict(
+        type_names=names,
+        details_of_bondtypes=network.details_of_bondtypes,
+        details_of_angletypes=network.details_of_angletypes,
+    )
+    np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+
+
+def _is_seedable(function) -> bool:
+    """Whether a network function takes a seed and builds a network from scratch."""
+    parameters = inspect.signature(function).parameters
+    return "seed" in parameters and "network" not in parameters
+
+
+# the network functions of ecmgen.networks that generate a random network from a seed; the others
+# are deterministic (one network per seed would be the same network) or modify a given network
+FACTORIES = [
+    name
+    for name, function in inspect.getmembers(networks, inspect.isfunction)
+    if function.__module__ == networks.__name__
+    and not name.startswith("_")
+    and _is_seedable(function)
+]
+
+
+def _save_parquet(network: Network, directory, network_id: int, seed: int, parameters: Dict):
+    # one file per network and table, so workers can add their networks to the same dataset
+    write_parquet(
+        directory, [network], seeds=[seed], parameters=[parameters], first_network_id=network_id
+    )
+
+
+# format name -> (file extension, writer). Writers with an extension get a path per network and
+# are called as writer(network, path). Writers without one (None) add every network to one dataset
+# in the output directory and are called as writer(network, directory, network_id, seed, parameters).
+FORMATS = {
+    "npz": (".npz", _save_npz),
+    "npy": ("", save_network),
+    "parquet": (None, _save_parquet),
+}
+
+
+def _generate_one(task):
+    factory, arguments, network_id, seed, path, fmt = task
+    start = time.perf_counter()
+    network = getattr(networks, factory)(**arguments, seed=seed)
+    extension, writer = FORMATS[fmt]
+    if extension is None:
+        writer(network, path, network_id, seed, dict(factory=factory, **arguments))
+    else:
+        writer(network, path)
+    return seed, len(network.beads_positions), len(network.bonds_groups), time.perf_counter() - start
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ecmgen",
+        description="Generate a batch of networks from a parameter file.",
+        epilog="The parameter file is a JSON object with 'factory' (a network function of "
+        "ecmgen.networks that takes a seed, e.g. 'fibrin_network'), 'arguments' (its keyword "
+        "arguments except the seed) and optionally 'seeds' ([start, stop]), 'format' and 'output'. "
+        "Command line options override the file.",
+    )
+    parser.add_argument("parameters", help="JSON parameter file")
+    parser.add_argument("-o", "--output", help="output directory (default: .)")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("-f", "--format", choices=sorted(FORMATS), help="output format (default: npz)")
+    parser.add_argument(
+        "-s", "--seeds", nargs=2, type=int, metavar=("START", "STOP"),
+        help="generate one network for every seed in range(START, STOP)",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    with open(args.parameters) as f:
+        parameters: Dict = json.load(f)
+    factory = parameters.get("factory")
+    if factory not in FACTORIES:
+        parser.error(
+            f"Unknown network factory {factory!r}: it must be a network function of "
+            f"ecmgen.networks that takes a seed, one of {FACTORIES}"
+        )
+    arguments = parameters.get("arguments", dict())
+    seeds = range(*(args.seeds or parameters.get("seeds", [0, 1])))
+    fmt = args.format or parameters.get("format", "npz")
+    if fmt not in FORMATS:
+        parser.error(f"Unknown format {fmt!r}, choose from {sorted(FORMATS)}")
+    output = args.output or parameters.get("output", ".")
+    if args.workers < 1:
+        parser.error("The number of workers must be at least 1")
+    os.makedirs(output, exist_ok=True)
+
+    extension = FORMATS[fmt][0]
+    tasks = [
+        (
+            factory,
+            arguments,
+            network_id,
+            seed,
+            output if extension is None else os.path.join(output, f"{factory}_{seed:06d}{extension}"),
+            fmt,
+        )
+        for network_id, seed in enumerate(seeds)
+    ]
+
+    start = time.perf_counter()
+    beads = bonds = 0
+    # spawn instead of fork: forking after the parallel numba kernels ran leaves their thread pool
+    # in a broken state in the children, which then hang at exit
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(min(args.workers, max(len(tasks), 1))) as pool:
+        for seed, num_beads, num_bonds, seconds in pool.imap_unordered(_generate_one, tasks):
+            _logger.info("seed %s: %s beads, %s bonds in %.2f s", seed, num_beads, num_bonds, seconds)
+            beads += num_beads
+            bonds += num_bonds
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Generated {len(tasks)} networks ({beads} beads, {bonds} bonds) in {elapsed:.2f} s "
+        f"with {args.workers} workers: {len(tasks) / elapsed:.2f} networks/s, "
+        f"{beads / elapsed:.0f} beads/s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import Optional, List, Tuple, Dict, Set
 from .network import Network
 from .network import BOND, BONDTYPE, BEADID, FIBREID, BONDID, Network
+from .percolation import percolation_threshold as _percolation_threshold
 import itertools
 import numpy as np
 
@@ -37,35 +38,46 @@ class _CrosslinkQuantizer:
 
 
 class CrosslinkDistributer(ABC):
-    def distribute_crosslinkers(self, network: Network):
-        bonds_to_add = list()
-        types_to_add = list()
-
-        beads_with_crosslinker = set()
-
-        selected_bonds_and_types = self._bonds_to_crosslink(network)
-
-        for bond, bond_typ in selected_bonds_and_types:
-            sorted_bond: List[int] = sorted(bond)
-
-            if (
-                sorted_bond in bonds_to_add
-                or sorted_bond[0] in beads_with_crosslinker
-                or sorted_bond[1] in beads_with_crosslinker
-            ):
-                continue
-
-            bonds_to_add.append(bond)
-            types_to_add.append(bond_typ)
-            beads_with_crosslinker.add(bond[0])
-            beads_with_crosslinker.add(bond[1])
-
-        network.bonds_groups.extend(bonds_to_add)
-        network.bonds_types.extend(types_to_add)
+    """
+    Selects crosslinks (select_bonds) and adds them to a network. Crosslinkers never change bead
+    positions and add bonds and angles by replacing the lists, so they can run on network snapshots.
+    """
+
+    # crosslinks added when the network first spanned the domain, see distribute_crosslinkers
+    percolation_threshold: Optional[int] = None
+
+    def distribute_crosslinkers(
+        self,
+        network: Network,
+        track_percolation: bool = False,
+        stop_at_percolation: bool = False,
+    ):
+        """
+        Adds the selected crosslinks to the network.
+
+        With track_percolation=True, percolation_threshold is set to the number of crosslinks (in
+        selection order) after which a cluster of fibers first touches two opposite sides of the
+        domain (see PercolationTracker), or None if it never does. With stop_at_percolation=True
+        only that many crosslinks are added (and add_crosslink_angles only uses those). The order is
+        random for the density crosslinkers (for StrandDensityCrosslinkDistributerFast only with
+        exact=True), so the threshold is that of a network with fewer crosslinks.
+        """
+        crosslinks = self._crosslinks_to_add(network)
+        if track_percolation or stop_at_percolation:
+            self.percolation_threshold = _percolation_threshold(
+                network, (bond for bond, _ in crosslinks)
+            )
+            if stop_at_percolation and self.percolation_threshold is not None:
+                crosslinks = crosslinks[: self.percolation_threshold]
+                self._added_bonds_and_types = crosslinks
+        network.extend(
+            bonds_groups=[bond for bond, _ in crosslinks],
+            bonds_types=[bond_typ for _, bond_typ in crosslinks],
+        )
 
     def add_crosslink_angles(self, network: Network):
         print("Add crosslink angles")
-        selected_bonds_and_types = self._bonds_to_crosslink(network)
+        selected_bonds_and_types = self._crosslinks_to_add(network)
 
         # For each bond, we have to add an angle constraint to some triples of neighbours.
         # I only add an additional angle if the crosslink is in the middle of a fiber.
@@ -75,20 +87,16 @@ class CrosslinkDistributer(ABC):
         thetas_to_add = []
 
         beads_positions = np.array(network.beads_positions)
-        bonds_group = dict()
-        for bond, bondtype in zip(network.bonds_groups, network.bonds_types):
-            if bondtype == "polymer":
-                bonds_group.setdefault(bond[0], []).append(bond[1])
-                bonds_group.setdefault(bond[1], []).append(bond[0])
-        print(f"{bonds_group=}")
+        polymer_neighbours = network.adjacency(bond_types=["polymer"])
 
         for bond, bondtype in selected_bonds_and_types:
-            angles = [
-                (bond[0], bond[1], bonds_group.get(bond[1])[0]),
-                (bond[1], bond[0], bonds_group.get(bond[0])[0]),
-            ]
+            angles = []
+            for a, b in ((bond[0], bond[1]), (bond[1], bond[0])):
+                start, stop = polymer_neighbours.indptr[b : b + 2]
+                if start == stop:  # crosslinked bead is not part of a fiber
+                    continue
+                angles.append((a, b, polymer_neighbours.indices[start]))
 
-            print(list(angles))
             for a, b, c in angles:
                 # a, b, c = next(angles)
                 # a, b, c = np.random.choice(angles, 1)
@@ -133,14 +141,30 @@ class CrosslinkDistributer(ABC):
             }
         print(network.details_of_angletypes)
         print(f"Adding {len(angles_to_add)}")
-        network.angle_groups.extend(angles_to_add)
-        network.angle_types.extend(angle_types)
+        network.extend(angle_groups=angles_to_add, angle_types=angle_types)
 
     def _bonds_to_crosslink(self, network: Network):
         if not hasattr(self, "_selected_bonds_and_types"):
             self._selected_bonds_and_types = self.select_bonds(network)
         return self._selected_bonds_and_types
 
+    def _crosslinks_to_add(self, network: Network) -> List[Tuple[BOND, BONDTYPE]]:
+        """
+        The selected crosslinks that distribute_crosslinkers adds: a crosslink is skipped if one of
+        its beads already has a crosslinker. add_crosslink_angles only uses these.
+        """
+        if not hasattr(self, "_added_bonds_and_types"):
+            added = list()
+            beads_with_crosslinker = set()
+            for bond, bond_typ in self._bonds_to_crosslink(network):
+                if bond[0] in beads_with_crosslinker or bond[1] in beads_with_crosslinker:
+                    continue
+                added.append((bond, bond_typ))
+                beads_with_crosslinker.add(bond[0])
+                beads_with_crosslinker.add(bond[1])
+            self._added_bonds_and_types = added
+        return self._added_bonds_and_types
+
     @abstractmethod
     def select_bonds(self, network: Network) -> List[Tuple[BOND, BONDTYPE]]:
         pass
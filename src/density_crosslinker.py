@@ -3,24 +3,86 @@ from .network import BOND, BONDTYPE, BEADID, FIBREID, BONDID, Network
 from .binner import FiberBin
 from .parameters import StrandDensityCrosslinkDistributerParameters
 from scipy.signal import convolve2d
-from scipy.special import binom
 
 import numpy as np
+import numpy.typing as npt
 from typing import Optional, List, Tuple, Dict, Set
 from abc import ABC, abstractmethod
-import math
 import itertools
-from collections import defaultdict
 from .crosslink_distributors import _CrosslinkQuantizer
+from .sampling import AliasTable, WeightedReservoir, ProbabilityMap
+from . import kernels
+
+
+class _CandidateTable:
+    """
+    Crosslink candidates (bead pairs on different fibers) around one bin, weighted by
+    _crosslink_r_weights. Pairs that touch an already crosslinked bead are rejected when drawn and only
+    removed from the table once rejections become frequent.
+    """
+
+    _ATTEMPTS = 8
+
+    def __init__(self, pairs, weights, rng: np.random.Generator):
+        self._rng = rng
+        self._set(pairs, weights)
+
+    def _set(self, pairs, weights):
+        keep = weights > 0
+        self.pairs = pairs[keep]
+        self.weights = weights[keep]
+        self._alias = AliasTable(self.weights, self._rng) if len(self.weights) else None
+
+    @classmethod
+    def restore(cls, pairs, weights, alias: Optional[AliasTable], rng: np.random.Generator):
+        """A table with already filtered pairs and weights and their alias table (drawing with rng)."""
+        table = cls.__new__(cls)
+        table._rng = rng
+        table.pairs = pairs
+        table.weights = weights
+        table._alias = None if alias is None else alias.with_rng(rng)
+        return table
+
+    def _invalidate(self, crosslinked):
+        valid = ~crosslinked[self.pairs].any(axis=1)
+        self._set(self.pairs[valid], self.weights[valid])
+
+    def draw(self, crosslinked) -> Optional[List[BEADID]]:
+        """Draws a pair of beads that are both free of crosslinkers, or None if there is none left."""
+        if self._alias is None:
+            return None
+        for k in self._alias.sample(self._ATTEMPTS):
+            p0, p1 = self.pairs[k]
+            if not (crosslinked[p0] or crosslinked[p1]):
+                return [int(p0), int(p1)]
+        self._invalidate(crosslinked)
+        if self._alias is None:
+            return None
+        p0, p1 = self.pairs[self._alias.sample()]
+        return [int(p0), int(p1)]
 
 
 class StrandDensityCrosslinkDistributer(CrosslinkDistributer):
     def __init__(
-        self, par: StrandDensityCrosslinkDistributerParameters, seed: Optional[int]
+        self,
+        par: StrandDensityCrosslinkDistributerParameters,
+        seed: Optional[int],
+        backend: Optional[str] = None,
+        probability_map=None,
     ):
+        """
+        probability_map (a ProbabilityMap, or an array or callable to build one) multiplies the
+        weight of every candidate by its value at the middle of the crosslink, and the weight of
+        every bin by its value at the bin center.
+        """
         self._par = par
         self._rng = np.random.default_rng(seed)
+        self._backend = backend
+        self._map = _probability_map(probability_map)
         self._binner: FiberBin
+        # bonds within fibers of the network being crosslinked, set by select_bonds; the bins hold
+        # indices into this array
+        self._bonds: Optional[npt.NDArray[np.integer]] = None
 
         self._quantizer = _CrosslinkQuantizer(self._par.crosslink_max_r, 10)
 
@@ -30,9 +92,13 @@ class StrandDensityCrosslinkDistributer(CrosslinkDistributer):
 
     def select_bonds(self, network: Network) -> List[Tuple[BOND, BONDTYPE]]:
         pos = network.beads_positions
+        self._fibers = _bead_fibers(network, self._par.number_of_beads_per_strand)
+        self._bonds = self._fiber_bonds(network)
 
         density_bin = self._makeDensityBin(network)
         pairings = self._pairings(density_bin)
+        if self._map is not None:
+            pairings = pairings * self._bin_center_factors(network, pairings.shape)
         total_num_pairings = np.sum(pairings)
 
         # for each sampled bin, generate the appropriate number of crosslinks by drawing without replacement, with uniform probability
@@ -56,9 +122,15 @@ class StrandDensityCrosslinkDistributer(CrosslinkDistributer):
 
         return list(zip(selected_bonds, selected_types))
 
+    def _fiber_bonds(self, network: Network) -> npt.NDArray[np.integer]:
+        """The bonds between two beads of the same fiber, i.e. the bonds that are binned."""
+        bonds = network.bonds_array()
+        fibers = self._fibers[bonds]
+        return bonds[(fibers[:, 0] == fibers[:, 1]) & (fibers[:, 0] >= 0)]
+
     def _map_bead_to_fiber(self, bead: BEADID) -> FIBREID:
-        b = self._par.number_of_beads_per_strand
-        return math.floor(bead / b)
+        # also works elementwise on arrays of beads
+        return self._fibers[bead]
 
     def _makeDensityBin(self, network: Network):
         # Function calculating the local densities which are used for the calculation of crosslinking probabilty
@@ -68,25 +140,49 @@ class StrandDensityCrosslinkDistributer(CrosslinkDistributer):
         num_bins_x = int(network.domain.sizex / bin_size_x)
         num_bins_y = int(network.domain.sizey / bin_size_y)
 
-        crosslink_binner = FiberBin(
-            num_bins_x,
-            num_bins_y,
-            bin_size_x,
-            bin_size_y,
-            self._par.number_of_beads_per_strand,
-            self._par.number_of_strands,
-            network.domain.sizex,
-            network.domain.sizey,
+        def build():
+            crosslink_binner = FiberBin(
+                num_bins_x,
+                num_bins_y,
+                bin_size_x,
+                bin_size_y,
+                self._par.number_of_beads_per_strand,
+                self._par.number_of_strands,
+                network.domain.sizex,
+                network.domain.sizey,
+                backend=self._backend,
+            )
+            particlepos = network.positions_array()
+            crosslink_binner.bin_network(self._bonds, particlepos)
+            return crosslink_binner
+
+        # The binning only depends on the strands, so crosslinkers with the same bins share it
+        crosslink_binner = network._cached(
+            ("fiber_bin",) + self._binning_key(network),
+            (network.beads_positions, network.bonds_groups, network.beads_fibers),
+            build,
         )
-
-        bondgroup = np.array(network.bonds_groups)
-        particlepos = np.array(network.beads_positions)
-        crosslink_binner.bin_network(bondgroup, particlepos)
         density_bin = np.array(crosslink_binner.density_bin)
 
         self._binner = crosslink_binner
         return density_bin
 
+    def _binning_key(self, network: Network):
+        return (
+            self._par.crosslink_bin_size,
+            network.domain.sizex,
+            network.domain.sizey,
+            self._par.number_of_beads_per_strand,
+            self._par.number_of_strands,
+        )
+
+    def _bin_center_factors(self, network: Network, shape):
+        """The probability map at the centers of the neighbourhoods sampled for entries (ny, nx)."""
+        ny, nx = np.indices(shape)
+        centers = np.column_stack([nx.ravel() + 0.5, ny.ravel() + 0.5]) * self._par.crosslink_bin_size
+        assert self._map is not None
+        return self._map(centers, network.domain).reshape(shape)
+
     def _pairings(self, density_bin):
         """
         Based on local densities, count the number of possible pairings (same fiber pairing is included)
@@ -115,103 +211,89 @@ class StrandDensityCrosslinkDistributer(CrosslinkDistributer):
     ):
         """
         Pairs all beads in the list of bonds that are connected to different fibers.
+        Returns a (K, 2) array of bead ids.
         """
-        # We create a list of vertex_pairs such that no two vertices are part of the same fibre.
-        fiber_dict: Dict[FIBREID, List[BEADID]] = defaultdict(list)
-
-        for bondid in bonds_in_nbhd:
-            for bead in network.bonds_groups[bondid]:
-                fiber_id = self._map_bead_to_fiber(bead)
-                fiber_dict[fiber_id].append(bead)
-
-        # Example: fiber_dict = { 1: [1,2,3], 2: [4,5,6]: 3: [7,8] } then combinations(fiber_dict.values(),2) =
-        # [ ([1,2,3] ,[4,5,6]), ([1,2,3], [7,8]), ([4,5,6], [7,8])]
-        # So fiberpair = tuple of list of beads that are guaranteed to be on different fibers
-
-        all_bead_pairs = []
-        fiberpair: Tuple[List[BEADID], List[BEADID]]
-        for fiberpair in itertools.combinations(fiber_dict.values(), 2):
-            beadpair: List[BOND] = list(itertools.product(*fiberpair))
-            all_bead_pairs.extend(beadpair)
-        return all_bead_pairs
-
-    def _crosslink_r_dist(self, r):  # distribution of possible radii of a crosslinker
-        if r <= self._par.crosslink_max_r:
-            p = 2 / self._par.crosslink_max_r - 2 / self._par.crosslink_max_r**2 * r
-        else:
-            p = 0
-        return p
-
-    def _sample_bonds_on_distance(self, bead_pairs, num_of_samples, network: Network):
-        dist = []
-        pos = np.array(network.beads_positions)
-        cum_p = 0
-        for k0, k1 in bead_pairs:
-            r = np.linalg.norm(np.array(pos[k0]) - np.array(pos[k1]))  # type: ignore
-            p = self._crosslink_r_dist(r)
-            dist.append(p)
-            cum_p += p
-        if cum_p == 0:  # Could not make a crosslinker
-            return []
-        # normalize
-        prob = [p / cum_p for p in dist]
-
-        # sample the vertex pairs -- closer pairs are more likely to be chosen
-        pairs_indices = self._rng.choice(
-            len(bead_pairs),
-            size=num_of_samples,
-            replace=False,
-            p=prob,
-        )
-        return [
-            sorted(bead_pairs[k]) for k in pairs_indices  # We should have used sets
-        ]
+        # Every bead of every bond is listed (so beads shared by two bonds appear twice), grouped
+        # per fiber in order of first appearance. Then all pairs of list entries from different
+        # groups are taken, i.e. pairs of beads that are guaranteed to be on different fibers.
+        bonds = np.asarray(network.bonds_groups if self._bonds is None else self._bonds)
+        beads = bonds[np.fromiter(sorted(bonds_in_nbhd), dtype=np.int64)].reshape(-1)
+        if len(beads) == 0:
+            return np.zeros((0, 2), dtype=np.int64)
+        fibers = self._fibers[beads]
+        _, first_seen, group = np.unique(fibers, return_index=True, return_inverse=True)
+        rank = np.argsort(np.argsort(first_seen))[group.ravel()]
+        order = np.argsort(rank, kind="stable")
+        sizes = np.bincount(rank)
+
+        first, second = kernels.pairs_across_groups(sizes, self._backend)
+        beads = beads[order]
+        return np.column_stack([beads[first], beads[second]])
+
+    def _crosslink_r_weights(self, r):
+        """
+        Weights of crosslinkers of lengths r: the triangular distribution 2 / max_r - 2 r / max_r^2
+        on [0, max_r], so closer pairs are more likely to be chosen.
+        """
+        max_r = self._par.crosslink_max_r
+        return np.where(r <= max_r, 2 / max_r - 2 / max_r**2 * r, 0.0)
+
+    def _candidate_table(self, network: Network, nx, ny) -> "_CandidateTable":
+        """
+        Returns the table of crosslink candidates around bin (nx, ny), building it the first time the
+        bin is sampled.
+        """
+        table = self._candidate_tables.get((nx, ny))
+        if table is None:
+            entry = self._bin_candidates.get((nx, ny))
+            if entry is None:
+                bonds_in_nbhd = self._find_bonds_in_neighbourhood(nx, ny)
+                all_bead_pairs = self._find_all_bead_pairs_with_different_fibers(
+                    network, bonds_in_nbhd
+                )
+                pairs = np.sort(np.asarray(all_bead_pairs, dtype=np.int64).reshape(-1, 2))
+                pos = self._positions
+                r = np.linalg.norm(pos[pairs[:, 0]] - pos[pairs[:, 1]], axis=1)
+                weights = self._crosslink_r_weights(r)
+                if self._map is not None:
+                    midpoints = 0.5 * (pos[pairs[:, 0]] + pos[pairs[:, 1]])
+                    weights = weights * self._map(midpoints, network.domain)
+                table = _CandidateTable(pairs, weights, self._rng)
+                self._bin_candidates[(nx, ny)] = (table.pairs, table.weights, table._alias)
+            else:
+                pairs, weights, alias = entry
+                table = _CandidateTable.restore(pairs, weights, alias, self._rng)
+            self._candidate_tables[(nx, ny)] = table
+        return table
 
     def _select_bonds_per_fibre(self, network: Network, sample):
         # For each selected site, try to create a crosslinker that is not connected to the same fiber.
         selected_bonds = {}
-        allready_crosslinked_beads = list()
+        self._positions = network.positions_array()
+        self._candidate_tables: Dict[Tuple[int, int], _CandidateTable] = dict()
+        # The candidates of a bin only depend on the strands and the crosslink parameters, so they
+        # are kept on the network for later crosslinkers (the tables above change while drawing)
+        self._bin_candidates = network._cached(
+            ("bin_candidates", self._par.crosslink_max_r, self._map) + self._binning_key(network),
+            (network.beads_positions, network.bonds_groups, network.beads_fibers),
+            dict,
+        )
+        crosslinked = np.zeros(len(network.beads_positions), dtype=bool)
         for ny, nx in sample:
             # Consider the bins next to the current bin and take all bonds that are in there as well.
-            bonds_in_nbhd = self._find_bonds_in_neighbourhood(nx, ny)
-            all_bead_pairs = self._find_all_bead_pairs_with_different_fibers(
-                network, bonds_in_nbhd
-            )
-            # remove beads that already have a crosslinker
-            filtered_bead_pairs = list(
-                filter(
-                    lambda bp: not (
-                        bp[0] in allready_crosslinked_beads
-                        or bp[1] in allready_crosslinked_beads
-                    ),
-                    all_bead_pairs,
-                )
-            )
-
-            if len(filtered_bead_pairs) == 0:  # If there was only one fiber
+            bond = self._candidate_table(network, nx, ny).draw(crosslinked)
+            if bond is None:  # If there was only one fiber or no pair close enough
                 continue
-            if (
-                len(
-                    bonds := self._sample_bonds_on_distance(
-                        filtered_bead_pairs, 1, network
-                    )
-                )
-                > 0
-            ):
-                allready_crosslinked_beads.extend(itertools.chain(*bonds))
-                selected_bonds[(ny, nx)] = bonds[0]
+            crosslinked[bond] = True
+            selected_bonds[(ny, nx)] = bond
         return list(selected_bonds.values())
 
     def _sample_from_2d_array(self, array, size):
         """
         Sample 'size' indices from array with weights as in the array.
         """
-        # Create a flat copy of the array
-        flat = array.flatten()
-
-        # Then, sample an index from the 1D array with the
-        # probability distribution from the original array
-        sample_index = np.random.choice(a=flat.size, p=flat, replace=True, size=size)
+        # One alias table over the flattened array makes every draw O(1)
+        sample_index = AliasTable(array, self._rng).sample(size)
 
         # Take this index and adjust it so it matches the original array
         adjusted_index = np.unravel_index(sample_index, array.shape)
@@ -219,11 +301,41 @@ class StrandDensityCrosslinkDistributer(CrosslinkDistributer):
 
 
 class StrandDensityCrosslinkDistributerFast(CrosslinkDistributer):
+    """
+    Crosslinks pairs of beads on different fibers that share a bin (on the bin grid or on the grid
+    displaced by half a bin) and are at most crosslink_max_r apart.
+
+    By default every candidate pair is accepted with probability maximal_number_of_initial_crosslinks
+    / (number of pairs sharing a bin), so the number of crosslinks is only right on average. With
+    exact=True the candidates are streamed bin by bin through a reservoir and exactly
+    maximal_number_of_initial_crosslinks pairs without common beads are selected in random order,
+    so distribute_crosslinkers adds all of them; a ValueError is raised if that many can not be
+    found. The pairs are then never all held in memory at once.
+
+    probability_map (a ProbabilityMap, or an array or callable to build one) makes the chance of a
+    pair proportional to the map at its middle: the acceptance probabilities are scaled so that the
+    expected number of crosslinks stays the same, and in exact mode the pairs are drawn with the
+    map values as weights.
+    """
+
+    # number of candidate pairs generated at once in exact mode
+    _PAIRS_PER_CHUNK = 1 << 16
+    # initial reservoir size in exact mode, in crosslinks
+    _RESERVOIR_FACTOR = 2
+
     def __init__(
-        self, par: StrandDensityCrosslinkDistributerParameters, seed: Optional[int]
+        self,
+        par: StrandDensityCrosslinkDistributerParameters,
+        seed: Optional[int],
+        backend: Optional[str] = None,
+        exact: bool = False,
+        probability_map=None,
     ):
         self._par = par
         self._rng = np.random.default_rng(seed)
+        self._backend = backend
+        self._exact = exact
+        self._map = _probability_map(probability_map)
         self._binner: FiberBin
 
         self._quantizer = _CrosslinkQuantizer(self._par.crosslink_max_r, 10)
@@ -233,52 +345,124 @@ class StrandDensityCrosslinkDistributerFast(CrosslinkDistributer):
         #    k=par.crosslink_k, r0=par.crosslink_r0)}
 
     def same_fiber(self, bead1, bead2) -> bool:
-        b = self._par.number_of_beads_per_strand
-        return math.floor(bead1 / b) == math.floor(bead2 / b)
+        # also works elementwise on arrays of beads
+        fiber1 = self._fibers[bead1]
+        return (fiber1 == self._fibers[bead2]) & (fiber1 >= 0)
 
     def select_bonds(self, network: Network) -> List[Tuple[BOND, BONDTYPE]]:
-        bin = self._binNetwork(network)
-
-        displaced_network = network
-        displaced_network.beads_positions = [
-            pos + self._par.crosslink_bin_size * 0.5
-            for pos in displaced_network.beads_positions
-        ]
-        bin_displaced = self._binNetwork(displaced_network)
-        displaced_network.beads_positions = [
-            pos - self._par.crosslink_bin_size * 0.5
-            for pos in displaced_network.beads_positions
-        ]
-
-        combinations = list(bin.values()) + list(bin_displaced.values())
-        pos = np.asarray(network.beads_positions)
-
-        bonds, types = list(), list()
-
-        number_of_combinations = sum(
-            binom(len(ids), 2) for ids in combinations if len(ids) >= 2
+        pos = network.positions_array()
+        self._fibers = _bead_fibers(network, self._par.number_of_beads_per_strand)
+        if self._exact:
+            return self._bonds_with_types(network, self._reservoir_pairs(network, pos), pos)
+
+        # Candidates are all pairs of beads sharing a bin, both on the bin grid and on the grid
+        # displaced by half a bin. They only depend on the positions, so they are cached.
+        pairs = network._cached(
+            (
+                "bin_pairs",
+                self._par.crosslink_bin_size,
+                network.domain.sizex,
+                network.domain.sizey,
+            ),
+            (network.beads_positions,),
+            lambda: np.concatenate(
+                [
+                    self._pairs_in_bins(network, pos),
+                    self._pairs_in_bins(network, pos + self._par.crosslink_bin_size * 0.5),
+                ]
+            ),
         )
+
+        number_of_combinations = len(pairs)
         if number_of_combinations == 0:
             return []
         prob = self._par.maximal_number_of_initial_crosslinks / number_of_combinations
         print(
             self._par.maximal_number_of_initial_crosslinks, number_of_combinations, prob
         )
-        for ids in combinations:
-            if len(ids) < 2:
-                continue
-            for p1, p2 in itertools.combinations(ids, 2):
-                if self.same_fiber(p1, p2):
-                    continue
-                if self._rng.random() > prob:
-                    continue
-                new_bond = (p1, p2)
-                r = np.linalg.norm(pos[p1] - pos[p2])
-                if r <= self._par.crosslink_max_r:
-                    bond_type = self._quantizer.computetype(float(r))
-
-                    bonds.append(new_bond)
-                    types.append(bond_type)
+        if self._map is not None:
+            # same expected number of accepted pairs, distributed according to the map
+            factors = self._map_factors(network, pairs, pos)
+            prob = prob * factors * (number_of_combinations / max(factors.sum(), 1e-300))
+        accept = self._rng.random(number_of_combinations) <= prob
+        accept &= self._valid(pairs, pos)
+        return self._bonds_with_types(network, pairs[accept], pos)
+
+    def _valid(self, pairs, pos) -> npt.NDArray[np.bool_]:
+        """Whether the pairs are on different fibers and at most crosslink_max_r apart."""
+        p1, p2 = pairs[:, 0], pairs[:, 1]
+        r = np.linalg.norm(pos[p1] - pos[p2], axis=1)
+        return ~self.same_fiber(p1, p2) & (r <= self._par.crosslink_max_r)
+
+    def _reservoir_pairs(self, network: Network, pos) -> npt.NDArray[np.int64]:
+        """
+        Exactly maximal_number_of_initial_crosslinks valid candidate pairs without common beads. The
+        candidates are streamed through a WeightedReservoir, which puts them in uniformly random
+        order, and taken in that order, skipping pairs with a bead that already has a crosslinker.
+        Since pairs are skipped, the reservoir holds more than k pairs; if those do not contain k
+        disjoint pairs, the candidates are streamed again with the same random keys into a reservoir
+        twice as large, which continues the same selection.
+
+        Raises:
+            ValueError: if all candidates are used up before k disjoint pairs are found.
+        """
+        k = self._par.maximal_number_of_initial_crosslinks
+        if k == 0:
+            return np.zeros((0, 2), dtype=np.int64)
+        state = self._rng.bit_generator.state
+        size = self._RESERVOIR_FACTOR * k
+        while True:
+            self._rng.bit_generator.state = state
+            reservoir = WeightedReservoir(size, self._rng)
+            offered = 0
+            for pairs in self._iter_valid_pairs(network, pos):
+                if self._map is None:
+                    reservoir.offer(pairs)
+                    offered += len(pairs)
+                else:
+                    factors = self._map_factors(network, pairs, pos)
+                    reservoir.offer(pairs, factors)
+                    offered += int(np.count_nonzero(factors))
+            pairs = _disjoint_pairs(reservoir.result().reshape(-1, 2).astype(np.int64), k)
+            if len(pairs) == k:
+                return pairs
+            if offered <= size:
+                raise ValueError(
+                    f"Only {len(pairs)} of {k} crosslinks could be placed: the candidate pairs "
+                    "ran out (crosslink_max_r or crosslink_bin_size may be too small)"
+                )
+            size *= 2
+
+    def _iter_valid_pairs(self, network: Network, pos):
+        """Yields the valid candidate pairs of both bin grids in chunks, each pair once."""
+        domain_size = (network.domain.sizex, network.domain.sizey)
+        bin_size = self._par.crosslink_bin_size
+        shifted = pos + bin_size * 0.5
+        # a pair sharing a bin on both grids is only a candidate of the first one
+        inside = np.all((pos >= 0) & (pos < domain_size), axis=1)
+        bins = np.floor(pos / bin_size)
+
+        for positions, first_grid in ((pos, True), (shifted, False)):
+            for pairs in _iter_pairs_sharing_bins(
+                positions, domain_size, bin_size, self._PAIRS_PER_CHUNK, self._backend
+            ):
+                valid = self._valid(pairs, pos)
+                if not first_grid:
+                    p1, p2 = pairs[:, 0], pairs[:, 1]
+                    valid &= ~(
+                        inside[p1] & inside[p2] & np.all(bins[p1] == bins[p2], axis=1)
+                    )
+                yield pairs[valid]
+
+    def _map_factors(self, network: Network, pairs, pos) -> npt.NDArray[np.float64]:
+        """The probability map at the middle of every pair."""
+        assert self._map is not None
+        return self._map(0.5 * (pos[pairs[:, 0]] + pos[pairs[:, 1]]), network.domain)
+
+    def _bonds_with_types(self, network: Network, pairs, pos) -> List[Tuple[BOND, BONDTYPE]]:
+        r = np.linalg.norm(pos[pairs[:, 0]] - pos[pairs[:, 1]], axis=1)
+        bonds = [(int(b0), int(b1)) for b0, b1 in pairs]
+        types = [self._quantizer.computetype(float(length)) for length in r]
 
         for typ in set(types):
             network.details_of_bondtypes[typ] = {
@@ -288,33 +472,100 @@ class StrandDensityCrosslinkDistributerFast(CrosslinkDistributer):
 
         return list(zip(bonds, types))
 
-    def _binNetwork(self, network: Network):
+    def _pairs_in_bins(self, network: Network, positions):
         """
-        Bins 2D positions into a dictionary.
+        Bins 2D positions and returns all pairs of bead ids that share a bin.
 
         Args:
-            positions (numpy.ndarray): An Nx2 array of positions.
-            bin_size (float): Size of each bin.
-            domain_size (tuple): Maximum x, y, z coordinates defining the domain.
+            positions (numpy.ndarray): An Nx2 array of positions, positions outside the domain are ignored.
 
         Returns:
-            dict: A dictionary where keys are bin indices (tuples) and values are lists of position indices.
+            numpy.ndarray: A (K, 2) array of bead id pairs, grouped per bin.
         """
-        positions = np.asarray(network.beads_positions)
-        domain_size = (network.domain.sizex, network.domain.sizey)
-        bin_size = self._par.crosslink_bin_size
-
-        # Filter out positions outside the domain_size
-        within_domain = np.all((positions >= 0) & (positions < domain_size), axis=1)
-        positions = positions[within_domain]
-        valid_indices = np.where(within_domain)[0]
-
-        # Compute bin indices for each valid position
-        bin_indices = (positions // bin_size).astype(int)
-
-        # Group positions by bins using a dictionary
-        bins = defaultdict(list)
-        for idx, bin_idx in zip(valid_indices, bin_indices):
-            bins[tuple(bin_idx)].append(idx)
-
-        return bins
+        pairs, _ = _pairs_sharing_bins(
+            positions,
+            (network.domain.sizex, network.domain.sizey),
+            self._par.crosslink_bin_size,
+            self._backend,
+        )
+        return pairs
+
+
+def _probability_map(probability_map) -> Optional[ProbabilityMap]:
+    if probability_map is None or isinstance(probability_map, ProbabilityMap):
+        return probability_map
+    return ProbabilityMap(probability_map)
+
+
+def _disjoint_pairs(pairs, k: int) -> npt.NDArray[np.int64]:
+    """The first k pairs (or all) that have no bead in common with an earlier selected pair."""
+    selected = []
+    used: Set[int] = set()
+    for b0, b1 in pairs.tolist():
+        if b0 in used or b1 in used:
+            continue
+        selected.append((b0, b1))
+        used.update((b0, b1))
+        if len(selected) == k:
+            break
+    return np.array(selected, dtype=np.int64).reshape(-1, 2)
+
+
+def _bead_fibers(network: Network, number_of_beads_per_strand: int) -> npt.NDArray[np.int64]:
+    """
+    Fiber of every bead. Networks that do not track fibers are assumed to consist of strands of
+    number_of_beads_per_strand consecutive beads.
+    """
+    if network.beads_fibers:
+        return network.fiber_ids()
+    return np.arange(len(network.beads_positions)) // number_of_beads_per_strand
+
+
+def _bin_groups(positions, domain_size, bin_size):
+    """
+    Groups the positions inside the domain by bin. Returns the row indices of those positions sorted
+    by bin, the key (x index * number of bins in y + y index) of every occupied bin, the number of
+    positions in every occupied bin and the number of bins in y.
+    """
+    # Filter out positions outside the domain_size
+    within_domain = np.all((positions >= 0) & (positions < domain_size), axis=1)
+    valid_indices = np.flatnonzero(within_domain)
+
+    # Compute bin indices for each valid position
+    bin_indices = (positions[within_domain] // bin_size).astype(np.int64)
+    num_bins_y = int(domain_size[1] // bin_size) + 1
+    key = bin_indices[:, 0] * num_bins_y + bin_indices[:, 1]
+
+    # Group positions by bins
+    order = np.argsort(key, kind="stable")
+    keys, sizes = np.unique(key[order], return_counts=True)
+    return valid_indices[order], keys, sizes, num_bins_y
+
+
+def _pairs_sharing_bins(positions, domain_size, bin_size, backend=None):
+    """
+    Returns a (K, 2) array of all pairs of row indices of positions that share a bin (grouped per
+    bin) and, for every pair, the column (x index) of its bin. Positions outside the domain are ignored.
+    """
+    beads, keys, sizes, num_bins_y = _bin_groups(positions, domain_size, bin_size)
+    first, second = kernels.pairs_within_groups(sizes, backend)
+    column = np.repeat(keys // num_bins_y, sizes * (sizes - 1) // 2)
+    return np.column_stack([beads[first], beads[second]]), column
+
+
+def _iter_pairs_sharing_bins(positions, domain_size, bin_size, pairs_per_chunk, backend=None):
+    """
+    Yields the pairs of _pairs_sharing_bins in (K, 2) chunks of whole bins, with about
+    pairs_per_chunk pairs per chunk (more if a single bin has more pairs).
+    """
+    beads, _, sizes, _ = _bin_groups(positions, domain_size, bin_size)
+    pair_end = np.cumsum(sizes * (sizes - 1) // 2)
+    bead_start = np.cumsum(sizes) - sizes
+    start = 0
+    while start < len(sizes):
+        done = pair_end[start - 1] if start else 0
+        stop = max(int(np.searchsorted(pair_end, done + pairs_per_chunk, side="right")), start + 1)
+        first, second = kernels.pairs_within_groups(sizes[start:stop], backend)
+        chunk = beads[bead_start[start]:]
+        yield np.column_stack([chunk[first], chunk[second]])
+        start = stop
@@ -0,0 +1,148 @@
+import itertools
+import os
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .network import Network, _type_codes
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional
+    pa = None
+    pq = None
+
+TABLES = ("beads", "bonds", "angles")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Arrow export needs pyarrow, install it with 'pip install ecmgen[arrow]'")
+
+
+def _categories(types: Sequence[str]) -> "pa.DictionaryArray":
+    names, codes = _type_codes(types)
+    return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), pa.array(names, type=pa.string()))
+
+
+def _constant(value, n) -> "pa.Array":
+    return pa.array(itertools.repeat(value, n)) if value is not None else pa.nulls(n, pa.int64())
+
+
+def network_tables(
+    network: Network,
+    network_id: int = 0,
+    seed: Optional[int] = None,
+    parameters: Optional[Dict[str, Any]] = None,
+    tables: Iterable[str] = TABLES,
+) -> Dict[str, "pa.Table"]:
+    """
+    Converts a network to Arrow tables: 'beads' (bead, x, y, type, fiber), 'bonds' (bond, bead1,
+    bead2, type, length) and 'angles' (angle, bead1, bead2, bead3, type). Every table starts with
+    network_id and seed columns followed by one constant column per entry of 'parameters'. Types
+    are dictionary encoded.
+    """
+    _require_pyarrow()
+    parameters = parameters or dict()
+    pos = network.positions_array()
+
+    columns: Dict[str, Dict[str, Any]] = dict()
+    if "beads" in tables:
+        columns["beads"] = dict(
+            bead=np.arange(len(pos)),
+            x=pos[:, 0],
+            y=pos[:, 1],
+            type=_categories(network.beads_types),
+            fiber=network.fiber_ids(),
+        )
+    if "bonds" in tables:
+        bonds = network.bonds_array()
+        columns["bonds"] = dict(
+            bond=np.arange(len(bonds)),
+            bead1=bonds[:, 0],
+            bead2=bonds[:, 1],
+            type=_categories(network.bonds_types),
+            length=np.linalg.norm(pos[bonds[:, 0]] - pos[bonds[:, 1]], axis=1),
+        )
+    if "angles" in tables:
+        angles = network.angles_array()
+        columns["angles"] = dict(
+            angle=np.arange(len(angles)),
+            bead1=angles[:, 0],
+            bead2=angles[:, 1],
+            bead3=angles[:, 2],
+            type=_categories(network.angle_types),
+        )
+
+    result = dict()
+    for name, table_columns in columns.items():
+        n = len(table_columns["type"])
+        header = dict(
+            network_id=pa.array(np.full(n, network_id, dtype=np.int64)),
+            seed=_constant(seed, n),
+        )
+        header.update({key: _constant(value, n) for key, value in parameters.items()})
+        result[name] = pa.table({**header, **table_columns})
+    return result
+
+
+def write_parquet(
+    directory,
+    networks: Iterable[Network],
+    seeds: Optional[Iterable[Optional[int]]] = None,
+    parameters: Optional[Iterable[Optional[Dict[str, Any]]]] = None,
+    first_network_id: int = 0,
+    batch_size: int = 64,
+    tables: Iterable[str] = TABLES,
+) -> int:
+    """
+    Streams networks to Parquet, one directory per table (directory/beads, directory/bonds,
+    directory/angles) with one file per batch of batch_size networks, so only one batch is held in
+    memory. networks, seeds and parameters are consumed together and may be generators; the
+    networks are numbered from first_network_id. Use read_parquet to load all files of a table at once.
+
+    Returns:
+        The number of networks written.
+    """
+    _require_pyarrow()
+    tables = tuple(tables)
+    for name in tables:
+        if name not in TABLES:
+            raise ValueError(f"Unknown table {name!r}, choose from {TABLES}")
+        os.makedirs(os.path.join(directory, name), exist_ok=True)
+
+    seeds = itertools.repeat(None) if seeds is None else seeds
+    parameters = itertools.repeat(None) if parameters is None else parameters
+    network_id = first_network_id
+    batch: Dict[str, List] = {name: [] for name in tables}
+
+    def flush():
+        if not batch[tables[0]]:
+            return
+        first = network_id - len(batch[tables[0]])
+        for name in tables:
+            pq.write_table(
+                pa.concat_tables(batch[name], promote_options="permissive"),
+                os.path.join(directory, name, f"part-{first:08d}-{network_id - 1:08d}.parquet"),
+            )
+            batch[name].clear()
+
+    for network, seed, par in zip(networks, seeds, parameters):
+        for name, table in network_tables(network, network_id, seed, par, tables).items():
+            batch[name].append(table)
+        network_id += 1
+        if len(batch[tables[0]]) == batch_size:
+            flush()
+    flush()
+    return network_id - first_network_id
+
+
+def read_parquet(directory, table: str = "beads", columns: Optional[List[str]] = None) -> "pa.Table":
+    """Reads one table of all networks written to directory with write_parquet."""
+    _require_pyarrow()
+    return pq.read_table(os.path.join(directory, table), columns=columns)
+
+
+def save_parquet(network: Network, directory):
+    """Writes a single network with write_parquet."""
+    write_parquet(directory, [network])
@@ -0,0 +1,204 @@
+import os
+import numpy as np
+import numpy.typing as npt
+from typing import Optional, Tuple
+
+try:
+    import numba
+except ImportError:  # numba is optional
+    numba = None  # type: ignore[assignment]
+
+BACKENDS = ("numpy", "numba")
+
+_backend = os.environ.get("ECMGEN_BACKEND", "numpy")
+
+
+def available_backends() -> Tuple[str, ...]:
+    """Returns the kernel backends that can be used in this environment."""
+    return BACKENDS if numba is not None else ("numpy",)
+
+
+def set_backend(backend: str):
+    """
+    Sets the default kernel backend: 'numpy', 'numba' or 'auto' (numba if it is installed).
+    The initial default can be set with the ECMGEN_BACKEND environment variable.
+    """
+    global _backend
+    _resolve(backend)
+    _backend = backend
+
+
+def get_backend() -> str:
+    """Returns the default kernel backend."""
+    return _resolve(_backend)
+
+
+def _resolve(backend: Optional[str]) -> str:
+    backend = _backend if backend is None else backend
+    if backend == "auto":
+        return "numba" if numba is not None else "numpy"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, choose from {BACKENDS} or 'auto'")
+    if backend == "numba" and numba is None:
+        raise ImportError("The numba backend was requested but numba is not installed")
+    return backend
+
+
+def _pair_offsets(pairs_per_item):
+    offsets = np.zeros(len(pairs_per_item) + 1, dtype=np.int64)
+    np.cumsum(pairs_per_item, out=offsets[1:])
+    return offsets
+
+
+#######################
+#  NumPy kernels      #
+#######################
+
+
+def _bin_segments_numpy(P, Q, t, edges_x, edges_y):
+    x = P[:, 0, None] + t[None, :] * (Q[:, 0, None] - P[:, 0, None])
+    y = P[:, 1, None] + t[None, :] * (Q[:, 1, None] - P[:, 1, None])
+    x, y = x.ravel(), y.ravel()
+    nx = np.searchsorted(edges_x, x, side="right")
+    ny = np.searchsorted(edges_y, y, side="right")
+    # the last bin includes its right edge
+    nx[x == edges_x[-1]] = len(edges_x) - 1
+    ny[y == edges_y[-1]] = len(edges_y) - 1
+    return nx, ny
+
+
+def _pairs_within_groups_numpy(sizes):
+    sizes = np.asarray(sizes, dtype=np.int64)
+    # element at local position a pairs with the size - 1 - a elements after it
+    local = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    run = np.repeat(sizes, sizes) - 1 - local
+    first = np.repeat(np.arange(len(run)), run)
+    second = first + 1 + np.arange(run.sum()) - np.repeat(np.cumsum(run) - run, run)
+    return first, second
+
+
+def _pairs_across_groups_numpy(sizes):
+    sizes = np.asarray(sizes, dtype=np.int64)
+    n = sizes.sum()
+    group_end = np.repeat(np.cumsum(sizes), sizes)
+    run = n - group_end
+    first = np.repeat(np.arange(n), run)
+    second = np.repeat(group_end, run) + np.arange(run.sum()) - np.repeat(
+        np.cumsum(run) - run, run
+    )
+    return first, second
+
+
+#######################
+#  Numba kernels      #
+#######################
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _bin_number(v, edges):
+        if v == edges[-1]:
+            return len(edges) - 1
+        return np.searchsorted(edges, v, side="right")
+
+    @numba.njit(parallel=True, cache=True)
+    def _bin_segments_numba(P, Q, t, edges_x, edges_y):
+        n = len(t)
+        nx = np.empty(P.shape[0] * n, dtype=np.int64)
+        ny = np.empty(P.shape[0] * n, dtype=np.int64)
+        for b in numba.prange(P.shape[0]):
+            for i in range(n):
+                x = P[b, 0] + t[i] * (Q[b, 0] - P[b, 0])
+                y = P[b, 1] + t[i] * (Q[b, 1] - P[b, 1])
+                nx[b * n + i] = _bin_number(x, edges_x)
+                ny[b * n + i] = _bin_number(y, edges_y)
+        return nx, ny
+
+    @numba.njit(parallel=True, cache=True)
+    def _fill_pairs_within_groups(sizes, starts, offsets, first, second):
+        for g in numba.prange(len(sizes)):
+            k = offsets[g]
+            for a in range(sizes[g]):
+                for b in range(a + 1, sizes[g]):
+                    first[k] = starts[g] + a
+                    second[k] = starts[g] + b
+                    k += 1
+
+    @numba.njit(parallel=True, cache=True)
+    def _fill_pairs_across_groups(group_end, offsets, first, second):
+        n = len(group_end)
+        for i in numba.prange(n):
+            k = offsets[i]
+            for j in range(group_end[i], n):
+                first[k] = i
+                second[k] = j
+                k += 1
+
+
+def _pairs_within_groups_numba(sizes):
+    sizes = np.asarray(sizes, dtype=np.int64)
+    offsets = _pair_offsets(sizes * (sizes - 1) // 2)
+    first = np.empty(offsets[-1], dtype=np.int64)
+    second = np.empty(offsets[-1], dtype=np.int64)
+    _fill_pairs_within_groups(sizes, np.cumsum(sizes) - sizes, offsets, first, second)
+    return first, second
+
+
+def _pairs_across_groups_numba(sizes):
+    sizes = np.asarray(sizes, dtype=np.int64)
+    group_end = np.repeat(np.cumsum(sizes), sizes)
+    offsets = _pair_offsets(sizes.sum() - group_end)
+    first = np.empty(offsets[-1], dtype=np.int64)
+    second = np.empty(offsets[-1], dtype=np.int64)
+    _fill_pairs_across_groups(group_end, offsets, first, second)
+    return first, second
+
+
+#######################
+#  Dispatch           #
+#######################
+
+
+def bin_segments(
+    P, Q, t, edges_x, edges_y, backend: Optional[str] = None
+) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """
+    Samples the segments P[b] -> Q[b] at the fractions t and returns, for every sample (ordered by
+    segment, then by t), its bin numbers along x and y. Bin numbers follow
+    scipy.stats.binned_statistic_2d(expand_binnumbers=True): 0 below the first edge, len(edges)
+    above the last edge and 1, ..., len(edges) - 1 for the bins in between.
+    """
+    args = (
+        np.ascontiguousarray(P, dtype=np.float64),
+        np.ascontiguousarray(Q, dtype=np.float64),
+        np.ascontiguousarray(t, dtype=np.float64),
+        np.ascontiguousarray(edges_x, dtype=np.float64),
+        np.ascontiguousarray(edges_y, dtype=np.float64),
+    )
+    if _resolve(backend) == "numba":
+        return _bin_segments_numba(*args)
+    return _bin_segments_numpy(*args)
+
+
+def pairs_within_groups(
+    sizes, backend: Optional[str] = None
+) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """
+    For consecutive groups with the given sizes, returns the positions (first, second) of all
+    pairs of elements within the same group, in itertools.combinations order per group.
+    """
+    if _resolve(backend) == "numba":
+        return _pairs_within_groups_numba(sizes)
+    return _pairs_within_groups_numpy(sizes)
+
+
+def pairs_across_groups(
+    sizes, backend: Optional[str] = None
+) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """
+    For consecutive groups with the given sizes, returns the positions (first, second), first <
+    second, of all pairs of elements that are in different groups, ordered by first then second.
+    """
+    if _resolve(backend) == "numba":
+        return _pairs_across_groups_numba(sizes)
+    return _pairs_across_groups_numpy(sizes)
@@ -1,8 +1,12 @@
 import numpy as np
 import numpy.typing as npt
-from dataclasses import dataclass, field
-from typing import List, Tuple, Dict
-from .parameters import DomainParameters
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from dataclasses import dataclass, field, replace
+from typing import List, Tuple, Dict, Any, Optional, Iterable, Callable, Sequence, Union
+from .parameters import DomainParameters, DtypePolicy
+from .spatial import SpatialIndex
+from .storage import RowArray, CategoryArray
 
 BEADTYPE = str
 BEADID = int
@@ -15,23 +19,92 @@ FIBREID = int
 ANGLE = Tuple[BEADID, BEADID, BEADID]
 ANGLETYPE = str
 
+AFFINE = npt.NDArray[np.float64]
+
+
+def is_crosslink_type(bond_type: BONDTYPE) -> bool:
+    """All crosslinkers use bond types starting with 'cross' ('cross', 'crosslinker', 'cross_3', ...)."""
+    return str(bond_type).startswith("cross")
+
+
+def _type_codes(types: Sequence[str]) -> Tuple[List[str], npt.NDArray[np.int32]]:
+    """Returns the distinct types and, for every entry, the index of its type in that list."""
+    if isinstance(types, CategoryArray):
+        present = np.bincount(types.codes, minlength=len(types.names)) > 0
+        names = sorted(name for name, used in zip(types.names, present) if used)
+        lookup = {name: code for code, name in enumerate(names)}
+        remap = np.array([lookup.get(name, -1) for name in types.names], dtype=np.int32)
+        return names, remap[types.codes]
+    names = sorted(set(types))
+    lookup = {name: code for code, name in enumerate(names)}
+    codes = np.fromiter(map(lookup.__getitem__, types), dtype=np.int32, count=len(types))
+    return names, codes
+
+
+@dataclass
+class ValidationReport:
+    """
+    Problems found by Network.validate. The array fields hold the ids of the offending bonds,
+    angles or beads and are empty for a valid network.
+    """
+
+    # lists of per-entry data that do not have the length of the lists they belong to
+    length_mismatches: List[str] = field(default_factory=list)
+    bonds_out_of_range: npt.NDArray[np.int64] = field(default_factory=lambda: np.zeros(0, np.int64))
+    angles_out_of_range: npt.NDArray[np.int64] = field(default_factory=lambda: np.zeros(0, np.int64))
+    # bonds from a bead to itself
+    self_bonds: npt.NDArray[np.int64] = field(default_factory=lambda: np.zeros(0, np.int64))
+    # bonds between the same two beads as an earlier bond
+    duplicate_bonds: npt.NDArray[np.int64] = field(default_factory=lambda: np.zeros(0, np.int64))
+    beads_with_multiple_crosslinkers: npt.NDArray[np.int64] = field(
+        default_factory=lambda: np.zeros(0, np.int64)
+    )
+    # angles (a, b, c) where a-b or b-c is not a bond
+    angles_not_bonded: npt.NDArray[np.int64] = field(default_factory=lambda: np.zeros(0, np.int64))
+    missing_bond_details: List[BONDTYPE] = field(default_factory=list)
+    missing_angle_details: List[ANGLETYPE] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not any(len(getattr(self, f)) for f in self.__dataclass_fields__)
+
+    def __str__(self):
+        if self.ok:
+            return "Valid network"
+        problems = []
+        for name in self.__dataclass_fields__:
+            found = getattr(self, name)
+            if len(found):
+                shown = ", ".join(str(x) for x in list(found)[:10])
+                more = f", ... ({len(found)} in total)" if len(found) > 10 else ""
+                problems.append(f"{name.replace('_', ' ')}: {shown}{more}")
+        return "Invalid network, " + "; ".join(problems)
+
 
 @dataclass
 class Network:
     """
     Represents a network of beads, bonds, and angles with associated properties.
+
+    Positions, bonds, angles and fiber ids are stored as contiguous arrays in the dtypes of the
+    network (RowArray), types as one-byte codes (CategoryArray). Assign any sequence to a field and
+    it is converted. The fields are no longer lists, but support the same changes: append, extend,
+    += and item assignment, e.g. 'network.bonds_groups.append((0, 1))' or
+    'network.beads_positions[i] = (x, y)'. Rows are read-only views though, so write a whole row
+    instead of 'network.beads_positions[i][0] = x' (or use 'network.beads_positions[i, 0] = x').
+    Derived structures are rebuilt after any of these changes.
     """
 
     domain: DomainParameters
 
-    beads_positions: List[npt.NDArray[np.float64]] = field(default_factory=list)
-    beads_types: List[BEADTYPE] = field(default_factory=list)
+    beads_positions: RowArray = field(default_factory=RowArray.empty)
+    beads_types: CategoryArray = field(default_factory=CategoryArray.empty)
 
-    bonds_groups: List[BOND] = field(default_factory=list)
-    bonds_types: List[BONDTYPE] = field(default_factory=list)
+    bonds_groups: RowArray = field(default_factory=RowArray.empty)
+    bonds_types: CategoryArray = field(default_factory=CategoryArray.empty)
 
-    angle_groups: List[ANGLE] = field(default_factory=list)
-    angle_types: List[ANGLETYPE] = field(default_factory=list)
+    angle_groups: RowArray = field(default_factory=RowArray.empty)
+    angle_types: CategoryArray = field(default_factory=CategoryArray.empty)
 
     # used to store lengths of types
     details_of_bondtypes: Dict[BONDTYPE, Dict[str, float]] = field(default_factory=dict)
@@ -41,6 +114,29 @@ class Network:
         default_factory=dict
     )
 
+    # dtypes used by the generators and the *_array accessors
+    dtypes: DtypePolicy = field(default_factory=DtypePolicy)
+
+    # fiber of every bead, -1 for beads that are not part of a fiber; empty if fibers are not tracked
+    beads_fibers: RowArray = field(default_factory=RowArray.empty)
+
+    # derived structures (adjacency, ...), see _cached
+    _cache: Dict[Any, Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __setattr__(self, name, value):
+        # fields are converted to their storage once the dtypes are known; in __init__ the dtypes
+        # are assigned after the positions, bonds and angles, which are converted then
+        convert = _STORAGE.get(name)
+        if convert is not None and "dtypes" in self.__dict__:
+            value = convert(value, self.dtypes)
+        object.__setattr__(self, name, value)
+        if name == "dtypes":
+            for other, convert in _STORAGE.items():
+                if other in self.__dict__:
+                    object.__setattr__(self, other, convert(self.__dict__[other], value))
+
     def __radd__(self, other):
         """Implementation of this function allows the use of Network in python 'sum'."""
         if other == 0:
@@ -51,31 +147,29 @@ class Network:
         """
         Combines two networks by merging their beads, bonds, angles.
         """
-        net = Network(self.domain)
-
-        net.beads_positions = [x.copy() for x in self.beads_positions]
-        net.beads_types = [x for x in self.beads_types]
-
-        net.bonds_groups = [x for x in self.bonds_groups]
-        net.bonds_types = [x for x in self.bonds_types]
-
-        net.angle_groups = [x for x in self.angle_groups]
-        net.angle_types = [x for x in self.angle_types]
-
-        bead_id_offset = len(net.beads_positions)
-
-        net.beads_positions += [x.copy() for x in other.beads_positions]
-        net.beads_types += [x for x in other.beads_types]
-
-        net.bonds_groups += [
-            list(map(lambda b: b + bead_id_offset, x)) for x in other.bonds_groups
-        ]
-        net.bonds_types += [x for x in other.bonds_types]
-
-        net.angle_groups += [
-            list(map(lambda b: b + bead_id_offset, x)) for x in other.angle_groups
-        ]
-        net.angle_types += [x for x in other.angle_types]
+        net = Network(self.domain, dtypes=self.dtypes)
+        bead_id_offset = len(self.beads_positions)
+        self.dtypes.check_indices(bead_id_offset + len(other.beads_positions))
+
+        net.beads_positions = self.beads_positions + other.positions_array()
+        net.beads_types = self.beads_types + other.beads_types
+
+        net.bonds_groups = self.bonds_groups + (
+            other.bonds_array().astype(np.int64) + bead_id_offset
+        )
+        net.bonds_types = self.bonds_types + other.bonds_types
+
+        net.angle_groups = self.angle_groups + (
+            other.angles_array().astype(np.int64) + bead_id_offset
+        )
+        net.angle_types = self.angle_types + other.angle_types
+
+        if self.beads_fibers or other.beads_fibers:
+            # a network that does not track fibers gets the fibers formed by its polymer bonds
+            fibers = self.fiber_ids() if self.beads_fibers else self._fibers_from_bonds()
+            other_fibers = other.fiber_ids() if other.beads_fibers else other._fibers_from_bonds()
+            other_fibers[other_fibers >= 0] += fibers.max(initial=-1) + 1
+            net.beads_fibers = np.concatenate([fibers, other_fibers])
 
         new_details = dict()
         for key, value in self.details_of_bondtypes.items():
@@ -106,31 +200,547 @@ class Network:
 
         return net
 
+    def positions_array(self) -> npt.NDArray[np.float64]:
+        """Returns a copy of the bead positions as an (N, 2) array."""
+        return np.array(self.beads_positions.array, dtype=self.dtypes.position)
+
+    def snapshot(self) -> "Network":
+        """
+        Returns a network that shares the positions, bonds, angles, types and fiber ids, and the
+        cached structures already derived from them, with this one; only the domain, the details
+        dictionaries and the cache dictionary are copied, so a snapshot costs the same for every
+        network size. The shared fields are copied on write (see RowArray and CategoryArray) and
+        structures built later are cached by one of the networks only, so the snapshot and this
+        network never affect each other.
+        """
+        copy = replace(
+            self,
+            **{name: getattr(self, name).copy() for name in _STORAGE},
+            domain=replace(self.domain),
+            details_of_bondtypes={k: dict(v) for k, v in self.details_of_bondtypes.items()},
+            details_of_angletypes={k: dict(v) for k, v in self.details_of_angletypes.items()},
+        )
+        copy._cache = dict(self._cache)
+        return copy
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Pickles the network as a few arrays: the read-only arrays of the positions, bonds, angles and
+        fiber ids as they are stored, and the types as their names and codes (see CategoryArray).
+        With protocol 5 and a buffer_callback the arrays are passed out-of-band without copying.
+        Cached structures are not pickled.
+        """
+        types = dict()
+        arrays = dict()
+        for name in ("beads_positions", "bonds_groups", "angle_groups"):
+            arrays[name] = getattr(self, name).array
+        for name in ("beads_types", "bonds_types", "angle_types"):
+            field = getattr(self, name)
+            types[name], arrays[name] = field.names, field.codes
+        if self.beads_fibers:
+            arrays["beads_fibers"] = self.beads_fibers.array
+        return dict(
+            domain=self.domain,
+            dtypes=self.dtypes,
+            details_of_bondtypes=self.details_of_bondtypes,
+            details_of_angletypes=self.details_of_angletypes,
+            type_names=types,
+            arrays=arrays,
+        )
+
+    def __setstate__(self, state: Dict[str, Any]):
+        """
+        Restores a network from __getstate__. The given arrays are used as storage without copying.
+        """
+        arrays = state["arrays"]
+        self.domain = state["domain"]
+        self.dtypes = state["dtypes"]
+        self.details_of_bondtypes = dict(state["details_of_bondtypes"])
+        self.details_of_angletypes = dict(state["details_of_angletypes"])
+        for name in ("beads_positions", "bonds_groups", "angle_groups"):
+            setattr(self, name, RowArray.wrap(arrays[name]))
+        for name, names in state["type_names"].items():
+            setattr(self, name, CategoryArray(names, RowArray.wrap(arrays[name])))
+        fibers = arrays.get("beads_fibers")
+        self.beads_fibers = RowArray.empty() if fibers is None else RowArray.wrap(fibers)
+        self._cache = dict()
+
+    def extend(
+        self,
+        beads_positions=(),
+        beads_types=(),
+        beads_fibers=(),
+        bonds_groups=(),
+        bonds_types=(),
+        angle_groups=(),
+        angle_types=(),
+    ):
+        """
+        Appends entries to the fields. Like every change, this assigns new values to the fields, so
+        snapshots sharing the old ones are not affected.
+        """
+        for name, new in (
+            ("beads_positions", beads_positions),
+            ("beads_types", beads_types),
+            ("beads_fibers", beads_fibers),
+            ("bonds_groups", bonds_groups),
+            ("bonds_types", bonds_types),
+            ("angle_groups", angle_groups),
+            ("angle_types", angle_types),
+        ):
+            if len(new):
+                setattr(self, name, getattr(self, name) + new)
+
+    def fiber_ids(self) -> npt.NDArray[np.int64]:
+        """
+        Returns the fiber of every bead as an array, -1 for beads that are not part of a fiber.
+        All beads get -1 if the network does not track fibers.
+        """
+        n = len(self.beads_positions)
+        if len(self.beads_fibers) == 0:
+            return np.full(n, -1, dtype=np.int64)
+        if len(self.beads_fibers) != n:
+            raise ValueError(f"Got fiber ids for {len(self.beads_fibers)} of {n} beads")
+        return np.array(self.beads_fibers.array, dtype=np.int64)
+
+    def _fibers_from_bonds(self) -> npt.NDArray[np.int64]:
+        """
+        Fiber ids for a network that does not track fibers: the connected components of the polymer
+        bonds, numbered in order of their lowest bead, and -1 for beads without polymer bonds.
+        """
+        adjacency = self.adjacency(bond_types=["polymer"])
+        _, labels = connected_components(adjacency, directed=False)
+        in_fiber = np.diff(adjacency.indptr) > 0
+        fibers = np.full(len(self.beads_positions), -1, dtype=np.int64)
+        # components are labelled in order of their lowest bead
+        fibers[in_fiber] = np.unique(labels[in_fiber], return_inverse=True)[1].ravel()
+        return fibers
+
+    def number_of_fibers(self) -> int:
+        return int(self.fiber_ids().max(initial=-1)) + 1
+
+    def append_fibers(self, beads_per_fiber):
+        """
+        Registers new fibers with the given numbers of beads, for beads that are about to be appended
+        in fiber order. Call this before appending the beads. The fibers are numbered after the
+        existing ones.
+        """
+        beads_per_fiber = np.asarray(beads_per_fiber, dtype=np.int64)
+        fibers = self.fiber_ids()
+        new = fibers.max(initial=-1) + 1 + np.repeat(np.arange(len(beads_per_fiber)), beads_per_fiber)
+        self.beads_fibers = np.concatenate([fibers, new])
+
+    def fiber_offsets(self) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """
+        Returns the beads of every fiber in CSR form (offsets, beads): the beads of fiber k are
+        beads[offsets[k]:offsets[k + 1]], in increasing order. Cached until beads_fibers changes.
+        """
+
+        def build():
+            fibers = self.fiber_ids()
+            in_fiber = np.flatnonzero(fibers >= 0)
+            beads = in_fiber[np.argsort(fibers[in_fiber], kind="stable")]
+            offsets = np.zeros(self.number_of_fibers() + 1, dtype=np.int64)
+            np.cumsum(np.bincount(fibers[in_fiber], minlength=len(offsets) - 1), out=offsets[1:])
+            return offsets, beads
+
+        return self._cached("fiber_offsets", (self.beads_fibers, self.beads_positions), build)
+
+    def invalidate_caches(self):
+        """
+        Drops all cached derived structures. Caches are invalidated automatically when one of the
+        fields they depend on changes, this only frees memory.
+        """
+        self._cache.clear()
+
+    def _cached(
+        self, key, depends_on: Tuple[Union[RowArray, CategoryArray], ...], build: Callable[[], Any]
+    ):
+        """Returns the cached value for 'key', rebuilding it if one of the 'depends_on' fields changed."""
+        stamp = tuple(x.stamp for x in depends_on)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        value = build()
+        self._cache[key] = (stamp, value)
+        return value
+
+    def _bond_selection(self, bond_types: Optional[Iterable[BONDTYPE]]):
+        if bond_types is None:
+            return np.ones(len(self.bonds_groups), dtype=bool)
+        return np.isin(np.array(self.bonds_types, dtype=object), list(bond_types))
+
+    def adjacency(self, bond_types: Optional[Iterable[BONDTYPE]] = None) -> sp.csr_matrix:
+        """
+        Returns the symmetric bead adjacency matrix (CSR, N x N) of the bonds with one of the given
+        types (all bonds if None). The matrix is cached until the bonds change.
+        """
+        key = ("adjacency", None if bond_types is None else frozenset(bond_types))
+
+        def build():
+            bonds = self.bonds_array()[self._bond_selection(bond_types)]
+            n = len(self.beads_positions)
+            rows = np.concatenate([bonds[:, 0], bonds[:, 1]])
+            cols = np.concatenate([bonds[:, 1], bonds[:, 0]])
+            adj = sp.csr_matrix(
+                (np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n)
+            )
+            adj.sum_duplicates()
+            adj.sort_indices()
+            adj.data[:] = 1
+            return adj
+
+        return self._cached(
+            key, (self.bonds_groups, self.bonds_types, self.beads_positions), build
+        )
+
+    def incidence(self, bond_types: Optional[Iterable[BONDTYPE]] = None) -> sp.csr_matrix:
+        """
+        Returns the bead-to-bond incidence matrix (CSR, N beads x M bonds). Column k corresponds to
+        bonds_groups[k]; bonds without one of the given types have an empty column. Cached like 'adjacency'.
+        """
+        key = ("incidence", None if bond_types is None else frozenset(bond_types))
+
+        def build():
+            selected = np.flatnonzero(self._bond_selection(bond_types))
+            bonds = self.bonds_array()[selected]
+            rows = bonds.reshape(-1)
+            cols = np.repeat(selected, 2)
+            return sp.csr_matrix(
+                (np.ones(len(rows), dtype=np.int8), (rows, cols)),
+                shape=(len(self.beads_positions), len(self.bonds_groups)),
+            )
+
+        return self._cached(
+            key, (self.bonds_groups, self.bonds_types, self.beads_positions), build
+        )
+
+    def spatial_index(self) -> SpatialIndex:
+        """
+        Returns a SpatialIndex for bead and bond queries (beads_within, beads_in_box, pairs_within,
+        nearest_bond). It is cached like 'adjacency' until the positions or bonds change.
+        """
+        return self._cached(
+            "spatial_index",
+            (self.beads_positions, self.bonds_groups),
+            lambda: SpatialIndex(self.positions_array(), self.bonds_array()),
+        )
+
+    def bonds_array(self) -> npt.NDArray[np.integer]:
+        """Returns a copy of the bonds as an (M, 2) array of bead ids."""
+        return np.array(self.bonds_groups.array, dtype=self.dtypes.index)
+
+    def angles_array(self) -> npt.NDArray[np.integer]:
+        """Returns a copy of the angles as an (M, 3) array of bead ids."""
+        return np.array(self.angle_groups.array, dtype=self.dtypes.index)
+
+    def validate(
+        self,
+        bond_types_with_defaults: Iterable[BONDTYPE] = ("polymer",),
+        angle_types_with_defaults: Iterable[ANGLETYPE] = ("polymer_bend",),
+    ) -> ValidationReport:
+        """
+        Checks the invariants the simulator relies on, with array operations over all bonds and
+        angles at once, and returns a report of what is wrong.
+
+        Args:
+            bond_types_with_defaults: Bond types that do not need an entry in details_of_bondtypes
+                because the simulator provides their parameters.
+            angle_types_with_defaults: Same for details_of_angletypes.
+        """
+        report = ValidationReport()
+        n = len(self.beads_positions)
+        for data, owner in (
+            ("beads_types", "beads_positions"),
+            ("bonds_types", "bonds_groups"),
+            ("angle_types", "angle_groups"),
+            ("beads_fibers", "beads_positions"),
+        ):
+            if data == "beads_fibers" and not self.beads_fibers:
+                continue
+            if len(getattr(self, data)) != len(getattr(self, owner)):
+                report.length_mismatches.append(data)
+
+        bonds = np.asarray(self.bonds_groups, dtype=np.int64).reshape(-1, 2)
+        angles = np.asarray(self.angle_groups, dtype=np.int64).reshape(-1, 3)
+        bonds_in_range = np.all((bonds >= 0) & (bonds < n), axis=1)
+        report.bonds_out_of_range = np.flatnonzero(~bonds_in_range)
+        report.angles_out_of_range = np.flatnonzero(~((angles >= 0) & (angles < n)).all(axis=1))
+        report.self_bonds = np.flatnonzero(bonds[:, 0] == bonds[:, 1])
+
+        # every bond as a single key, independent of the order of its beads
+        low, high = bonds.min(axis=1), bonds.max(axis=1)
+        keys = low * max(n, 1) + high
+        order = np.argsort(keys, kind="stable")
+        repeated = keys[order][1:] == keys[order][:-1]
+        report.duplicate_bonds = np.sort(order[1:][repeated & bonds_in_range[order][1:]])
+
+        bond_names, bond_codes = _type_codes(self.bonds_types)
+        if len(bond_codes) == len(bonds):
+            is_cross = np.array([is_crosslink_type(t) for t in bond_names], dtype=bool)
+            cross = bonds[is_cross[bond_codes] & bonds_in_range]
+            counts = np.bincount(cross.reshape(-1), minlength=n)
+            report.beads_with_multiple_crosslinkers = np.flatnonzero(counts > 1)
+
+        sorted_keys = keys[order][bonds_in_range[order]]
+        in_range = ((angles >= 0) & (angles < n)).all(axis=1)
+        not_bonded = np.zeros(len(angles), dtype=bool)
+        for a, b in ((0, 1), (1, 2)):
+            angle_keys = np.minimum(angles[:, a], angles[:, b]) * max(n, 1) + np.maximum(
+                angles[:, a], angles[:, b]
+            )
+            if len(sorted_keys) == 0:
+                not_bonded[:] = True
+                break
+            # looking up sorted keys is several times faster than looking them up in random order
+            query = np.argsort(angle_keys)
+            found = np.searchsorted(sorted_keys, angle_keys[query])
+            found = np.minimum(found, len(sorted_keys) - 1)
+            not_bonded[query] |= sorted_keys[found] != angle_keys[query]
+        report.angles_not_bonded = np.flatnonzero(not_bonded & in_range)
+
+        report.missing_bond_details = [
+            typ
+            for typ in bond_names
+            if typ not in self.details_of_bondtypes and typ not in set(bond_types_with_defaults)
+        ]
+        report.missing_angle_details = [
+            typ
+            for typ in sorted(set(self.angle_types))
+            if typ not in self.details_of_angletypes and typ not in set(angle_types_with_defaults)
+        ]
+        return report
+
+    def subnetwork(
+        self,
+        box: Optional[Tuple[float, float, float, float]] = None,
+        mask: Optional[npt.NDArray[np.bool_]] = None,
+        mark_boundary: bool = False,
+    ) -> "Network":
+        """
+        Cuts out the beads in a region, with the bonds and angles that only use those beads. Bead
+        ids are compacted in their original order.
+
+        Args:
+            box: (xmin, ymin, xmax, ymax). Selects the beads in [xmin, xmax) x [ymin, ymax); the
+                subnetwork gets a domain of the size of the box and positions relative to (xmin, ymin).
+            mask: Alternatively a boolean array selecting beads; domain and positions are kept.
+            mark_boundary: Turn selected beads that lost a bond into 'boundary' beads.
+        """
+        if (box is None) == (mask is None):
+            raise ValueError("Give either a box or a mask")
+        pos = self.positions_array()
+        domain = self.domain
+        if box is not None:
+            xmin, ymin, xmax, ymax = box
+            mask = (
+                (pos[:, 0] >= xmin) & (pos[:, 0] < xmax) & (pos[:, 1] >= ymin) & (pos[:, 1] < ymax)
+            )
+            pos = pos - np.array([xmin, ymin], dtype=pos.dtype)
+            domain = replace(domain, sizex=xmax - xmin, sizey=ymax - ymin)
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (len(self.beads_positions),):
+            raise ValueError(f"Mask of shape {mask.shape} for {len(self.beads_positions)} beads")
+
+        kept = np.flatnonzero(mask)
+        remap = np.full(len(mask), -1, dtype=np.int64)
+        remap[kept] = np.arange(len(kept))
+
+        bonds = self.bonds_array()
+        kept_bonds = mask[bonds].all(axis=1)
+        angles = self.angles_array()
+        kept_angles = mask[angles].all(axis=1)
+
+        beads_types = np.array(self.beads_types, dtype=object)
+        if mark_boundary:
+            cut = bonds[mask[bonds].sum(axis=1) == 1].reshape(-1)
+            beads_types[cut[mask[cut]]] = "boundary"
+
+        net = Network(
+            domain,
+            details_of_bondtypes=dict(self.details_of_bondtypes),
+            details_of_angletypes=dict(self.details_of_angletypes),
+            dtypes=self.dtypes,
+        )
+        net.extend(
+            beads_positions=pos[kept],
+            beads_types=beads_types[kept],
+            beads_fibers=self.fiber_ids()[kept] if self.beads_fibers else (),
+            bonds_groups=remap[bonds[kept_bonds]],
+            bonds_types=self.bonds_types[kept_bonds],
+            angle_groups=remap[angles[kept_angles]],
+            angle_types=self.angle_types[kept_angles],
+        )
+        return net
+
+    def set_positions(self, positions: npt.NDArray[np.float64]):
+        """Stores a copy of an (N, 2) array as bead positions."""
+        if len(positions) != len(self.beads_positions):
+            raise ValueError(
+                f"Got {len(positions)} positions for {len(self.beads_positions)} beads"
+            )
+        self.beads_positions = RowArray.of(positions, self.dtypes.position, 2)
+
+
+# field name -> conversion of an assigned value to the storage of that field
+_STORAGE: Dict[str, Callable[[Any, DtypePolicy], Any]] = dict(
+    beads_positions=lambda value, dtypes: RowArray.of(value, dtypes.position, 2),
+    bonds_groups=lambda value, dtypes: RowArray.of(value, dtypes.index, 2),
+    angle_groups=lambda value, dtypes: RowArray.of(value, dtypes.index, 3),
+    beads_fibers=lambda value, dtypes: RowArray.of(value, dtypes.fiber),
+    beads_types=lambda value, dtypes: CategoryArray.of(value),
+    bonds_types=lambda value, dtypes: CategoryArray.of(value),
+    angle_types=lambda value, dtypes: CategoryArray.of(value),
+)
+
 
 def rotate_network(network: Network, angle):
     """
     Rotates the network by a specified angle around the center of the domain.
     """
-    shift_x = network.domain.sizex / 2
-    shift_y = network.domain.sizey / 2
+    center = (network.domain.sizex / 2, network.domain.sizey / 2)
+    transform_network(network, rotation_matrix(angle, center))
 
-    pos = np.array(network.beads_positions)
 
-    pos[:, 0] -= shift_x
-    pos[:, 1] -= shift_y
+def _as_affine(matrix) -> AFFINE:
+    """Returns the (..., 3, 3) homogeneous form of (..., 2, 3) or (..., 3, 3) matrices."""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.shape[-2:] == (3, 3):
+        return matrix
+    if matrix.shape[-2:] != (2, 3):
+        raise ValueError(f"Expected 2x3 or 3x3 affine matrices, got shape {matrix.shape}")
+    out = np.zeros(matrix.shape[:-2] + (3, 3))
+    out[..., :2, :] = matrix
+    out[..., 2, 2] = 1.0
+    return out
 
-    rotation_matrix = np.array(
-        [
-            [np.cos(angle), -np.sin(angle)],
-            [np.sin(angle), np.cos(angle)],
-        ]
+
+def compose(*matrices) -> AFFINE:
+    """
+    Composes affine matrices into a single 2x3 matrix. The first matrix is applied first,
+    i.e. compose(A, B) maps x to B(A(x)). Stacks of matrices are composed elementwise.
+    """
+    result = np.eye(3)
+    for matrix in matrices:
+        result = _as_affine(matrix) @ result
+    return result[..., :2, :]
+
+
+def translation_matrix(dx, dy) -> AFFINE:
+    """Affine matrix that shifts all positions by (dx, dy)."""
+    return np.array([[1.0, 0.0, dx], [0.0, 1.0, dy]])
+
+
+def _around(linear, center) -> AFFINE:
+    cx, cy = center
+    return compose(
+        translation_matrix(-cx, -cy),
+        np.column_stack([linear, np.zeros(2)]),
+        translation_matrix(cx, cy),
     )
-    pos[:, :2] = (rotation_matrix @ (pos[:, :2].transpose())).transpose()
 
-    pos[:, 0] += shift_x
-    pos[:, 1] += shift_y
 
-    network.beads_positions = pos.tolist()
+def rotation_matrix(angle, center=(0.0, 0.0)) -> AFFINE:
+    """Affine matrix rotating counterclockwise by 'angle' around 'center'."""
+    c, s = np.cos(angle), np.sin(angle)
+    return _around(np.array([[c, -s], [s, c]]), center)
+
+
+def scaling_matrix(sx, sy=None, center=(0.0, 0.0)) -> AFFINE:
+    """Affine matrix scaling by (sx, sy) around 'center'. If sy is omitted the scaling is isotropic."""
+    sy = sx if sy is None else sy
+    return _around(np.array([[sx, 0.0], [0.0, sy]]), center)
+
+
+def shear_matrix(gamma_xy, gamma_yx=0.0, center=(0.0, 0.0)) -> AFFINE:
+    """Affine matrix for a simple shear: x += gamma_xy * y and y += gamma_yx * x (relative to 'center')."""
+    return _around(np.array([[1.0, gamma_xy], [gamma_yx, 1.0]]), center)
+
+
+def _bead_mask(network: Network, types) -> npt.NDArray[np.bool_]:
+    return np.isin(np.array(network.beads_types, dtype=object), list(types))
+
+
+def _apply_affine(pos, matrix: AFFINE):
+    pos[:, :2] = pos[:, :2] @ matrix[:2, :2].T + matrix[:2, 2]
+
+
+def _wrap(pos, domain: DomainParameters):
+    pos[:, 0] %= domain.sizex
+    pos[:, 1] %= domain.sizey
+
+
+def transform_network(network: Network, matrix, types=None, wrap: bool = False):
+    """
+    Applies an affine transformation (2x3 or 3x3 matrix) to the bead positions in place.
+
+    Args:
+        matrix: The affine matrix. Build it with the *_matrix helpers and 'compose'.
+        types: If given, only beads with one of these bead types are transformed.
+        wrap: Wrap the transformed positions back into the periodic box [0, sizex) x [0, sizey).
+    """
+    matrix = _as_affine(matrix)
+    pos = network.positions_array()
+    if types is None:
+        _apply_affine(pos, matrix)
+        if wrap:
+            _wrap(pos, network.domain)
+    else:
+        mask = _bead_mask(network, types)
+        sub = pos[mask]
+        _apply_affine(sub, matrix)
+        if wrap:
+            _wrap(sub, network.domain)
+        pos[mask] = sub
+    network.set_positions(pos)
+
+
+def wrap_network(network: Network):
+    """Wraps all bead positions into the periodic box [0, sizex) x [0, sizey) in place."""
+    pos = network.positions_array()
+    _wrap(pos, network.domain)
+    network.set_positions(pos)
+
+
+def transform_networks(networks: List[Network], matrices, types=None, wrap: bool = False):
+    """
+    Batched version of 'transform_network': applies matrices[k] to networks[k], in place, with a
+    single vectorized pass over the beads of all networks. 'matrices' is either one matrix that
+    is applied to all networks or a stack of shape (len(networks), 2, 3).
+    """
+    matrices = _as_affine(matrices)
+    if matrices.ndim == 2:
+        matrices = np.broadcast_to(matrices, (len(networks), 3, 3))
+    if len(matrices) != len(networks):
+        raise ValueError(
+            f"Got {len(matrices)} matrices for {len(networks)} networks"
+        )
+    if len(networks) == 0:
+        return
+
+    positions = [network.positions_array() for network in networks]
+    counts = np.array([len(p) for p in positions])
+    pos = np.concatenate(positions, axis=0)
+    owner = np.repeat(np.arange(len(networks)), counts)
+
+    if types is None:
+        mask = np.ones(len(pos), dtype=bool)
+    else:
+        mask = np.concatenate([_bead_mask(network, types) for network in networks])
+
+    A = matrices[owner[mask], :2, :2]
+    t = matrices[owner[mask], :2, 2]
+    pos[mask, :2] = np.einsum("nij,nj->ni", A, pos[mask, :2]) + t
+
+    if wrap:
+        size = np.array(
+            [[network.domain.sizex, network.domain.sizey] for network in networks],
+            dtype=np.float64,
+        )
+        pos[mask, :2] %= size[owner[mask]]
+
+    for network, new_pos in zip(networks, np.split(pos, np.cumsum(counts)[:-1])):
+        network.set_positions(new_pos)
 
 
 class NetworkBuilder:
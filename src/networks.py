@@ -46,6 +46,7 @@ def random_network(
     crosslink_bin_size,
     seed=None,
     fix_boundary=False,
+    dtypes=None,
 ) -> Network:
     """Generate a randomly oriented network."""
     nt = NetworkType(
@@ -69,6 +70,7 @@ def random_network(
             seed=seed,
         ),
         seed=seed,
+        dtypes=dtypes,
     )
     return nt.generate()
 
@@ -91,6 +93,7 @@ def fibrin_network(
     fix_boundary_east=False,
     fix_boundary_west=False,
     crosslink_angles=True,
+    dtypes=None,
 ) -> Network:
     """Same as directed network except uses a different (faster) crosslinking algorithm."""
     nt = NetworkType(
@@ -124,6 +127,7 @@ def fibrin_network(
             seed=seed,
         ),
         seed=seed,
+        dtypes=dtypes,
         crosslink_angles=crosslink_angles,
     )
     return nt.generate()
@@ -146,6 +150,7 @@ def random_directed_network(
     fix_boundary_south=False,
     fix_boundary_east=False,
     fix_boundary_west=False,
+    dtypes=None,
 ) -> Network:
     """A random network where the anisotropy can be controlled with the 'direction_spread' and 'direction_angle' parameters."""
     nt = NetworkType(
@@ -179,6 +184,7 @@ def random_directed_network(
             seed=seed,
         ),
         seed=seed,
+        dtypes=dtypes,
     )
     return nt.generate()
 
@@ -349,20 +355,13 @@ def laminin(
     y_dist_spread=0.0,
 ):
 
-    pixel_to_bead = defaultdict(list)
-    x_pos = []
-    y_pos = []
-    for k, pos in enumerate(network.beads_positions):
-        nx, ny = int(pos[0]), int(pos[1])
-        pixel_to_bead[nx, ny].append(k)
-        x_pos.append(nx)
-        y_pos.append(ny)
+    rng = np.random.default_rng(seed)
 
     locx = sizex // 2
     a_x = (0 - locx) / x_dist_spread
     b_x = (sizex - locx) / x_dist_spread
     x_pos = truncnorm.rvs(
-        a_x, b_x, loc=locx, scale=x_dist_spread, size=amount_of_laminin
+        a_x, b_x, loc=locx, scale=x_dist_spread, size=amount_of_laminin, random_state=rng
     )
 
     if y_dist_spread > 0:
@@ -370,23 +369,23 @@ def laminin(
         a_y = (0 - locy) / y_dist_spread
         b_y = (sizey - locy) / y_dist_spread
         y_pos = truncnorm.rvs(
-            a_y, b_y, loc=locy, scale=y_dist_spread, size=amount_of_laminin
+            a_y, b_y, loc=locy, scale=y_dist_spread, size=amount_of_laminin, random_state=rng
         )
     else:
-        y_pos = np.random.uniform(0, sizey, size=amount_of_laminin)
-
-    # This can be smaller than amount_of_laminin
-    free_beads_that_get_laminin_connection = itertools.chain(
-        *[
-            pixel_to_bead[int(x), int(y)]
-            for (x, y) in zip(x_pos, y_pos)
-            if (int(x), int(y)) in pixel_to_bead.keys()
-        ]
-    )
+        y_pos = rng.uniform(0, sizey, size=amount_of_laminin)
+
+    # Every bead in the pixel of a laminin site gets a connection, so this can be smaller than
+    # amount_of_laminin
+    index = network.spatial_index()
+    free_beads_that_get_laminin_connection = [
+        int(k)
+        for x, y in zip(x_pos, y_pos)
+        for k in index.beads_in_box(int(x), int(y), int(x) + 1, int(y) + 1)
+    ]
 
     # free_beads_that_get_laminin_connection = _random_laminin_positions(seed, network.beads_types, amount_of_laminin)
     laminin_positions = [
-        network.beads_positions[k] for k in free_beads_that_get_laminin_connection
+        network.beads_positions[k].copy() for k in free_beads_that_get_laminin_connection
     ]
     laminin_types = ["boundary"] * len(laminin_positions)
     laminin_ids = [
@@ -402,11 +401,13 @@ def laminin(
         "r0": 0.0,  # used
     }
 
-    network.beads_positions.extend(laminin_positions)
-    network.beads_types.extend(laminin_types)
-
-    network.bonds_groups.extend(laminin_bonds)
-    network.bonds_types.extend(laminin_bonds_types)
+    network.extend(
+        beads_positions=laminin_positions,
+        beads_types=laminin_types,
+        beads_fibers=[-1] * len(laminin_positions) if network.beads_fibers else [],
+        bonds_groups=laminin_bonds,
+        bonds_types=laminin_bonds_types,
+    )
 
 
 def single_strand(
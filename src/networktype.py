@@ -2,7 +2,7 @@ import numpy as np
 import numpy.typing as npt
 from typing import Optional
 from .strandgens import StrandGenerator
-from .parameters import DomainParameters
+from .parameters import DomainParameters, DtypePolicy
 from .crosslink_distributors import CrosslinkDistributer
 
 from .network import Network
@@ -22,12 +22,15 @@ class NetworkType:
         crosslink_distributor: Optional[CrosslinkDistributer],
         seed: Optional[int] = None,
         crosslink_angles=False,
+        dtypes: Optional[DtypePolicy] = None,
+        validate: bool = False,
     ):
         self._strand_generator: StrandGenerator = strandgenerator
         self._crosslink_distributor = crosslink_distributor
         self._rng = np.random.default_rng(seed=seed)
-        self._network = Network(domain)
+        self._network = Network(domain, dtypes=dtypes or DtypePolicy())
         self._crosslink_angles = crosslink_angles
+        self._validate = validate
 
         logger.info(
             "Initiate NetworkType with %s and crosslinked with %s"
@@ -43,6 +46,10 @@ class NetworkType:
             self._crosslink_distributor.distribute_crosslinkers(self._network)
             if self._crosslink_angles:
                 self._crosslink_distributor.add_crosslink_angles(self._network)
+        if self._validate:
+            report = self._network.validate()
+            if not report.ok:
+                raise ValueError(str(report))
         return self._network
 
     @property
@@ -1,10 +1,12 @@
 from dataclasses import dataclass, field
 
+import numpy as np
+
 
 @dataclass
 class DomainParameters:
-    sizex: int
-    sizey: int
+    sizex: float
+    sizey: float
 
     fix_boundary: bool = field(default=False)
     fix_boundary_north: bool = field(default=False)
@@ -27,6 +29,22 @@ class RandomStrandGeneratorParameters:
     contour_length_of_strand: float
 
 
+@dataclass
+class SemiflexibleStrandGeneratorParameters(RandomStrandGeneratorParameters):
+    # bending stiffness / kT; the tangent correlation in 2-D is exp(-s / (2 persistence_length))
+    persistence_length: float
+
+
+@dataclass
+class ExcludedVolumeParameters:
+    min_distance: float
+
+    # number of candidate strands proposed at once
+    batch_size: int = field(default=256)
+    # give up after max_attempts * number_of_strands candidates
+    max_attempts: int = field(default=100)
+
+
 @dataclass
 class StrandDensityCrosslinkDistributerParameters:
     crosslink_max_r: float
@@ -35,3 +53,26 @@ class StrandDensityCrosslinkDistributerParameters:
     number_of_strands: int
 
     crosslink_bin_size: float
+
+
+@dataclass(frozen=True)
+class DtypePolicy:
+    """Storage dtypes of bead positions and of the bead ids in bonds and angles."""
+
+    position: type = np.float64
+    index: type = np.int64
+
+    @property
+    def fiber(self) -> np.dtype:
+        """Dtype of the fiber ids: the signed integer of the size of the index dtype (-1 is no fiber)."""
+        return np.dtype(f"i{np.dtype(self.index).itemsize}")
+
+    def check_indices(self, number_of_beads: int):
+        """Raises an OverflowError if the bead ids 0, ..., number_of_beads - 1 do not fit in the index dtype."""
+        if number_of_beads - 1 > np.iinfo(self.index).max:
+            raise OverflowError(
+                f"{number_of_beads} beads do not fit in index dtype {np.dtype(self.index).name}"
+            )
+
+
+SINGLE_PRECISION = DtypePolicy(position=np.float32, index=np.uint32)
@@ -0,0 +1,97 @@
+import numpy as np
+import numpy.typing as npt
+from typing import FrozenSet, Iterable, Optional
+from scipy.sparse.csgraph import connected_components
+
+from .network import Network, BEADID
+from .strandgens import SIDES, boundary_sides
+
+# pairs of opposite sides; a cluster touching both sides of a pair spans the domain
+SPANNING_PAIRS = (("north", "south"), ("east", "west"))
+
+
+class PercolationTracker:
+    """
+    Tracks the clusters of a network while crosslinks are added, with a union-find over the
+    clusters the network already has (its fibers, joined by any bonds already present). Every
+    cluster knows which sides of the domain it touches, i.e. has a bead beyond (see
+    boundary_sides, the criterion of fix_boundaries). The network spans the domain as soon as one
+    cluster touches the north and south or the east and west side.
+
+    Adding a crosslink costs O(1) amortized, so the crosslink count at which the network first
+    spans is found in one pass over the crosslinks instead of by regenerating networks.
+    """
+
+    def __init__(self, network: Network):
+        number, labels = connected_components(network.adjacency(), directed=False)
+        self._cluster_of_bead = labels
+        self._parent = list(range(number))
+        self._rank = [0] * number
+
+        bit_of_side = {side: 1 << k for k, side in enumerate(SIDES)}
+        touched = np.zeros(number, dtype=np.int64)
+        for side, beyond in boundary_sides(network.positions_array(), network.domain).items():
+            np.bitwise_or.at(touched, labels[beyond], bit_of_side[side])
+        self._sides = touched.tolist()
+        self._spanning_masks = [
+            bit_of_side[first] | bit_of_side[second] for first, second in SPANNING_PAIRS
+        ]
+        self._bit_of_side = bit_of_side
+
+        self.number_of_crosslinks = 0
+        # number_of_crosslinks when the network first spanned the domain, None while it does not
+        self.spanned_at: Optional[int] = None
+        for sides in self._sides:
+            if self._spans(sides):
+                self.spanned_at = 0
+                break
+
+    def _spans(self, sides: int) -> bool:
+        return any(sides & mask == mask for mask in self._spanning_masks)
+
+    def _find(self, cluster: int) -> int:
+        parent = self._parent
+        while parent[cluster] != cluster:
+            # path halving
+            parent[cluster] = parent[parent[cluster]]
+            cluster = parent[cluster]
+        return cluster
+
+    @property
+    def spanning(self) -> bool:
+        return self.spanned_at is not None
+
+    def add_crosslink(self, bead1: BEADID, bead2: BEADID) -> bool:
+        """Joins the clusters of the two beads. Returns whether the network spans the domain now."""
+        self.number_of_crosslinks += 1
+        root1 = self._find(int(self._cluster_of_bead[bead1]))
+        root2 = self._find(int(self._cluster_of_bead[bead2]))
+        if root1 != root2:
+            if self._rank[root1] < self._rank[root2]:
+                root1, root2 = root2, root1
+            self._parent[root2] = root1
+            if self._rank[root1] == self._rank[root2]:
+                self._rank[root1] += 1
+            self._sides[root1] |= self._sides[root2]
+            if self.spanned_at is None and self._spans(self._sides[root1]):
+                self.spanned_at = self.number_of_crosslinks
+        return self.spanning
+
+    def sides(self, bead: BEADID) -> FrozenSet[str]:
+        """The sides of the domain touched by the cluster of a bead."""
+        sides = self._sides[self._find(int(self._cluster_of_bead[bead]))]
+        return frozenset(side for side, bit in self._bit_of_side.items() if sides & bit)
+
+
+def percolation_threshold(network: Network, crosslinks: Iterable) -> Optional[int]:
+    """
+    The number of crosslinks, taken in the given order, after which the network with these
+    crosslinks added spans the domain (0 if it already does), or None if it never does.
+    """
+    tracker = PercolationTracker(network)
+    if tracker.spanning:
+        return 0
+    for bead1, bead2 in crosslinks:
+        if tracker.add_crosslink(bead1, bead2):
+            break
+    return tracker.spanned_at
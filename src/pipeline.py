@@ -0,0 +1,104 @@
+from dataclasses import astuple, is_dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .network import Network
+from .parameters import DomainParameters, DtypePolicy
+from .strandgens import StrandGenerator
+from .crosslink_distributors import CrosslinkDistributer
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _parameters_key(obj) -> Any:
+    par = getattr(obj, "_par", None)
+    return astuple(par) if is_dataclass(par) and not isinstance(par, type) else None
+
+
+class NetworkPipeline:
+    """
+    Generates networks like NetworkType, but keeps the result of every stage for reuse:
+
+        strands     built by the strand generator,
+        boundaries  the strands after fix_boundaries,
+        crosslinks  run for every call of generate.
+
+    A stage is rebuilt only when what it depends on changes: the strand generator (compared with
+    'is'), its parameters and the domain. Structures derived from the strands, such as the
+    crosslink bins and candidate pairs, are cached on the stage network and shared by all
+    crosslinking passes. A sweep over crosslink parameters therefore builds the
+    strands once:
+
+        pipeline = NetworkPipeline(domain, strand_generator)
+        for par in sweep:
+            network = pipeline.generate(StrandDensityCrosslinkDistributerFast(par, seed))
+
+    Crosslink distributors remember their selection, so pass a new one to every generate call.
+    """
+
+    def __init__(
+        self,
+        domain: DomainParameters,
+        strandgenerator: StrandGenerator,
+        dtypes: Optional[DtypePolicy] = None,
+    ):
+        self.domain = domain
+        self.strand_generator = strandgenerator
+        self._dtypes = dtypes or DtypePolicy()
+        # stage name -> (strand generator, key, network); the generator is kept so that it is
+        # compared by identity without its id being reused
+        self._stages: Dict[str, Tuple[StrandGenerator, Any, Network]] = dict()
+
+    def _stage(self, name, build) -> Network:
+        key = (_parameters_key(self.strand_generator), astuple(self.domain))
+        cached = self._stages.get(name)
+        if cached is not None and cached[0] is self.strand_generator and cached[1] == key:
+            return cached[2]
+        logger.info("Building stage %s", name)
+        network = build()
+        self._stages[name] = (self.strand_generator, key, network)
+        return network
+
+    def strands(self) -> Network:
+        """The network after the strand stage. Do not modify it, use generate instead."""
+
+        def build():
+            network = Network(self.domain, dtypes=self._dtypes)
+            self.strand_generator.build_strands(network)
+            return network
+
+        return self._stage("strands", build)
+
+    def boundaries(self) -> Network:
+        """The network after fixing the boundaries. Do not modify it, use generate instead."""
+        strands = self.strands()
+
+        def build():
+            network = strands.snapshot()
+            network.domain = self.domain
+            self.strand_generator.fix_boundaries(network)
+            return network
+
+        return self._stage("boundaries", build)
+
+    def generate(
+        self,
+        crosslink_distributor: Optional[CrosslinkDistributer] = None,
+        crosslink_angles: bool = False,
+    ) -> Network:
+        """
+        Returns a snapshot of the cached boundaries stage, crosslinked by crosslink_distributor. Like
+        every snapshot it shares its arrays with the stages until it is changed (see
+        Network.snapshot).
+        """
+        network = self.boundaries().snapshot()
+        if crosslink_distributor:
+            crosslink_distributor.distribute_crosslinkers(network)
+            if crosslink_angles:
+                crosslink_distributor.add_crosslink_angles(network)
+        return network
+
+    def clear(self):
+        """Forgets all stages."""
+        self._stages.clear()
@@ -0,0 +1,155 @@
+import numpy as np
+import numpy.typing as npt
+from scipy.spatial import cKDTree
+from typing import Callable, List
+
+from .parameters import ExcludedVolumeParameters
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+_NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+class _HashGrid:
+    """
+    Uniform grid of cell size 'cell_size' for 2D points, stored as a hashed cell list: every hash
+    slot keeps a linked list of the points whose cell hashes to it. Memory is proportional to the
+    number of points, not to the area that they cover.
+    """
+
+    def __init__(self, cell_size: float, capacity: int):
+        self._cell_size = cell_size
+        self._mask = (1 << max(int(2 * capacity - 1).bit_length(), 4)) - 1
+        self._head = np.full(self._mask + 1, -1, dtype=np.int64)
+        self._next = np.full(capacity, -1, dtype=np.int64)
+        self._points = np.empty((capacity, 2))
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def _cells(self, points):
+        return np.floor(points / self._cell_size).astype(np.int64)
+
+    def _slot(self, cx, cy):
+        return ((cx * 73856093) ^ (cy * 19349663)) & self._mask
+
+    def insert(self, points: npt.NDArray[np.float64]):
+        k = len(points)
+        if self._n + k > len(self._next):
+            raise ValueError("Grid capacity exceeded")
+        ids = np.arange(self._n, self._n + k)
+        self._points[ids] = points
+        cells = self._cells(points)
+        slots = self._slot(cells[:, 0], cells[:, 1])
+
+        # chain the new points per slot, the last one of every slot points to the old head
+        order = np.argsort(slots, kind="stable")
+        slots, ids = slots[order], ids[order]
+        last_of_slot = np.r_[slots[1:] != slots[:-1], True]
+        first_of_slot = np.r_[True, slots[1:] != slots[:-1]]
+        self._next[ids[~last_of_slot]] = ids[1:][~last_of_slot[:-1]]
+        self._next[ids[last_of_slot]] = self._head[slots[last_of_slot]]
+        self._head[slots[first_of_slot]] = ids[first_of_slot]
+        self._n += k
+
+    def any_within(self, points: npt.NDArray[np.float64], r: float) -> npt.NDArray[np.bool_]:
+        """For every point, whether a stored point lies closer than r. Requires r <= cell_size."""
+        hit = np.zeros(len(points), dtype=bool)
+        cells = self._cells(points)
+        r2 = r * r
+        for dx, dy in _NEIGHBOURS:
+            query = np.arange(len(points))
+            cur = self._head[self._slot(cells[:, 0] + dx, cells[:, 1] + dy)]
+            active = cur >= 0
+            query, cur = query[active], cur[active]
+            while len(cur):
+                d = self._points[cur] - points[query]
+                hit[query[np.einsum("ij,ij->i", d, d) < r2]] = True
+                cur = self._next[cur]
+                active = cur >= 0
+                query, cur = query[active], cur[active]
+        return hit
+
+
+class ExcludedVolumePlacement:
+    """
+    Places strands one after another such that no two beads of different strands come closer than
+    min_distance. Candidate strands are proposed in batches and checked against a uniform grid of all
+    accepted beads; candidates of the same batch are checked against each other, and kept in order
+    of proposal.
+    """
+
+    def __init__(self, par: ExcludedVolumeParameters):
+        self._par = par
+
+    def place(
+        self,
+        propose: Callable[[int], npt.NDArray[np.float64]],
+        number_of_strands: int,
+    ) -> npt.NDArray[np.float64]:
+        """
+        Draws candidates from 'propose' (n -> (n, number_of_beads, 2) positions) until
+        number_of_strands strands are placed and returns their positions. Raises a RuntimeError
+        when that takes more than max_attempts * number_of_strands candidates.
+        """
+        d = self._par.min_distance
+        placed = []
+        number_placed = 0
+        attempts = 0
+        grid = None
+
+        while number_placed < number_of_strands:
+            if attempts >= self._par.max_attempts * number_of_strands:
+                raise RuntimeError(
+                    f"Could only place {number_placed} of {number_of_strands} strands with a minimal "
+                    f"distance of {d} in {attempts} attempts"
+                )
+            candidates = propose(self._par.batch_size)
+            attempts += len(candidates)
+            number_of_beads = candidates.shape[1]
+            if grid is None:
+                grid = _HashGrid(d, number_of_strands * number_of_beads)
+
+            # against all beads that are already placed
+            free = ~grid.any_within(candidates.reshape(-1, 2), d)
+            free = np.all(free.reshape(len(candidates), number_of_beads), axis=1)
+            candidates = candidates[free]
+
+            # against each other, earlier candidates win
+            accepted = self._resolve_batch(candidates, d)
+            accepted = accepted[: number_of_strands - number_placed]
+            if len(accepted):
+                grid.insert(candidates[accepted].reshape(-1, 2))
+                placed.append(candidates[accepted])
+                number_placed += len(accepted)
+
+        _logger.debug(
+            "Placed %s strands with excluded volume in %s attempts"
+            % (number_of_strands, attempts)
+        )
+        return np.concatenate(placed)
+
+    @staticmethod
+    def _resolve_batch(candidates, d) -> npt.NDArray[np.int64]:
+        if len(candidates) == 0:
+            return np.zeros(0, dtype=np.int64)
+        number_of_beads = candidates.shape[1]
+        pairs = cKDTree(candidates.reshape(-1, 2)).query_pairs(
+            np.nextafter(d, 0), output_type="ndarray"
+        )
+        strands = pairs // number_of_beads
+        strands = np.sort(strands[strands[:, 0] != strands[:, 1]], axis=1)
+        if len(strands) == 0:
+            return np.arange(len(candidates))
+
+        # a candidate is rejected if it overlaps an earlier candidate that was accepted
+        conflicts: List[List[int]] = [[] for _ in range(len(candidates))]
+        for earlier, later in np.unique(strands, axis=0):
+            conflicts[later].append(earlier)
+        accepted = np.zeros(len(candidates), dtype=bool)
+        for k in range(len(candidates)):
+            accepted[k] = not any(accepted[j] for j in conflicts[k])
+        return np.flatnonzero(accepted)
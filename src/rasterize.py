@@ -0,0 +1,134 @@
+import numpy as np
+import numpy.typing as npt
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .network import Network, BONDTYPE, is_crosslink_type
+
+LAYERS = ("density", "orientation", "order", "crosslinks")
+
+
+def lattice_shape(network: Network, pixel_size: float) -> Tuple[int, int]:
+    """Shape (ny, nx) of a lattice with square pixels of 'pixel_size' covering the domain."""
+    return (
+        int(np.ceil(network.domain.sizey / pixel_size)),
+        int(np.ceil(network.domain.sizex / pixel_size)),
+    )
+
+
+def rasterize_network(
+    network: Network,
+    shape: Optional[Tuple[int, int]] = None,
+    pixel_size: float = 1.0,
+    layers: Iterable[str] = ("density", "orientation", "crosslinks"),
+    fiber_types: Iterable[BONDTYPE] = ("polymer",),
+    samples_per_pixel: float = 2.0,
+    chunk_size: int = 1_000_000,
+    dtype=np.float32,
+) -> Dict[str, npt.NDArray]:
+    """
+    Rasterizes fields of the network onto a lattice covering the domain. Note that this lattice is
+    independent of the crosslink binning lattice, so it can match the CPM lattice.
+
+    Every fiber segment is split into sub-segments of at most 1 / samples_per_pixel pixel, each
+    contributing its length to the pixel that contains its midpoint. All requested layers are
+    accumulated from the same samples, so the bonds are traversed once, in chunks of chunk_size
+    samples; a long bond on a fine lattice is split over several chunks.
+
+    Args:
+        shape: Lattice shape (ny, nx). Defaults to pixels of 'pixel_size'.
+        layers: Any of
+            'density': fiber length per unit area,
+            'orientation': local director angle in [0, pi) of the fibers (NaN in empty pixels),
+            'order': local nematic order parameter in [0, 1] (NaN in empty pixels),
+            'crosslinks': number of crosslinkers per unit area, counted at their midpoints.
+        fiber_types: Bond types that make up the fibers.
+
+    Returns:
+        A dictionary with one (ny, nx) array per layer.
+    """
+    layers = tuple(layers)
+    for layer in layers:
+        if layer not in LAYERS:
+            raise ValueError(f"Unknown layer {layer!r}, choose from {LAYERS}")
+
+    ny, nx = shape if shape is not None else lattice_shape(network, pixel_size)
+    px = network.domain.sizex / nx
+    py = network.domain.sizey / ny
+    size = nx * ny
+
+    pos = network.positions_array()[:, :2].astype(np.float64)
+    bonds = network.bonds_array()
+    types, codes = np.unique(np.array(network.bonds_types, dtype=str), return_inverse=True)
+    fiber = np.isin(types, list(fiber_types))[codes]
+    crosslink = np.array([is_crosslink_type(typ) for typ in types], dtype=bool)[codes]
+
+    need_tensor = "orientation" in layers or "order" in layers
+    length_sum = np.zeros(size)
+    qxx = np.zeros(size if need_tensor else 0)
+    qxy = np.zeros(size if need_tensor else 0)
+    crosslinks = np.zeros(size)
+
+    def pixel_of(points):
+        ix = np.floor(points[:, 0] / px).astype(np.int64)
+        iy = np.floor(points[:, 1] / py).astype(np.int64)
+        inside = (ix >= 0) & (iy >= 0) & (ix < nx) & (iy < ny)
+        return iy * nx + ix, inside
+
+    fiber_bonds = bonds[fiber]
+    step = min(px, py) / samples_per_pixel
+    P = pos[fiber_bonds[:, 0]]
+    v = pos[fiber_bonds[:, 1]] - P
+    length = np.linalg.norm(v, axis=1)
+    n = np.maximum(np.ceil(length / step).astype(np.int64), 1)
+    weight = length / n
+    if need_tensor:
+        theta = np.arctan2(v[:, 1], v[:, 0])
+        cos2, sin2 = np.cos(2 * theta), np.sin(2 * theta)
+
+    # samples are numbered consecutively over all bonds, bond b owns samples [first[b], end[b])
+    end = np.cumsum(n)
+    first = end - n
+    total = int(end[-1]) if len(end) else 0
+    for start in range(0, total, chunk_size):
+        sample = np.arange(start, min(start + chunk_size, total))
+        owner = np.searchsorted(end, sample, side="right")
+        t = (sample - first[owner] + 0.5) / n[owner]
+        flat, inside = pixel_of(P[owner] + t[:, None] * v[owner])
+        flat, owner = flat[inside], owner[inside]
+        w = weight[owner]
+
+        length_sum += np.bincount(flat, weights=w, minlength=size)
+        if need_tensor:
+            qxx += np.bincount(flat, weights=w * cos2[owner], minlength=size)
+            qxy += np.bincount(flat, weights=w * sin2[owner], minlength=size)
+
+    if "crosslinks" in layers:
+        cross_bonds = bonds[crosslink]
+        flat, inside = pixel_of(0.5 * (pos[cross_bonds[:, 0]] + pos[cross_bonds[:, 1]]))
+        crosslinks += np.bincount(flat[inside], minlength=size)
+
+    fields: Dict[str, npt.NDArray] = dict()
+    if "density" in layers:
+        fields["density"] = length_sum / (px * py)
+    if "crosslinks" in layers:
+        fields["crosslinks"] = crosslinks / (px * py)
+    if need_tensor:
+        empty = length_sum == 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if "orientation" in layers:
+                orientation = np.mod(0.5 * np.arctan2(qxy, qxx), np.pi)
+                orientation[empty] = np.nan
+                fields["orientation"] = orientation
+            if "order" in layers:
+                fields["order"] = np.hypot(qxx, qxy) / length_sum
+
+    return {
+        layer: fields[layer].reshape(ny, nx).astype(dtype, copy=False)
+        for layer in layers
+    }
+
+
+def save_fields(path, fields: Dict[str, npt.NDArray]):
+    """Writes rasterized fields to a single .npz file with one array per layer."""
+    arrays: Dict[str, Any] = dict(fields)
+    np.savez(path, **arrays)
@@ -39,14 +39,17 @@ class RegularNetwork(StrandGenerator):
         bondsgroup, bondstype = self._bond_gen(network.domain)
         anglegroup, angletypes = self._angle_gen(network.domain)
 
-        network.beads_positions.extend(pos)
-        network.beads_types.extend(typeid)
-
-        network.bonds_groups.extend(bondsgroup)
-        network.bonds_types.extend(bondstype)
-
-        network.angle_groups.extend(anglegroup)
-        network.angle_types.extend(angletypes)
+        network.append_fibers(
+            [self._par.number_of_beads_per_strand] * self._par.number_of_strands
+        )
+        network.extend(
+            beads_positions=pos,
+            beads_types=typeid,
+            bonds_groups=bondsgroup,
+            bonds_types=bondstype,
+            angle_groups=anglegroup,
+            angle_types=angletypes,
+        )
 
         return network
 
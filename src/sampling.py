@@ -0,0 +1,199 @@
+import copy
+import numpy as np
+import numpy.typing as npt
+from typing import Optional
+
+
+class AliasTable:
+    """
+    Walker's alias method for drawing indices i with probability weights[i] / sum(weights).
+    Building the table is O(n) and every draw afterwards is O(1), so a table should be built once
+    and reused for all draws from the same weights.
+    """
+
+    def __init__(self, weights, rng: Optional[np.random.Generator] = None):
+        weights = np.asarray(weights, dtype=np.float64).ravel()
+        if len(weights) == 0 or np.any(weights < 0) or not np.isfinite(weights).all():
+            raise ValueError("Weights must be a non-empty array of finite non-negative numbers")
+        total = weights.sum()
+        if total <= 0:
+            raise ValueError("At least one weight must be positive")
+
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self._n = len(weights)
+        self.prob, self.alias = self._build(weights * (self._n / total))
+
+    @staticmethod
+    def _build(q):
+        """
+        Vose's construction, vectorized over rounds: in every round the deficits (1 - q) of all
+        under-full columns are laid out consecutively against the excesses (q - 1) of the over-full
+        columns, and every under-full column takes the over-full column at the start of its deficit
+        as alias. Over-full columns that end up under-full are handled in the next round.
+        """
+        n = len(q)
+        q = q.copy()
+        prob = np.ones(n)
+        alias = np.arange(n)
+
+        small = np.flatnonzero(q < 1.0)
+        large = np.flatnonzero(q >= 1.0)
+        while len(small) and len(large):
+            deficit = 1.0 - q[small]
+            excess = q[large] - 1.0
+            start = np.cumsum(deficit) - deficit
+            owner = np.searchsorted(np.cumsum(excess), start, side="right")
+            owner = np.minimum(owner, len(large) - 1)
+
+            prob[small] = q[small]
+            alias[small] = large[owner]
+
+            absorbed = np.bincount(owner, weights=deficit, minlength=len(large))
+            q[large] -= absorbed
+            now_small = q[large] < 1.0
+            small = large[now_small]
+            large = large[~now_small]
+        # columns left over are full up to rounding errors
+        prob[small] = 1.0
+        return prob, alias
+
+    def with_rng(self, rng: np.random.Generator) -> "AliasTable":
+        """The same table, drawing with another generator."""
+        table = copy.copy(self)
+        table._rng = rng
+        return table
+
+    def sample(self, size=None) -> npt.NDArray[np.int64]:
+        """Draws 'size' indices with replacement."""
+        column = self._rng.integers(0, self._n, size=size)
+        accept = self._rng.random(size=size) < self.prob[column]
+        return np.where(accept, column, self.alias[column])
+
+
+def gumbel_top_k(
+    weights, k: int, rng: Optional[np.random.Generator] = None
+) -> npt.NDArray[np.int64]:
+    """
+    Draws up to k distinct indices without replacement, with probabilities proportional to the
+    weights (same distribution as drawing one by one and removing each drawn index). Indices with
+    zero weight are never drawn, so fewer than k indices are returned if there are fewer than k
+    positive weights. The indices are returned in the order in which they would have been drawn.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    weights = np.asarray(weights, dtype=np.float64).ravel()
+    candidates = np.flatnonzero(weights > 0)
+    k = min(k, len(candidates))
+    if k == 0:
+        return np.zeros(0, dtype=np.int64)
+    keys = np.log(weights[candidates]) + rng.gumbel(size=len(candidates))
+    if k < len(candidates):
+        top = np.argpartition(-keys, k - 1)[:k]
+    else:
+        top = np.arange(len(candidates))
+    return candidates[top[np.argsort(-keys[top])]]
+
+
+class WeightedReservoir:
+    """
+    Streaming weighted sampling of exactly k items without replacement (A-Res, Efraimidis and
+    Spirakis): every offered item gets the key u ** (1 / weight), u uniform on (0, 1), and the k
+    items with the largest keys are kept. The result has the same distribution as drawing k items
+    one by one from everything offered and removing each drawn item, but memory stays proportional
+    to k plus the largest batch. Keys are kept as log(u) / weight for numerical stability.
+    """
+
+    def __init__(self, k: int, rng: Optional[np.random.Generator] = None):
+        if k < 0:
+            raise ValueError("k must be non-negative")
+        self.k = k
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self._items: list = []
+        self._keys: list = []
+        self._size = 0
+        # keys at or below the threshold can no longer enter the reservoir
+        self._threshold = -np.inf
+
+    def offer(self, items, weights=None):
+        """Offers a batch of items (rows of an array) with the given weights (default: all 1)."""
+        items = np.asarray(items)
+        n = len(items)
+        if n == 0 or self.k == 0:
+            return
+        u = 1.0 - self._rng.random(n)  # in (0, 1]
+        if weights is None:
+            keys = np.log(u)
+        else:
+            weights = np.asarray(weights, dtype=np.float64)
+            with np.errstate(divide="ignore"):
+                keys = np.log(u) / weights
+            keys[~(weights > 0)] = -np.inf
+        keep = keys > self._threshold
+        self._items.append(items[keep])
+        self._keys.append(keys[keep])
+        self._size += int(keep.sum())
+        if self._size > 2 * self.k:
+            self._compact()
+
+    def _compact(self):
+        items = np.concatenate(self._items)
+        keys = np.concatenate(self._keys)
+        if len(keys) > self.k:
+            top = np.argpartition(-keys, self.k - 1)[: self.k]
+            items, keys = items[top], keys[top]
+            self._threshold = keys.min()
+        self._items, self._keys, self._size = [items], [keys], len(keys)
+
+    def __len__(self) -> int:
+        return min(self._size, self.k)
+
+    def result(self) -> np.ndarray:
+        """
+        The sampled items in the order in which they would have been drawn. Fewer than k items are
+        returned if fewer than k items with positive weight were offered.
+        """
+        if not self._items:
+            return np.zeros(0)
+        self._compact()
+        items, keys = self._items[0], self._keys[0]
+        valid = np.isfinite(keys)
+        items, keys = items[valid], keys[valid]
+        return items[np.argsort(-keys, kind="stable")]
+
+
+class ProbabilityMap:
+    """
+    A spatially varying, non-negative factor on probabilities, e.g. to impose a gradient of
+    crosslinks. 'values' is either an (ny, nx) array covering the domain, where pixel (iy, ix)
+    covers [ix, ix + 1) * sizex / nx along x and [iy, iy + 1) * sizey / ny along y (the layout of
+    rasterize_network), or a vectorized callable f(x, y) that returns the factors for arrays of
+    coordinates. Points outside the domain get the value of the nearest pixel.
+    """
+
+    def __init__(self, values):
+        if callable(values):
+            self._function = values
+            self.values = None
+            return
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.size == 0:
+            raise ValueError(f"Expected a non-empty (ny, nx) array, got shape {values.shape}")
+        if np.any(values < 0) or not np.isfinite(values).all():
+            raise ValueError("Probability map values must be finite and non-negative")
+        self._function = None
+        self.values = values
+
+    def __call__(self, points, domain) -> npt.NDArray[np.float64]:
+        """The factors at the given (N, 2) points of a domain with sizes domain.sizex, domain.sizey."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        x, y = points[:, 0], points[:, 1]
+        if self._function is not None:
+            factors = np.broadcast_to(
+                np.asarray(self._function(x, y), dtype=np.float64), (len(points),)
+            )
+            if np.any(factors < 0) or not np.isfinite(factors).all():
+                raise ValueError("Probability map values must be finite and non-negative")
+            return factors
+        ny, nx = self.values.shape
+        ix = np.clip(np.floor(x * (nx / domain.sizex)), 0, nx - 1).astype(np.int64)
+        iy = np.clip(np.floor(y * (ny / domain.sizey)), 0, ny - 1).astype(np.int64)
+        return self.values[iy, ix]
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from .network import Network
+
+
+@dataclass(frozen=True)
+class SharedNetwork:
+    """
+    A handle to a network whose arrays are in a block of shared memory, see share_network. It only
+    holds the name of the block, the layout of the arrays in it and the small non-array state of the
+    network, so it is cheap to pickle and send to another process.
+    """
+
+    name: str
+    # array name -> (dtype, shape, offset in bytes)
+    layout: Dict[str, Tuple[str, Tuple[int, ...], int]]
+    state: Dict[str, Any]
+
+    def unlink(self):
+        """Frees the shared memory without attaching, for a network that is not needed after all."""
+        shm = shared_memory.SharedMemory(name=self.name)
+        shm.close()
+        shm.unlink()
+
+
+class _SharedArray:
+    """Exposes an array in a shared memory block to numpy, keeping the block open while it is used."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, dtype, shape, offset):
+        self._shm = shm
+        address = np.asarray(shm.buf).ctypes.data + offset
+        self.__array_interface__ = dict(
+            shape=tuple(shape), typestr=np.dtype(dtype).str, data=(address, False), version=3
+        )
+
+
+_ALIGNMENT = 64
+
+
+def share_network(network: Network) -> SharedNetwork:
+    """
+    Copies the arrays of a network (see Network.__getstate__) into a new block of shared memory and
+    returns a handle to it. Return the handle from a worker process instead of the network and call
+    attach_network on it in the receiving process, which then uses the arrays without copying them.
+
+    Ownership of the block passes to the handle: exactly one process must call attach_network or
+    SharedNetwork.unlink on it, otherwise the memory is not freed until reboot.
+    """
+    state = network.__getstate__()
+    arrays = state.pop("arrays")
+
+    layout = dict()
+    size = 0
+    for name, array in arrays.items():
+        layout[name] = (array.dtype.str, array.shape, size)
+        size += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        for name, array in arrays.items():
+            dtype, shape, offset = layout[name]
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = array
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    shm.close()
+    # the receiving process unlinks the block, so this process must not clean it up at exit
+    resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    return SharedNetwork(shm.name, layout, state)
+
+
+def attach_network(handle: SharedNetwork, unlink: bool = True) -> Network:
+    """
+    Returns the network of a handle from share_network. Its positions, bonds and angles are views of
+    the shared memory, which stays mapped as long as any of them is in use. With unlink=True (the
+    default) the block is unlinked right away, so it is freed as soon as the network is gone; pass
+    unlink=False to attach the same handle in several processes and call SharedNetwork.unlink
+    once at the end.
+    """
+    shm = shared_memory.SharedMemory(name=handle.name)
+    arrays = {
+        name: np.asarray(_SharedArray(shm, dtype, shape, offset))
+        for name, (dtype, shape, offset) in handle.layout.items()
+    }
+    if unlink:
+        shm.unlink()
+    network = Network.__new__(Network)
+    network.__setstate__(dict(handle.state, arrays=arrays))
+    return network
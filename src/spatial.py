@@ -0,0 +1,90 @@
+import numpy as np
+import numpy.typing as npt
+from scipy.spatial import cKDTree
+from typing import Optional, Tuple
+
+
+class SpatialIndex:
+    """
+    Spatial queries on the beads and bonds of a network. The KD-tree over bead positions and the
+    KD-tree over bond midpoints are built on first use. Get one with Network.spatial_index(), which
+    caches it until the positions or bonds change.
+    """
+
+    def __init__(self, positions, bonds):
+        self._pos = np.ascontiguousarray(positions, dtype=np.float64).reshape(-1, 2)
+        self._bonds = np.asarray(bonds, dtype=np.int64).reshape(-1, 2)
+        self._tree: Optional[cKDTree] = None
+        self._bond_tree: Optional[cKDTree] = None
+
+    @property
+    def tree(self) -> cKDTree:
+        if self._tree is None:
+            self._tree = cKDTree(self._pos)
+        return self._tree
+
+    def beads_within(self, point, r: float) -> npt.NDArray[np.int64]:
+        """Sorted ids of the beads within distance r of point."""
+        return np.sort(np.asarray(self.tree.query_ball_point(point, r), dtype=np.int64))
+
+    def beads_in_box(self, xmin, ymin, xmax, ymax) -> npt.NDArray[np.int64]:
+        """Sorted ids of the beads in [xmin, xmax) x [ymin, ymax)."""
+        center = (0.5 * (xmin + xmax), 0.5 * (ymin + ymax))
+        half = 0.5 * max(xmax - xmin, ymax - ymin)
+        ids = self.beads_within_chebyshev(center, half)
+        x, y = self._pos[ids, 0], self._pos[ids, 1]
+        return ids[(x >= xmin) & (x < xmax) & (y >= ymin) & (y < ymax)]
+
+    def beads_within_chebyshev(self, point, r: float) -> npt.NDArray[np.int64]:
+        """Sorted ids of the beads in the square of half side r around point."""
+        return np.sort(
+            np.asarray(self.tree.query_ball_point(point, r, p=np.inf), dtype=np.int64)
+        )
+
+    def pairs_within(self, r: float) -> npt.NDArray[np.int64]:
+        """All pairs (i, j), i < j, of beads at most r apart, as a (K, 2) array sorted by i then j."""
+        pairs = self.tree.query_pairs(r, output_type="ndarray")
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def nearest_bond(self, points) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        """
+        For (K, 2) points, the id of the nearest bond segment and the distance to it. A bond with
+        segment distance d has its midpoint within d + (longest bond) / 2, so the candidates are the
+        bonds whose midpoints lie within that radius of the bond with the nearest midpoint.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(self._bonds) == 0:
+            raise ValueError("The network has no bonds")
+        P = self._pos[self._bonds[:, 0]]
+        Q = self._pos[self._bonds[:, 1]]
+        if self._bond_tree is None:
+            self._bond_tree = cKDTree(0.5 * (P + Q))
+            self._half_length = 0.5 * np.linalg.norm(Q - P, axis=1).max()
+
+        _, closest = self._bond_tree.query(points)
+        bound = _segment_distance(points, P[closest], Q[closest])
+        # the margin keeps the closest midpoint itself among the candidates despite rounding
+        radius = (bound + self._half_length) * (1 + 1e-9) + 1e-12
+        found = self._bond_tree.query_ball_point(points, radius)
+
+        counts = np.fromiter(map(len, found), dtype=np.int64, count=len(points))
+        owner = np.repeat(np.arange(len(points)), counts)
+        candidates = np.fromiter(
+            (b for bonds in found for b in bonds), dtype=np.int64, count=counts.sum()
+        )
+        distance = _segment_distance(points[owner], P[candidates], Q[candidates])
+
+        # per point, the candidate with the smallest distance (ties: smallest bond id)
+        order = np.lexsort((candidates, distance, owner))
+        first = np.cumsum(counts) - counts
+        best = order[first]
+        return candidates[best], distance[best]
+
+
+def _segment_distance(points, P, Q) -> npt.NDArray[np.float64]:
+    v = Q - P
+    length2 = np.einsum("ij,ij->i", v, v)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.einsum("ij,ij->i", points - P, v) / length2
+    t = np.clip(np.nan_to_num(t), 0.0, 1.0)
+    return np.linalg.norm(points - (P + t[:, None] * v), axis=1)
@@ -0,0 +1,347 @@
+import numpy as np
+import numpy.typing as npt
+from collections.abc import Sequence
+from typing import Iterable, List, Optional, Tuple
+
+
+class _Buffer:
+    """
+    Backing array of one or more RowArrays; rows [0, used) are filled. Only the 'writer', if any,
+    may change filled rows in place: it is the single RowArray using the buffer. 'version' counts
+    those changes.
+    """
+
+    __slots__ = ("data", "used", "writer", "version")
+
+    def __init__(self, data: np.ndarray, used: int, writer: Optional["RowArray"] = None):
+        self.data = data
+        self.used = used
+        self.writer = writer
+        self.version = 0
+
+
+class RowArray(Sequence):
+    """
+    Sequence of fixed-width rows (bead positions, bonds, angles) stored in one contiguous array, or
+    of scalars (fiber ids) stored in a 1-D array. Items are read-only views of the rows and
+    np.asarray returns a read-only view of the whole array without copying.
+
+    'a + rows' returns a new RowArray and leaves 'a' unchanged. If 'a' ends where the filled part of
+    its buffer ends, the new rows are written into spare capacity after it and both share the
+    buffer, so growing a network with 'network.bonds_groups = network.bonds_groups + new' costs
+    O(len(new)) amortized.
+
+    Like a list, a RowArray can also be changed in place with append, extend, += and item
+    assignment ('a[i] = row', 'a[i, 0] = x'); the rows themselves stay read-only, so 'a[i][0] = x'
+    raises. Item assignment copies the array first if it shares its buffer with another RowArray
+    (copy-on-write), so it never changes a concatenation, a copy or a snapshot.
+    """
+
+    __slots__ = ("_buffer", "_length", "_view")
+
+    # spare capacity reserved when a concatenation has to reallocate: this fraction of the length
+    # plus 8 rows
+    _GROWTH = 0.125
+
+    def __init__(self, buffer: _Buffer, length: int):
+        self._set(buffer, length)
+
+    def _set(self, buffer: _Buffer, length: int):
+        self._buffer = buffer
+        self._length = length
+        self._view = buffer.data[:length]
+        self._view.flags.writeable = False
+
+    @classmethod
+    def wrap(cls, array: np.ndarray) -> "RowArray":
+        """A RowArray using 'array' itself as storage. Do not change 'array' afterwards."""
+        return cls(_Buffer(array, len(array)), len(array))
+
+    @classmethod
+    def of(cls, rows, dtype, width=None) -> "RowArray":
+        """
+        Converts rows (a RowArray, an array or a sequence of rows) to a RowArray of the given dtype,
+        with rows of 'width' entries or scalars if width is None. A RowArray of the right dtype and
+        shape is returned as is, anything else is copied.
+        """
+        shape = () if width is None else (width,)
+        if isinstance(rows, cls) and rows.dtype == np.dtype(dtype) and rows.array.shape[1:] == shape:
+            return rows
+        array = np.array(rows, dtype=dtype)
+        if width is not None:
+            array = array.reshape(-1, width)
+        elif array.ndim != 1:
+            raise ValueError(f"Expected a sequence of scalars, got an array of shape {array.shape}")
+        return cls._owning(array)
+
+    @classmethod
+    def _owning(cls, array: np.ndarray) -> "RowArray":
+        """A RowArray using a new 'array' as storage that it may change in place."""
+        result = cls.wrap(array)
+        result._buffer.writer = result
+        return result
+
+    @classmethod
+    def empty(cls) -> "RowArray":
+        """An empty RowArray; assigning it to a network field converts it to the dtype of the field."""
+        return cls.wrap(np.zeros(0))
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._view.dtype
+
+    @property
+    def array(self) -> np.ndarray:
+        """The rows as a read-only array."""
+        return self._view
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return RowArray._owning(self._view[key].copy())
+        return self._view[key]
+
+    def __iter__(self):
+        return iter(self._view)
+
+    def __contains__(self, row) -> bool:
+        row = np.asarray(row)
+        if self._view.ndim == 1:
+            return bool(np.any(self._view == row))
+        return bool(np.any(np.all(self._view == row, axis=1)))
+
+    def _grown(self, rows) -> Tuple[_Buffer, int]:
+        """The buffer and length of this array with rows appended, see __add__."""
+        shape = self._view.shape[1:]
+        new = np.asarray(rows, dtype=self.dtype)
+        n, m = self._length, len(new)
+        buffer = self._buffer
+        if m == 0:
+            return buffer, n
+        new = new.reshape((-1,) + shape)
+        if buffer.used != n or len(buffer.data) < n + m:
+            capacity = n + m + int(self._GROWTH * (n + m)) + 8
+            data = np.empty((capacity,) + shape, dtype=self.dtype)
+            data[:n] = self._view
+            buffer = _Buffer(data, n)
+        buffer.data[n : n + m] = new
+        buffer.used = n + m
+        return buffer, n + m
+
+    def __add__(self, rows) -> "RowArray":
+        buffer, length = self._grown(rows)
+        if length == self._length:
+            return self
+        result = RowArray(buffer, length)
+        if buffer is self._buffer:
+            # both use the filled rows now
+            buffer.writer = None
+        else:
+            buffer.writer = result
+        return result
+
+    def __radd__(self, rows) -> "RowArray":
+        return RowArray.of(rows, self.dtype, *self._view.shape[1:]) + self
+
+    def extend(self, rows):
+        """Appends rows in place, amortized O(len(rows)) like concatenation."""
+        buffer, length = self._grown(rows)
+        if buffer is not self._buffer:
+            buffer.writer = self
+        self._set(buffer, length)
+
+    def append(self, row):
+        self.extend([row])
+
+    def __iadd__(self, rows) -> "RowArray":
+        self.extend(rows)
+        return self
+
+    def __setitem__(self, key, value):
+        if self._buffer.writer is not self:
+            # copy-on-write: other RowArrays may use the filled rows of the buffer
+            self._set(_Buffer(self._view.copy(), self._length, writer=self), self._length)
+        self._buffer.data[: self._length][key] = value
+        self._buffer.version += 1
+
+    def copy(self) -> "RowArray":
+        """A copy that shares the buffer until either of the two is changed in place (O(1))."""
+        self._buffer.writer = None
+        return RowArray(self._buffer, self._length)
+
+    @property
+    def stamp(self) -> Tuple[_Buffer, int, int]:
+        """Changes whenever the contents change; used to invalidate structures derived from them."""
+        return (self._buffer, self._length, self._buffer.version)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (Sequence, np.ndarray)) or len(other) != len(self):
+            return False
+        return bool(np.array_equal(self._view, np.asarray(other)))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is not None and np.dtype(dtype) != self.dtype:
+            return self._view.astype(dtype)
+        return self._view.copy() if copy else self._view
+
+    def __reduce__(self):
+        return (RowArray.wrap, (self._view.copy(),))
+
+    def __repr__(self):
+        return f"RowArray({self._view.tolist()!r}, dtype={self.dtype.name})"
+
+    def tolist(self) -> list:
+        return self._view.tolist()
+
+
+def _code_dtype(number_of_names: int) -> np.dtype:
+    return np.dtype(np.uint8 if number_of_names <= 256 else np.uint16 if number_of_names <= 65536 else np.int32)
+
+
+class CategoryArray(Sequence):
+    """
+    Sequence of type names (bead, bond and angle types) stored as small integer codes into a tuple
+    of distinct names, so one entry costs one byte for up to 256 types. Items are strings. New names
+    are appended to the names, so concatenation keeps the existing codes and is amortized like
+    RowArray. It is changed in place like a list and like RowArray: append, extend, += and item
+    assignment ('types[i] = name', 'types[mask] = name').
+    """
+
+    __slots__ = ("names", "_codes", "_lookup")
+
+    def __init__(self, names: Tuple[str, ...], codes: RowArray):
+        self.names = tuple(names)
+        self._codes = codes
+        self._lookup = {name: code for code, name in enumerate(self.names)}
+
+    @classmethod
+    def of(cls, values) -> "CategoryArray":
+        """Converts a sequence of names to a CategoryArray; a CategoryArray is returned as is."""
+        if isinstance(values, cls):
+            return values
+        names, codes = _encode(values, ())
+        return cls(names, RowArray._owning(codes.astype(_code_dtype(len(names)))))
+
+    @classmethod
+    def empty(cls) -> "CategoryArray":
+        return cls.of(())
+
+    @property
+    def codes(self) -> npt.NDArray[np.integer]:
+        """Read-only array with the index into 'names' of every entry."""
+        return self._codes.array
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.names[self._codes[key]]
+        return CategoryArray(self.names, RowArray.wrap(np.array(self.codes[key], ndmin=1)))
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __contains__(self, name) -> bool:
+        code = self._lookup.get(name)
+        return code is not None and bool(np.any(self.codes == code))
+
+    def count(self, name) -> int:
+        code = self._lookup.get(name)
+        return 0 if code is None else int(np.count_nonzero(self.codes == code))
+
+    def _encoded(self, values) -> Tuple[Tuple[str, ...], RowArray, npt.NDArray[np.int64]]:
+        """
+        The names extended by new values, the codes in a dtype that fits them and the codes of the
+        values.
+        """
+        if isinstance(values, CategoryArray):
+            names, mapping = _encode(values.names, self.names)
+            new_codes = mapping[values.codes]
+        else:
+            names, new_codes = _encode(values, self.names)
+        codes = self._codes
+        dtype = _code_dtype(len(names))
+        if dtype != codes.dtype:
+            codes = RowArray._owning(codes.array.astype(dtype))
+        return names, codes, new_codes
+
+    def _set(self, names: Tuple[str, ...], codes: RowArray):
+        if names != self.names:
+            self.names = names
+            self._lookup = {name: code for code, name in enumerate(names)}
+        self._codes = codes
+
+    def __add__(self, values) -> "CategoryArray":
+        names, codes, new_codes = self._encoded(values)
+        if len(new_codes) == 0:
+            return self
+        return CategoryArray(names, codes + new_codes)
+
+    def extend(self, values):
+        names, codes, new_codes = self._encoded(values)
+        if codes is self._codes:
+            codes.extend(new_codes)
+        else:
+            codes = codes + new_codes
+        self._set(names, codes)
+
+    def append(self, name):
+        self.extend([name])
+
+    def __iadd__(self, values) -> "CategoryArray":
+        self.extend(values)
+        return self
+
+    def __setitem__(self, key, value):
+        single = isinstance(value, str)
+        names, codes, new_codes = self._encoded([value] if single else value)
+        codes[key] = new_codes[0] if single else new_codes
+        self._set(names, codes)
+
+    def copy(self) -> "CategoryArray":
+        """A copy that shares the codes until either of the two is changed in place (O(1))."""
+        return CategoryArray(self.names, self._codes.copy())
+
+    @property
+    def stamp(self) -> Tuple[_Buffer, int, int]:
+        """Changes whenever the contents change, see RowArray.stamp."""
+        return self._codes.stamp
+
+    def __radd__(self, values) -> "CategoryArray":
+        return CategoryArray.of(values) + self
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (Sequence, np.ndarray)) or len(other) != len(self):
+            return False
+        if isinstance(other, CategoryArray) and other.names == self.names:
+            return bool(np.array_equal(self.codes, other.codes))
+        return self.tolist() == list(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __array__(self, dtype=None, copy=None):
+        values = np.array(self.names, dtype=object)[self.codes]
+        return values if dtype is None else values.astype(dtype)
+
+    def __reduce__(self):
+        return (CategoryArray, (self.names, self._codes))
+
+    def __repr__(self):
+        return f"CategoryArray({self.tolist()!r})"
+
+    def tolist(self) -> List[str]:
+        return np.array(self.names, dtype=object)[self.codes].tolist()
+
+
+def _encode(values: Iterable[str], names: Tuple[str, ...]) -> Tuple[Tuple[str, ...], npt.NDArray[np.int64]]:
+    """Codes of values into names, extended by the values not in names (in order of appearance)."""
+    lookup = {name: code for code, name in enumerate(names)}
+    codes = np.fromiter(
+        (lookup.setdefault(value, len(lookup)) for value in values), dtype=np.int64
+    )
+    return tuple(str(name) for name in lookup), codes
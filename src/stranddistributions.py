@@ -1,7 +1,9 @@
 import numpy.typing as npt
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import Optional, Callable
+from typing import Optional, Callable, Set
+
+from .sampling import AliasTable
 
 
 class StrandDistribution(ABC):
@@ -17,6 +19,93 @@ class StrandDistribution(ABC):
     def angle_dist(self, n) -> npt.NDArray[np.float64]:
         pass
 
+    def sample(self, n) -> npt.NDArray[np.float64]:
+        """
+        Returns n strands as an (n, 3) array of center x, center y and angle. The strand generators
+        only call this method. By default it calls pos_x_dist, pos_y_dist and angle_dist in that
+        order; distributions that draw the three jointly override it.
+        """
+        strands = np.empty((n, 3))
+        strands[:, 0] = self.pos_x_dist(n)
+        strands[:, 1] = self.pos_y_dist(n)
+        strands[:, 2] = self.angle_dist(n)
+        return strands
+
+
+class JointStrandDistribution(StrandDistribution):
+    """
+    Base class of distributions that implement sample. Every pos_x_dist call draws n new strands with
+    sample, and pos_y_dist and angle_dist with the same n return the y coordinates and angles of
+    those strands (once each), so the three methods can still be called one after another. Called
+    otherwise, they draw new strands as well.
+    """
+
+    # the strands drawn by the last pos_x_dist call and the columns of them not returned yet
+    _pending: Optional[npt.NDArray[np.float64]] = None
+    _unread: Set[int] = set()
+
+    @abstractmethod
+    def sample(self, n) -> npt.NDArray[np.float64]:
+        pass
+
+    def _column(self, column, n):
+        strands = self._pending
+        if strands is None or len(strands) != n or column not in self._unread:
+            strands = self.sample(n)
+        else:
+            self._unread = self._unread - {column}
+        return strands[:, column]
+
+    def pos_x_dist(self, n):
+        self._pending = self.sample(n)
+        self._unread = {1, 2}
+        return self._pending[:, 0]
+
+    def pos_y_dist(self, n):
+        return self._column(1, n)
+
+    def angle_dist(self, n):
+        return self._column(2, n)
+
+
+class BufferedStrandDistribution(JointStrandDistribution):
+    """
+    Draws strands from another distribution in chunks of chunk_size and hands them out from the
+    buffer, which amortizes the cost of the random number calls when many small batches are drawn,
+    e.g. one network of a few strands per iteration of an ensemble loop. The strands are distributed
+    as those of the wrapped distribution, but for a seeded distribution they differ from the
+    strands it would give without the buffer. A DeterministicStrandDistribution only has its fixed
+    list of strands and can not be buffered.
+    """
+
+    def __init__(self, distribution: StrandDistribution, chunk_size: int = 1 << 16):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if isinstance(distribution, DeterministicStrandDistribution):
+            raise ValueError(
+                "A DeterministicStrandDistribution gives exactly its own strands, use it without "
+                "BufferedStrandDistribution"
+            )
+        self._distribution = distribution
+        self._chunk_size = chunk_size
+        self._buffer = np.zeros((0, 3))
+        self._used = 0
+
+    def sample(self, n) -> npt.NDArray[np.float64]:
+        available = len(self._buffer) - self._used
+        if n > available:
+            # keep the unused strands and draw at least one chunk more
+            self._buffer = np.concatenate(
+                [
+                    self._buffer[self._used :],
+                    self._distribution.sample(max(n - available, self._chunk_size)),
+                ]
+            )
+            self._used = 0
+        strands = self._buffer[self._used : self._used + n]
+        self._used += n
+        return strands
+
 class StrandDistributionGeneral(StrandDistribution):
     def __init__(
             self,
@@ -42,10 +131,7 @@ class UniformStrandDistribution(StrandDistribution):
     def __init__(self, sizex, sizey, seed: Optional[int] = None):
         self._sizex = sizex
         self._sizey = sizey
-        if seed:
-            self._rng = np.random.default_rng(seed)
-        else:
-            self._rng = np.random.default_rng()
+        self._rng = np.random.default_rng(seed)
 
     def pos_x_dist(self, n):
         """
@@ -64,10 +150,7 @@ class VonMisesStrandDistribution(StrandDistribution):
         self._uniform_strand_distribution = UniformStrandDistribution(sizex,sizey,seed)
         self._mu = mu
         self._kappa = kappa
-        if seed:
-            self._rng = np.random.default_rng(seed)
-        else:
-            self._rng = np.random.default_rng()
+        self._rng = np.random.default_rng(seed)
     
     def pos_x_dist(self, n):
         return self._uniform_strand_distribution.pos_x_dist(n)
@@ -107,3 +190,54 @@ class DeterministicStrandDistribution(StrandDistribution):
                 f"There are {n} samples requested but we onlangle have {len(self._angle_samples)}"
             )
         return self._angle_samples
+
+
+class DensityMapStrandDistribution(JointStrandDistribution):
+    """
+    Places strand centers according to a density image: an (ny, nx) array of non-negative weights
+    covering the domain, where pixel (iy, ix) covers [ix, ix + 1) * sizex / nx along x and
+    [iy, iy + 1) * sizey / ny along y (the layout of rasterize_network). Pixels are drawn with
+    probability proportional to their weight from an alias table, and centers uniformly within the
+    pixel, so x and y are drawn jointly.
+
+    Orientations are uniform, or with an angle_field ((ny, nx) angles in radians, e.g. the
+    'orientation' layer of rasterize_network) the angle of the pixel of the center, with von Mises
+    noise of concentration kappa if kappa is given. Pixels with a NaN angle get uniform angles.
+    """
+
+    def __init__(
+        self,
+        density,
+        sizex,
+        sizey,
+        angle_field=None,
+        kappa: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        density = np.asarray(density, dtype=np.float64)
+        if density.ndim != 2:
+            raise ValueError(f"Expected an (ny, nx) density, got shape {density.shape}")
+        if angle_field is not None:
+            angle_field = np.asarray(angle_field, dtype=np.float64)
+            if angle_field.shape != density.shape:
+                raise ValueError(
+                    f"The angle field has shape {angle_field.shape}, the density {density.shape}"
+                )
+        self._shape = density.shape
+        self._pixel_size = (sizex / density.shape[1], sizey / density.shape[0])
+        self._angle_field = angle_field
+        self._kappa = kappa
+        self._rng = np.random.default_rng(seed)
+        self._pixels = AliasTable(density, self._rng)
+
+    def sample(self, n) -> npt.NDArray[np.float64]:
+        iy, ix = np.unravel_index(self._pixels.sample(n), self._shape)
+        x = (ix + self._rng.random(n)) * self._pixel_size[0]
+        y = (iy + self._rng.random(n)) * self._pixel_size[1]
+        angle = self._rng.uniform(0, 2 * np.pi, size=n)
+        if self._angle_field is not None:
+            field = self._angle_field[iy, ix]
+            if self._kappa is not None:
+                field = field + self._rng.vonmises(0.0, self._kappa, size=n)
+            angle = np.where(np.isnan(field), angle, field)
+        return np.column_stack([x, y, angle])
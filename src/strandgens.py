@@ -2,9 +2,10 @@ from .network import Network, BEADTYPE, BONDTYPE
 from .stranddistributions import StrandDistribution
 
 import numpy as np
+import numpy.typing as npt
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Tuple, List, Optional
+from typing import Dict, Tuple, List, Optional
 
 import logging
 _logger = logging.getLogger(__name__)
@@ -19,7 +20,36 @@ class StrandGenerator(ABC):
         pass
 
 
-from .parameters import RandomStrandGeneratorParameters
+from .parameters import (
+    RandomStrandGeneratorParameters,
+    SemiflexibleStrandGeneratorParameters,
+    DtypePolicy,
+)
+from .placement import ExcludedVolumePlacement
+
+
+# sides of the domain, matching the fix_boundary_* flags of DomainParameters
+SIDES = ("north", "south", "east", "west")
+
+
+def boundary_sides(positions, domain) -> Dict[str, npt.NDArray[np.bool_]]:
+    """For every side of the domain, the beads at the given (N, 2) positions that are beyond it."""
+    pos = np.asarray(positions)
+    return dict(
+        north=pos[:, 1] > domain.sizey,
+        south=pos[:, 1] < 0,
+        east=abs(pos[:, 0]) > domain.sizex,
+        west=pos[:, 0] < 0,
+    )
+
+
+def boundary_mask(positions, domain) -> npt.NDArray[np.bool_]:
+    """Beads at the given (N, 2) positions that fix_boundaries turns into 'boundary' beads."""
+    mask = np.zeros(len(positions), dtype=bool)
+    for side, beyond in boundary_sides(positions, domain).items():
+        if domain.fix_boundary or getattr(domain, f"fix_boundary_{side}"):
+            mask |= beyond
+    return mask
 
 
 class RandomStrandGenerator(StrandGenerator):
@@ -27,58 +57,61 @@ class RandomStrandGenerator(StrandGenerator):
         self,
         par: RandomStrandGeneratorParameters,
         strand_distribution: StrandDistribution,
+        placement: Optional[ExcludedVolumePlacement] = None,
     ):
         self._strand_distribution = strand_distribution
         self._par = par
+        self._placement = placement
 
     def build_strands(self, network: Network):
-        particlepos, types = self._pos_gen()
-        bondsgroup, bondstypes = self._bond_gen()
-        anglegroup, angletypes = self._angle_gen()
-
-        network.beads_positions.extend(particlepos)
-        network.beads_types.extend(types)
-
-        network.bonds_groups.extend(bondsgroup)
-        network.bonds_types.extend(bondstypes)
+        dtypes = network.dtypes
+        dtypes.check_indices(
+            len(network.beads_positions)
+            + self._par.number_of_strands * self._par.number_of_beads_per_strand
+        )
+        particlepos, types = self._pos_gen(dtypes)
+        bondsgroup, bondstypes = self._bond_gen(dtypes)
+        anglegroup, angletypes = self._angle_gen(dtypes)
 
-        network.angle_groups.extend(anglegroup)
-        network.angle_types.extend(angletypes)
+        network.append_fibers(
+            [self._par.number_of_beads_per_strand] * self._par.number_of_strands
+        )
+        network.extend(
+            beads_positions=particlepos,
+            beads_types=types,
+            bonds_groups=bondsgroup,
+            bonds_types=bondstypes,
+            angle_groups=anglegroup,
+            angle_types=angletypes,
+        )
 
         return network
 
     def fix_boundaries(self, network: Network):
-        pos = np.array(network.beads_positions)
-        typeid = np.array(network.beads_types, dtype=object)
-
-        sizex = network.domain.sizex
-        sizey = network.domain.sizey
-
-        if network.domain.fix_boundary or network.domain.fix_boundary_north:
-            boundary_particles = pos[:, 1] > sizey
-            typeid[boundary_particles] = "boundary"
-
-        if network.domain.fix_boundary or network.domain.fix_boundary_south:
-            boundary_particles = pos[:, 1] < 0
-            typeid[boundary_particles] = "boundary"
-
-        if network.domain.fix_boundary or network.domain.fix_boundary_east:
-            boundary_particles = abs(pos[:, 0]) > sizex
-            typeid[boundary_particles] = "boundary"
-
-        if network.domain.fix_boundary or network.domain.fix_boundary_west:
-            boundary_particles = pos[:, 0] < 0
-            typeid[boundary_particles] = "boundary"
-
-        _logger.debug("Fixed %s boundary particles" % np.sum(typeid == "boundary"))
+        boundary_particles = boundary_mask(
+            network.positions_array(), network.domain
+        )
+        network.beads_types[boundary_particles] = "boundary"
 
-        network.beads_types = typeid.tolist()
+        _logger.debug("Fixed %s boundary particles" % network.beads_types.count("boundary"))
 
-    def _pos_gen(self):
+    def _pos_gen(self, dtypes: DtypePolicy = DtypePolicy()):
         num_particles = (
             self._par.number_of_strands * self._par.number_of_beads_per_strand
         )
-        num_strands = self._par.number_of_strands
+        if self._placement is None:
+            pos = self._strand_positions(self._par.number_of_strands)
+        else:
+            pos = self._placement.place(
+                self._strand_positions, self._par.number_of_strands
+            )
+        pos = pos.reshape((num_particles, 2)).astype(dtypes.position)
+        typeid = ["free"] * num_particles
+
+        return pos, typeid
+
+    def _strand_positions(self, num_strands):
+        """Returns the bead positions of num_strands new strands as a (num_strands, num_beads, 2) array."""
         num_beads = self._par.number_of_beads_per_strand
         contour_length = self._par.contour_length_of_strand
 
@@ -86,33 +119,21 @@ class RandomStrandGenerator(StrandGenerator):
 
         middle_of_strand = num_beads // 2
 
-        pos = np.zeros((num_strands, num_beads, 2))
-        pos[:, middle_of_strand, 0] = dist.pos_x_dist(num_strands)
-        pos[:, middle_of_strand, 1] = dist.pos_y_dist(num_strands)
+        strands = dist.sample(num_strands)
+        center, angles = strands[:, :2], strands[:, 2]
 
         h = contour_length / (num_beads - 1)
 
-        angles = dist.angle_dist(num_strands)
-        for bead in range(num_beads):
-            if bead == middle_of_strand:
-                continue
-            coss = np.cos(angles)
-            sins = np.sin(angles)
-            v = h * np.column_stack([coss, sins])
-            pos[:, bead, :] = pos[:, middle_of_strand, :] + v * (
-                middle_of_strand - bead
-            )
-        pos = pos.reshape((num_particles, 2))
-        typeid = np.array(["free"] * num_particles, dtype=object)
-
-        typeid = typeid.tolist()
+        v = h * np.column_stack([np.cos(angles), np.sin(angles)])
+        steps = middle_of_strand - np.arange(num_beads)
+        return center[:, None, :] + v[:, None, :] * steps[None, :, None]
 
-        return pos, typeid
-
-    def _bond_gen(self):
+    def _bond_gen(self, dtypes: DtypePolicy = DtypePolicy()):
         num_strands = self._par.number_of_strands
         num_beads = self._par.number_of_beads_per_strand
-        bondsgroup = np.empty(shape=(num_strands * (num_beads - 1), 2), dtype=int)
+        bondsgroup: npt.NDArray[np.integer] = np.empty(
+            shape=(num_strands * (num_beads - 1), 2), dtype=dtypes.index
+        )
         bonds_indices = np.repeat(
             num_beads * np.arange(0, num_strands, dtype=int), num_beads - 1
         )
@@ -122,15 +143,16 @@ class RandomStrandGenerator(StrandGenerator):
         bondsgroup[:, 1] = bonds_indices + np.tile(
             np.arange(1, num_beads, 1, dtype=int), num_strands
         )
-        bondsgroup = bondsgroup.tolist()
         bondstype = ["polymer"] * len(bondsgroup)
 
         return bondsgroup, bondstype
 
-    def _angle_gen(self):
+    def _angle_gen(self, dtypes: DtypePolicy = DtypePolicy()):
         num_strands = self._par.number_of_strands
         num_beads = self._par.number_of_beads_per_strand
-        angles_group = np.empty(shape=(num_strands * (num_beads - 2), 3), dtype=int)
+        angles_group: npt.NDArray[np.integer] = np.empty(
+            shape=(num_strands * (num_beads - 2), 3), dtype=dtypes.index
+        )
         angles_indices = np.repeat(
             num_beads * np.arange(0, num_strands, dtype=int), num_beads - 2
         )
@@ -143,6 +165,51 @@ class RandomStrandGenerator(StrandGenerator):
         angles_group[:, 2] = angles_indices + np.tile(
             np.arange(2, num_beads, 1, dtype=int), num_strands
         )
-        anglegroup = angles_group.tolist()
-        types = ["polymer_bend"] * len(anglegroup)
-        return anglegroup, types
+        types = ["polymer_bend"] * len(angles_group)
+        return angles_group, types
+
+
+class SemiflexibleStrandGenerator(RandomStrandGenerator):
+    """
+    Generates curved strands as discretized 2-D worm-like chains. The persistence length is the
+    bending stiffness over kT, as usually reported for fibers. Consecutive bonds turn by normally
+    distributed angles with variance h / persistence_length (h the bond length). In 2-D this gives
+    the tangent correlation exp(-s / (2 persistence_length)) along the strand. The middle bead and
+    the direction of the bond leaving it are drawn from the strand distribution, as for straight
+    strands.
+    """
+
+    def __init__(
+        self,
+        par: SemiflexibleStrandGeneratorParameters,
+        strand_distribution: StrandDistribution,
+        seed: Optional[int] = None,
+        placement: Optional[ExcludedVolumePlacement] = None,
+    ):
+        super().__init__(par, strand_distribution, placement)
+        self._par: SemiflexibleStrandGeneratorParameters = par
+        self._rng = np.random.default_rng(seed)
+
+    def _strand_positions(self, num_strands):
+        num_beads = self._par.number_of_beads_per_strand
+        num_bonds = num_beads - 1
+        middle_of_strand = num_beads // 2
+
+        strands = self._strand_distribution.sample(num_strands)
+        center, angles = strands[:, :2], strands[:, 2]
+
+        h = self._par.contour_length_of_strand / num_bonds
+        turns = np.zeros((num_strands, num_bonds))
+        turns[:, 1:] = self._rng.normal(
+            0.0, np.sqrt(h / self._par.persistence_length), size=(num_strands, num_bonds - 1)
+        )
+        directions = np.cumsum(turns, axis=1)
+        # bead index increases against the strand direction, as for straight strands
+        reference = min(middle_of_strand, num_bonds - 1)
+        directions += (angles + np.pi - directions[:, reference])[:, None]
+
+        pos = np.zeros((num_strands, num_beads, 2))
+        pos[:, 1:, 0] = np.cumsum(h * np.cos(directions), axis=1)
+        pos[:, 1:, 1] = np.cumsum(h * np.sin(directions), axis=1)
+        pos += (center - pos[:, middle_of_strand, :])[:, None, :]
+        return pos
@@ -0,0 +1,61 @@
+from ecmgen.networks import random_network, single_strand
+from ecmgen import analysis
+
+import unittest
+import numpy as np
+
+
+class TestAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.network = random_network(
+            sizex=50,
+            sizey=50,
+            number_of_beads_per_strand=9,
+            number_of_strands=100,
+            contour_length_of_strand=20,
+            crosslink_max_r=1.0,
+            maximal_number_of_initial_crosslinks=50,
+            crosslink_bin_size=1.0,
+            seed=10,
+        )
+
+    def test_bond_length_histograms(self):
+        edges, counts = analysis.bond_length_histograms(self.network, bins=10)
+        self.assertEqual(len(edges), 11)
+        self.assertEqual(counts["polymer"].sum(), 100 * 8)
+        self.assertEqual(
+            sum(c.sum() for c in counts.values()), len(self.network.bonds_groups)
+        )
+
+    def test_crosslink_density(self):
+        number = sum(1 for typ in self.network.bonds_types if typ.startswith("cross"))
+        self.assertAlmostEqual(analysis.crosslink_density(self.network), number / 2500)
+
+    def test_aligned_strand_has_full_order(self):
+        network = single_strand(20, 20, 15, 10, 0.3, 9, 8)
+        order, director = analysis.nematic_order_per_bin(network, 5.0)
+        self.assertEqual(order.shape, (4, 4))
+        filled = ~np.isnan(order)
+        self.assertTrue(filled.any())
+        np.testing.assert_allclose(order[filled], 1.0)
+        np.testing.assert_allclose(director[filled], 0.3)
+
+    def test_orientation_distribution(self):
+        edges, density = analysis.orientation_distribution(self.network, bins=18)
+        self.assertAlmostEqual(np.sum(density * np.diff(edges)), 1.0)
+
+    def test_components(self):
+        network = single_strand(20, 20, 15, 10, 0.3, 9, 8) + single_strand(
+            20, 20, 15, 15, 0.3, 9, 8
+        )
+        n, labels = analysis.connected_components(network)
+        self.assertEqual(n, 2)
+        self.assertEqual(len(set(labels[:9])), 1)
+
+    def test_summarize_ensemble(self):
+        summary = analysis.summarize_ensemble([self.network, self.network])
+        self.assertEqual(summary["number_of_beads"].tolist(), [900.0, 900.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
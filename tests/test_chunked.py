@@ -0,0 +1,95 @@
+from ecmgen.chunked import generate_chunked_network, save_network, MemmapNetwork
+from ecmgen.strandgens import RandomStrandGenerator
+from ecmgen.stranddistributions import UniformStrandDistribution
+from ecmgen.network import is_crosslink_type
+from ecmgen.networks import random_network
+from ecmgen.parameters import (
+    DomainParameters,
+    RandomStrandGeneratorParameters,
+    StrandDensityCrosslinkDistributerParameters,
+    SINGLE_PRECISION,
+)
+import tempfile
+import unittest
+
+import numpy as np
+
+
+def chunked(directory, number_of_stripes, **kwargs):
+    generator = RandomStrandGenerator(
+        RandomStrandGeneratorParameters(9, 2000, 6.0),
+        UniformStrandDistribution(400, 100, 1),
+    )
+    return generate_chunked_network(
+        directory,
+        DomainParameters(400, 100, fix_boundary=True),
+        generator,
+        StrandDensityCrosslinkDistributerParameters(1.5, 1000, 9, 2000, 2.0),
+        number_of_stripes,
+        seed=2,
+        strands_per_chunk=300,
+        **kwargs
+    )
+
+
+class TestChunkedGeneration(unittest.TestCase):
+    def test_strands_do_not_depend_on_stripes(self):
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            one = chunked(a, 1)
+            many = chunked(b, 8)
+            sort = lambda pos: pos[np.lexsort(pos.T)]
+            np.testing.assert_array_equal(
+                sort(np.array(one.beads_positions)), sort(np.array(many.beads_positions))
+            )
+            self.assertEqual(len(one.angle_groups), 2000 * 7)
+
+    def test_crosslinks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            memmap = chunked(directory, 8, dtypes=SINGLE_PRECISION)
+            self.assertEqual(memmap.beads_fibers.dtype, np.int32)
+            network = memmap.to_network()
+
+        self.assertEqual(network.positions_array().dtype, np.float32)
+        self.assertEqual(network.beads_fibers.dtype, np.int32)
+        self.assertEqual(len(network.beads_positions), 2000 * 9)
+        self.assertEqual(network.bonds_types.count("polymer"), 2000 * 8)
+        pos = network.positions_array()
+        self.assertEqual(
+            network.beads_types.count("boundary"),
+            np.sum((pos[:, 0] < 0) | (pos[:, 0] > 400) | (pos[:, 1] < 0) | (pos[:, 1] > 100)),
+        )
+
+        bonds = network.bonds_array()
+        cross = bonds[[is_crosslink_type(t) for t in network.bonds_types]]
+        self.assertGreater(len(cross), 0)
+        # one crosslinker per bead, between different strands, no longer than crosslink_max_r
+        self.assertEqual(len(np.unique(cross)), cross.size)
+        self.assertTrue(np.all(cross[:, 0] // 9 != cross[:, 1] // 9))
+        r = np.linalg.norm(pos[cross[:, 0]] - pos[cross[:, 1]], axis=1)
+        self.assertTrue(np.all(r <= 1.5 + 1e-5))
+        for typ in set(network.bonds_types) - {"polymer"}:
+            self.assertIn(typ, network.details_of_bondtypes)
+
+    def test_narrow_stripes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ValueError):
+                chunked(directory, 200)
+
+    def test_save_network(self):
+        network = random_network(50, 50, 5, 100, 4.0, 1.0, 50, 2.0, seed=3)
+        with tempfile.TemporaryDirectory() as directory:
+            loaded = save_network(network, directory).to_network()
+            self.assertIsInstance(MemmapNetwork(directory).bonds_groups, np.memmap)
+
+        np.testing.assert_array_equal(loaded.positions_array(), network.positions_array())
+        np.testing.assert_array_equal(loaded.bonds_array(), network.bonds_array())
+        np.testing.assert_array_equal(loaded.angles_array(), network.angles_array())
+        self.assertEqual(loaded.beads_types, network.beads_types)
+        self.assertEqual(loaded.bonds_types, network.bonds_types)
+        np.testing.assert_array_equal(loaded.fiber_ids(), network.fiber_ids())
+        self.assertEqual(loaded.beads_fibers.dtype, network.dtypes.fiber)
+        self.assertEqual(loaded.details_of_bondtypes, network.details_of_bondtypes)
+
+
+if __name__ == "__main__":
+    unittest.main()
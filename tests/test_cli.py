@@ -0,0 +1,126 @@
+from ecmgen.cli import main
+from ecmgen.chunked import MemmapNetwork
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+try:
+    import pyarrow
+
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+PARAMETERS = dict(
+    factory="random_network",
+    arguments=dict(
+        sizex=30,
+        sizey=30,
+        number_of_beads_per_strand=5,
+        number_of_strands=40,
+        contour_length_of_strand=4.0,
+        crosslink_max_r=1.0,
+        maximal_number_of_initial_crosslinks=20,
+        crosslink_bin_size=2.0,
+    ),
+    seeds=[3, 6],
+)
+
+
+class TestCommandLine(unittest.TestCase):
+    def run_main(self, directory, parameters, *argv):
+        path = os.path.join(directory, "parameters.json")
+        with open(path, "w") as f:
+            json.dump(parameters, f)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(main([path, "-o", os.path.join(directory, "out"), *argv]), 0)
+        return out.getvalue()
+
+    def test_npz(self):
+        with tempfile.TemporaryDirectory() as directory:
+            summary = self.run_main(directory, PARAMETERS, "-j", "2")
+            files = sorted(os.listdir(os.path.join(directory, "out")))
+            self.assertEqual(
+                files, [f"random_network_00000{seed}.npz" for seed in (3, 4, 5)]
+            )
+            data = np.load(os.path.join(directory, "out", files[0]))
+            self.assertEqual(data["beads_positions"].shape, (200, 2))
+            self.assertEqual(json.loads(str(data["meta"]))["type_names"]["beads"], ["free"])
+        self.assertIn("Generated 3 networks", summary)
+
+    def test_npy_and_seed_override(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.run_main(directory, PARAMETERS, "-f", "npy", "-s", "0", "2")
+            first = MemmapNetwork(os.path.join(directory, "out", "random_network_000000"))
+            second = MemmapNetwork(os.path.join(directory, "out", "random_network_000001"))
+            self.assertEqual(first.number_of_beads, 200)
+            self.assertFalse(
+                np.array_equal(first.beads_positions, second.beads_positions)
+            )
+
+    @unittest.skipUnless(HAVE_PYARROW, "pyarrow is not installed")
+    def test_parquet(self):
+        from ecmgen.export import read_parquet
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.run_main(directory, PARAMETERS, "-f", "parquet", "-j", "2")
+            output = os.path.join(directory, "out")
+            self.assertEqual(sorted(os.listdir(output)), ["angles", "beads", "bonds"])
+            beads = read_parquet(
+                output, "beads", ["network_id", "seed", "factory", "number_of_strands", "crosslink_max_r"]
+            ).to_pydict()
+
+        self.assertEqual(len(beads["network_id"]), 3 * 200)
+        self.assertEqual(
+            set(zip(beads["network_id"], beads["seed"])), {(0, 3), (1, 4), (2, 5)}
+        )
+        self.assertEqual(set(beads["factory"]), {"random_network"})
+        self.assertEqual(set(beads["number_of_strands"]), {40})
+        self.assertEqual(set(beads["crosslink_max_r"]), {1.0})
+
+    def test_unknown_factory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                self.run_main(directory, dict(PARAMETERS, factory="truncnorm"))
+
+    def test_factory_without_seed(self):
+        for factory in ("hexagonal", "laminin"):
+            with tempfile.TemporaryDirectory() as directory:
+                err = io.StringIO()
+                with self.assertRaises(SystemExit), contextlib.redirect_stderr(err):
+                    self.run_main(directory, dict(PARAMETERS, factory=factory))
+                self.assertIn("takes a seed", err.getvalue())
+
+    def test_workers_after_parallel_kernels(self):
+        # the parallel numba kernels start a thread pool; worker processes started after them must
+        # not hang, neither during the run nor when the interpreter exits
+        script = (
+            "import sys\n"
+            "from ecmgen import kernels\n"
+            "from ecmgen.cli import main\n"
+            "kernels.pairs_within_groups([3, 4, 2])\n"
+            "sys.exit(main(sys.argv[1:]))\n"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "parameters.json")
+            with open(path, "w") as f:
+                json.dump(PARAMETERS, f)
+            result = subprocess.run(
+                [sys.executable, "-c", script, path, "-o", os.path.join(directory, "out"), "-j", "2"],
+                capture_output=True,
+                timeout=300,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr.decode())
+            self.assertEqual(len(os.listdir(os.path.join(directory, "out"))), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+from ecmgen.network import Network
+from ecmgen.strandgens import RandomStrandGenerator
+from ecmgen.stranddistributions import UniformStrandDistribution
+from ecmgen.density_crosslinker import (
+    StrandDensityCrosslinkDistributer,
+    StrandDensityCrosslinkDistributerFast,
+    _CandidateTable,
+)
+from ecmgen.parameters import (
+    DomainParameters,
+    RandomStrandGeneratorParameters,
+    StrandDensityCrosslinkDistributerParameters,
+)
+
+import unittest
+import numpy as np
+
+
+def strands(sizex=50, sizey=50, beads=9, number=100, length=20, seed=1):
+    network = Network(DomainParameters(sizex, sizey))
+    RandomStrandGenerator(
+        RandomStrandGeneratorParameters(beads, number, length),
+        UniformStrandDistribution(sizex, sizey, seed),
+    ).build_strands(network)
+    return network
+
+
+class TestStrandDensityCrosslinker(unittest.TestCase):
+    def test_crosslinks_are_valid(self):
+        network = strands()
+        par = StrandDensityCrosslinkDistributerParameters(1.0, 200, 9, 100, 1.0)
+        selected = StrandDensityCrosslinkDistributer(par, seed=3).select_bonds(network)
+        self.assertGreater(len(selected), 0)
+
+        beads = [bead for bond, _ in selected for bead in bond]
+        self.assertEqual(len(beads), len(set(beads)))
+        pos = network.positions_array()
+        for (b0, b1), _ in selected:
+            self.assertNotEqual(b0 // 9, b1 // 9)
+            self.assertLessEqual(np.linalg.norm(pos[b0] - pos[b1]), 1.0)
+
+    def test_reproducible(self):
+        par = StrandDensityCrosslinkDistributerParameters(1.0, 200, 9, 100, 1.0)
+        first = StrandDensityCrosslinkDistributer(par, seed=3).select_bonds(strands())
+        second = StrandDensityCrosslinkDistributer(par, seed=3).select_bonds(strands())
+        self.assertEqual(first, second)
+
+
+class TestStrandDensityCrosslinkerFast(unittest.TestCase):
+    def test_exact_number_of_crosslinks(self):
+        network = strands(sizex=100, sizey=100, number=400)
+        pos = network.positions_array()
+        number_of_bonds = len(network.bonds_groups)
+        for k in (1, 150, 500):
+            par = StrandDensityCrosslinkDistributerParameters(1.0, k, 9, 400, 1.0)
+            crosslinker = StrandDensityCrosslinkDistributerFast(par, seed=3, exact=True)
+            crosslinker._PAIRS_PER_CHUNK = 100
+            branch = network.snapshot()
+            crosslinker.distribute_crosslinkers(branch)
+
+            self.assertEqual(len(branch.bonds_groups) - number_of_bonds, k)
+            selected = branch.bonds_array()[number_of_bonds:]
+            self.assertEqual(len(np.unique(selected)), 2 * k)
+            self.assertTrue(np.all(selected[:, 0] // 9 != selected[:, 1] // 9))
+            r = np.linalg.norm(pos[selected[:, 0]] - pos[selected[:, 1]], axis=1)
+            self.assertTrue(np.all(r <= 1.0))
+            self.assertTrue(branch.validate().ok)
+
+    def test_exact_mode_grows_the_reservoir(self):
+        network = strands(sizex=100, sizey=100, number=400)
+        par = StrandDensityCrosslinkDistributerParameters(1.0, 300, 9, 400, 1.0)
+        selections = []
+        for factor in (1, 2, 8):
+            crosslinker = StrandDensityCrosslinkDistributerFast(par, seed=3, exact=True)
+            crosslinker._RESERVOIR_FACTOR = factor
+            selections.append(crosslinker.select_bonds(network))
+        self.assertEqual(len(selections[0]), 300)
+        self.assertEqual(selections[0], selections[1])
+        self.assertEqual(selections[0], selections[2])
+
+    def test_exact_mode_raises_if_too_few_candidates(self):
+        network = strands(sizex=100, sizey=100, number=400)
+        par = StrandDensityCrosslinkDistributerParameters(1.0, 10**5, 9, 400, 1.0)
+        with self.assertRaises(ValueError):
+            StrandDensityCrosslinkDistributerFast(par, seed=4, exact=True).select_bonds(network)
+
+
+class TestProbabilityMap(unittest.TestCase):
+    def test_crosslinks_follow_the_map(self):
+        network = strands(sizex=100, sizey=100, number=400)
+        pos = network.positions_array()
+        # no crosslinks in the left half of the domain
+        half = np.array([[0.0, 1.0]])
+        par = StrandDensityCrosslinkDistributerParameters(1.0, 150, 9, 400, 1.0)
+        for crosslinker in (
+            StrandDensityCrosslinkDistributer(par, seed=3, probability_map=half),
+            StrandDensityCrosslinkDistributerFast(par, seed=3, probability_map=half),
+            StrandDensityCrosslinkDistributerFast(par, seed=3, exact=True, probability_map=half),
+        ):
+            selected = np.array([bond for bond, _ in crosslinker.select_bonds(network)])
+            self.assertGreater(len(selected), 50)
+            midpoints = 0.5 * (pos[selected[:, 0]] + pos[selected[:, 1]])
+            self.assertTrue(np.all(midpoints[:, 0] >= 50.0))
+
+    def test_gradient(self):
+        network = strands(sizex=100, sizey=100, number=400)
+        pos = network.positions_array()
+        par = StrandDensityCrosslinkDistributerParameters(1.0, 300, 9, 400, 1.0)
+        crosslinker = StrandDensityCrosslinkDistributerFast(
+            par, seed=3, exact=True, probability_map=lambda x, y: np.clip(x / 100, 0, 1)
+        )
+        selected = np.array([bond for bond, _ in crosslinker.select_bonds(network)])
+        self.assertEqual(len(selected), 300)
+        x = 0.5 * (pos[selected[:, 0], 0] + pos[selected[:, 1], 0])
+        self.assertGreater(np.count_nonzero(x > 50), 1.3 * np.count_nonzero(x < 50))
+
+
+class TestCandidateTable(unittest.TestCase):
+    def test_invalidation(self):
+        pairs = np.array([[0, 1], [2, 3], [4, 5]])
+        table = _CandidateTable(pairs, np.array([1.0, 0.0, 1.0]), np.random.default_rng(1))
+        crosslinked = np.zeros(6, dtype=bool)
+        crosslinked[1] = True
+        for _ in range(20):
+            self.assertEqual(table.draw(crosslinked), [4, 5])
+        crosslinked[5] = True
+        self.assertIsNone(table.draw(crosslinked))
+
+
+class TestFiberIds(unittest.TestCase):
+    def test_generated_and_added_networks(self):
+        network = strands(beads=5, number=3) + strands(beads=7, number=2)
+        np.testing.assert_array_equal(
+            network.fiber_ids(), [0] * 5 + [1] * 5 + [2] * 5 + [3] * 7 + [4] * 7
+        )
+        offsets, beads = network.fiber_offsets()
+        np.testing.assert_array_equal(offsets, [0, 5, 10, 15, 22, 29])
+        np.testing.assert_array_equal(beads, np.arange(29))
+
+    def test_adding_untracked_network(self):
+        untracked = strands(beads=4, number=2)
+        untracked.beads_fibers = []
+        untracked.extend(beads_positions=[(1.0, 1.0)], beads_types=["free"])
+        tracked = strands(beads=3, number=2)
+        np.testing.assert_array_equal(
+            (tracked + untracked).fiber_ids(), [0] * 3 + [1] * 3 + [2] * 4 + [3] * 4 + [-1]
+        )
+        np.testing.assert_array_equal(
+            (untracked + tracked).fiber_ids(), [0] * 4 + [1] * 4 + [-1] + [2] * 3 + [3] * 3
+        )
+
+    def test_crosslinkers_use_fiber_ids(self):
+        # strands of different lengths: bead // number_of_beads_per_strand is wrong here
+        network = strands(beads=5, number=80, length=10) + strands(beads=9, number=60, length=20, seed=2)
+        fibers = network.fiber_ids()
+        par = StrandDensityCrosslinkDistributerParameters(1.0, 300, 5, 140, 1.0)
+        for crosslinker in (
+            StrandDensityCrosslinkDistributer(par, seed=3),
+            StrandDensityCrosslinkDistributerFast(par, seed=3),
+        ):
+            selected = np.array([bond for bond, _ in crosslinker.select_bonds(network)])
+            self.assertGreater(len(selected), 0)
+            self.assertTrue(np.all(fibers[selected[:, 0]] != fibers[selected[:, 1]]))
+
+    def test_binning_mixed_lengths(self):
+        # 80 * 5 + 60 * 9 = 940 beads in 80 * 4 + 60 * 8 = 800 polymer bonds, while the parameters
+        # describe 140 strands of 5 beads (700 beads)
+        network = strands(beads=5, number=80, length=10) + strands(beads=9, number=60, length=20, seed=2)
+        par = StrandDensityCrosslinkDistributerParameters(1.0, 300, 5, 140, 1.0)
+        crosslinker = StrandDensityCrosslinkDistributer(par, seed=3)
+        selected = np.array([bond for bond, _ in crosslinker.select_bonds(network)])
+
+        bins = crosslinker._binner.parent_bin
+        binned = {bond for row in bins for cell in row for bond in cell}
+        self.assertLessEqual(max(binned), 799)
+        # every bond inside the domain is in the bin of (a point near) its midpoint
+        positions = network.positions_array()
+        ends = positions[network.bonds_array()]
+        inside = np.flatnonzero(np.all((ends >= 1.0) & (ends < 49.0), axis=(1, 2)))
+        self.assertGreater(len(inside), 600)
+        for bond in inside:
+            nx, ny = (ends[bond].mean(axis=0) // 1.0).astype(int)
+            nearby = {b for dy in (-1, 0, 1) for dx in (-1, 0, 1) for b in bins[ny + dy][nx + dx]}
+            self.assertIn(bond, nearby)
+
+        self.assertGreater(np.count_nonzero(selected >= 700), 0)
+        r = np.linalg.norm(positions[selected[:, 0]] - positions[selected[:, 1]], axis=1)
+        self.assertTrue(np.all(r <= 1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
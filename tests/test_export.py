@@ -0,0 +1,71 @@
+from ecmgen.export import network_tables, write_parquet, read_parquet
+from ecmgen.networks import random_network
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+try:
+    import pyarrow
+
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+
+def networks(seeds):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for seed in seeds:
+            yield random_network(40, 40, 5, 80, 4.0, 1.0, 40, 2.0, seed=seed)
+
+
+@unittest.skipUnless(HAVE_PYARROW, "pyarrow is not installed")
+class TestArrowExport(unittest.TestCase):
+    def test_network_tables(self):
+        network = next(networks([1]))
+        tables = network_tables(network, network_id=7, seed=1, parameters=dict(crosslink_max_r=1.0))
+
+        beads = tables["beads"]
+        self.assertEqual(beads.num_rows, len(network.beads_positions))
+        self.assertEqual(beads.column("network_id").unique().to_pylist(), [7])
+        self.assertEqual(beads.column("crosslink_max_r").unique().to_pylist(), [1.0])
+        np.testing.assert_allclose(beads.column("x").to_numpy(), network.positions_array()[:, 0])
+        self.assertEqual(beads.column("type").to_pylist(), network.beads_types)
+
+        bonds = tables["bonds"]
+        self.assertTrue(pyarrow.types.is_dictionary(bonds.schema.field("type").type))
+        self.assertEqual(bonds.column("type").to_pylist(), network.bonds_types)
+        np.testing.assert_array_equal(bonds.column("bead2").to_numpy(), network.bonds_array()[:, 1])
+        self.assertEqual(tables["angles"].num_rows, len(network.angle_groups))
+
+    def test_write_and_read_ensemble(self):
+        expected = list(networks(range(1, 6)))
+        with tempfile.TemporaryDirectory() as directory:
+            written = write_parquet(
+                directory,
+                networks(range(1, 6)),
+                seeds=range(1, 6),
+                parameters=(dict(maximal_number_of_initial_crosslinks=40) for _ in range(5)),
+                batch_size=2,
+            )
+            self.assertEqual(written, 5)
+            self.assertEqual(len(os.listdir(os.path.join(directory, "bonds"))), 3)
+            bonds = read_parquet(directory, "bonds")
+
+        self.assertEqual(bonds.num_rows, sum(len(n.bonds_groups) for n in expected))
+        ids = bonds.column("network_id").to_numpy()
+        self.assertEqual(sorted(set(ids)), [0, 1, 2, 3, 4])
+        np.testing.assert_array_equal(
+            np.bincount(ids), [len(n.bonds_groups) for n in expected]
+        )
+        self.assertEqual(
+            set(bonds.column("type").to_pylist()),
+            set(t for n in expected for t in n.bonds_types),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
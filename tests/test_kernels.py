@@ -0,0 +1,91 @@
+from ecmgen import kernels
+from ecmgen.density_crosslinker import (
+    StrandDensityCrosslinkDistributer,
+    StrandDensityCrosslinkDistributerFast,
+)
+from ecmgen.network import Network
+from ecmgen.strandgens import RandomStrandGenerator
+from ecmgen.stranddistributions import UniformStrandDistribution
+from ecmgen.parameters import (
+    DomainParameters,
+    RandomStrandGeneratorParameters,
+    StrandDensityCrosslinkDistributerParameters,
+)
+
+import itertools
+import unittest
+import numpy as np
+
+HAVE_NUMBA = "numba" in kernels.available_backends()
+
+
+def strands():
+    network = Network(DomainParameters(50, 50))
+    RandomStrandGenerator(
+        RandomStrandGeneratorParameters(9, 100, 20),
+        UniformStrandDistribution(50, 50, 1),
+    ).build_strands(network)
+    return network
+
+
+class TestNumpyKernels(unittest.TestCase):
+    sizes = [3, 1, 0, 4, 2]
+
+    def test_pairs_within_groups(self):
+        first, second = kernels.pairs_within_groups(self.sizes, "numpy")
+        expected = []
+        start = 0
+        for size in self.sizes:
+            expected += list(itertools.combinations(range(start, start + size), 2))
+            start += size
+        self.assertEqual(list(zip(first.tolist(), second.tolist())), expected)
+
+    def test_pairs_across_groups(self):
+        first, second = kernels.pairs_across_groups(self.sizes, "numpy")
+        group = np.repeat(np.arange(len(self.sizes)), self.sizes)
+        expected = [
+            (i, j)
+            for i, j in itertools.combinations(range(len(group)), 2)
+            if group[i] != group[j]
+        ]
+        self.assertEqual(list(zip(first.tolist(), second.tolist())), expected)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            kernels.pairs_within_groups([2], "fortran")
+
+
+@unittest.skipUnless(HAVE_NUMBA, "numba is not installed")
+class TestNumbaKernels(unittest.TestCase):
+    def test_kernels_agree(self):
+        sizes = np.random.default_rng(1).integers(0, 12, size=50)
+        for kernel in (kernels.pairs_within_groups, kernels.pairs_across_groups):
+            for a, b in zip(kernel(sizes, "numpy"), kernel(sizes, "numba")):
+                np.testing.assert_array_equal(a, b)
+
+        rng = np.random.default_rng(2)
+        P, Q = rng.uniform(-1, 11, (100, 2)), rng.uniform(-1, 11, (100, 2))
+        t = np.linspace(0, 1, 100, endpoint=False)
+        edges = np.linspace(0, 10, 11)
+        for a, b in zip(
+            kernels.bin_segments(P, Q, t, edges, edges, "numpy"),
+            kernels.bin_segments(P, Q, t, edges, edges, "numba"),
+        ):
+            np.testing.assert_array_equal(a, b)
+
+    def test_identical_crosslinks(self):
+        par = StrandDensityCrosslinkDistributerParameters(1.0, 200, 9, 100, 1.0)
+        for crosslinker in (
+            StrandDensityCrosslinkDistributer,
+            StrandDensityCrosslinkDistributerFast,
+        ):
+            selected = [
+                crosslinker(par, seed=5, backend=backend).select_bonds(strands())
+                for backend in ("numpy", "numba")
+            ]
+            self.assertGreater(len(selected[0]), 0)
+            self.assertEqual(selected[0], selected[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,30 @@
 from ecmgen.networks import random_network, single_strand, single_spring, laminin
-from ecmgen.network import Network
+from ecmgen.network import (
+    Network,
+    rotate_network,
+    transform_network,
+    transform_networks,
+    compose,
+    translation_matrix,
+    scaling_matrix,
+    shear_matrix,
+)
+from ecmgen.networktype import NetworkType
+from ecmgen.strandgens import RandomStrandGenerator
+from ecmgen.stranddistributions import UniformStrandDistribution
+from ecmgen.crosslink_distributors import DeterministicCrosslinkDistributer
+from ecmgen.parameters import (
+    DomainParameters,
+    RandomStrandGeneratorParameters,
+    StrandDensityCrosslinkDistributerParameters,
+)
+from ecmgen.density_crosslinker import (
+    StrandDensityCrosslinkDistributer,
+    StrandDensityCrosslinkDistributerFast,
+)
+import numpy as np
 
+import pickle
 import unittest
 
 
@@ -210,5 +234,285 @@ class TestStringMethods(unittest.TestCase):
         self.assertNotIn("boundary", network.beads_types)
 
 
+class TestTransforms(unittest.TestCase):
+    def test_rotate_network(self):
+        network = single_strand(200, 200, 100, 100, 0, 9, 8)
+        before = network.positions_array()
+        rotate_network(network, 3.141592653589793 / 2)
+        pos = network.positions_array()
+        np.testing.assert_allclose(pos[:, 0], 100, atol=1e-9)
+        np.testing.assert_allclose(pos[:, 1], before[:, 0], atol=1e-9)
+
+    def test_compose(self):
+        matrix = compose(translation_matrix(1, 2), scaling_matrix(2.0))
+        network = single_strand(200, 200, 10, 10, 0, 3, 2)
+        before = network.positions_array()
+        transform_network(network, matrix)
+        np.testing.assert_allclose(network.positions_array(), 2 * (before + [1, 2]))
+
+    def test_wrap_and_mask(self):
+        network = single_strand(20, 20, 10, 10, 0, 3, 2)
+        network.beads_types = ["boundary"] + network.beads_types[1:].tolist()
+        before = network.positions_array()
+        transform_network(network, translation_matrix(15, 0), types=["free"], wrap=True)
+        after = network.positions_array()
+        np.testing.assert_allclose(after[0], before[0])
+        np.testing.assert_allclose(after[1:, 0], (before[1:, 0] + 15) % 20)
+
+    def test_batched_matches_single(self):
+        networks = [single_strand(200, 200, 100, 100, a, 9, 8) for a in (0.0, 0.3, 1.2)]
+        copies = [single_strand(200, 200, 100, 100, a, 9, 8) for a in (0.0, 0.3, 1.2)]
+        matrices = np.stack([shear_matrix(g, center=(100, 100)) for g in (0.1, 0.2, 0.3)])
+        transform_networks(networks, matrices)
+        for network, copy, matrix in zip(networks, copies, matrices):
+            transform_network(copy, matrix)
+            np.testing.assert_allclose(network.positions_array(), copy.positions_array())
+
+
+class TestGraphViews(unittest.TestCase):
+    def test_adjacency_of_strand(self):
+        network = single_strand(200, 200, 100, 100, 0, 5, 4)
+        adj = network.adjacency()
+        self.assertEqual(adj.shape, (5, 5))
+        np.testing.assert_array_equal(np.asarray(adj.sum(axis=1)).ravel(), [1, 2, 2, 2, 1])
+        self.assertEqual(adj[1, 2], 1)
+        self.assertEqual(adj[2, 1], 1)
+
+    def test_adjacency_is_cached_and_invalidated(self):
+        network = single_strand(200, 200, 100, 100, 0, 5, 4)
+        adj = network.adjacency(bond_types=["polymer"])
+        self.assertIs(adj, network.adjacency(bond_types=["polymer"]))
+
+        network.extend(bonds_groups=[(0, 4)], bonds_types=["cross"])
+        self.assertEqual(network.adjacency(bond_types=["polymer"])[0, 4], 0)
+        self.assertEqual(network.adjacency()[0, 4], 1)
+
+        # changes in place are noticed as well
+        network.bonds_types[4] = "polymer"
+        self.assertEqual(network.adjacency(bond_types=["polymer"])[0, 4], 1)
+        network.bonds_groups[4] = (1, 3)
+        self.assertEqual(network.adjacency()[0, 4], 0)
+        network.bonds_groups.append((0, 2))
+        network.bonds_types.append("cross")
+        self.assertEqual(network.adjacency()[0, 2], 1)
+
+    def test_incidence(self):
+        network = single_strand(200, 200, 100, 100, 0, 4, 3)
+        inc = network.incidence()
+        self.assertEqual(inc.shape, (4, 3))
+        np.testing.assert_array_equal(inc.toarray()[:, 1], [0, 1, 1, 0])
+
+
+class TestValidate(unittest.TestCase):
+    def test_generated_network_is_valid(self):
+        network = random_network(50, 50, 5, 100, 4.0, 1.0, 50, 2.0, seed=3)
+        report = network.validate()
+        self.assertTrue(report.ok, str(report))
+
+    def test_problems_are_reported(self):
+        network = single_strand(200, 200, 100, 100, 0, 5, 4)
+        network.bonds_groups += [(3, 2), (0, 7), (0, 2), (0, 4), (1, 1)]
+        network.bonds_types += ["polymer", "polymer", "cross_0", "cross_1", "polymer"]
+        network.details_of_bondtypes["cross_0"] = {"r0": 0, "k": 1}
+        network.extend(angle_groups=[(0, 1, 3)], angle_types=["polymer_bend"])
+
+        report = network.validate()
+        self.assertFalse(report.ok)
+        np.testing.assert_array_equal(report.duplicate_bonds, [4])
+        np.testing.assert_array_equal(report.bonds_out_of_range, [5])
+        np.testing.assert_array_equal(report.self_bonds, [8])
+        np.testing.assert_array_equal(report.beads_with_multiple_crosslinkers, [0])
+        np.testing.assert_array_equal(report.angles_not_bonded, [3])
+        self.assertEqual(report.missing_bond_details, ["cross_1"])
+        self.assertEqual(report.length_mismatches, [])
+        self.assertIn("duplicate bonds: 4", str(report))
+
+    def test_length_mismatch(self):
+        network = single_strand(200, 200, 100, 100, 0, 5, 4)
+        network.beads_types = network.beads_types[:-1]
+        self.assertEqual(network.validate().length_mismatches, ["beads_types"])
+
+    def test_network_type_raises(self):
+        def network_type(crosslinks):
+            return NetworkType(
+                DomainParameters(50, 50),
+                RandomStrandGenerator(
+                    RandomStrandGeneratorParameters(5, 2, 4.0),
+                    UniformStrandDistribution(50, 50, 1),
+                ),
+                DeterministicCrosslinkDistributer(crosslinks),
+                validate=True,
+            )
+
+        self.assertTrue(network_type([(0, 5)]).generate().validate().ok)
+        with self.assertRaises(ValueError):
+            network_type([(0, 50)]).generate()
+
+    def test_angles_only_for_added_crosslinks(self):
+        network = single_strand(200, 200, 100, 100, 0, 10, 13.5)
+        number_of_angles = len(network.angle_groups)
+        # (3, 7) is skipped since bead 3 already has a crosslinker
+        crosslinker = DeterministicCrosslinkDistributer([(0, 3), (3, 7), (5, 9)])
+        crosslinker.distribute_crosslinkers(network)
+        crosslinker.add_crosslink_angles(network)
+
+        self.assertEqual(network.bonds_groups[9:], [(0, 3), (5, 9)])
+        self.assertEqual(network.angle_groups[number_of_angles:], [(0, 3, 2), (3, 0, 1), (5, 9, 8)])
+        self.assertTrue(network.validate().ok)
+
+
+class TestSubnetwork(unittest.TestCase):
+    def test_box(self):
+        network = random_network(60, 60, 5, 200, 4.0, 1.0, 100, 2.0, seed=4)
+        sub = network.subnetwork(box=(10, 20, 40, 50))
+        pos = network.positions_array()
+        inside = np.flatnonzero(
+            (pos[:, 0] >= 10) & (pos[:, 0] < 40) & (pos[:, 1] >= 20) & (pos[:, 1] < 50)
+        )
+
+        self.assertEqual((sub.domain.sizex, sub.domain.sizey), (30, 30))
+        np.testing.assert_allclose(sub.positions_array(), pos[inside] - [10, 20])
+        self.assertTrue(sub.validate().ok)
+
+        old_id = dict(enumerate(inside))
+        expected = {
+            (a, b, typ)
+            for (a, b), typ in zip(network.bonds_array(), network.bonds_types)
+            if a in set(inside) and b in set(inside)
+        }
+        found = {
+            (old_id[a], old_id[b], typ) for (a, b), typ in zip(sub.bonds_array(), sub.bonds_types)
+        }
+        self.assertEqual(found, expected)
+
+    def test_mask_and_boundary(self):
+        network = single_strand(200, 200, 100, 100, 0, 5, 4)
+        sub = network.subnetwork(mask=np.array([False, True, True, True, False]), mark_boundary=True)
+
+        self.assertEqual(sub.beads_types, ["boundary", "free", "boundary"])
+        np.testing.assert_array_equal(sub.bonds_array(), [[0, 1], [1, 2]])
+        np.testing.assert_array_equal(sub.angles_array(), [[0, 1, 2]])
+        np.testing.assert_allclose(sub.positions_array(), network.positions_array()[1:4])
+
+    def test_box_or_mask(self):
+        network = single_strand(200, 200, 100, 100, 0, 5, 4)
+        with self.assertRaises(ValueError):
+            network.subnetwork()
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_snapshot_shares_lists(self):
+        network = random_network(50, 50, 5, 100, 4.0, 1.0, 0, 2.0, seed=3)
+        adjacency = network.adjacency()
+        snapshot = network.snapshot()
+        self.assertIs(snapshot.beads_positions.array.base, network.beads_positions.array.base)
+        self.assertIs(snapshot.bonds_groups.array.base, network.bonds_groups.array.base)
+        self.assertIs(snapshot.adjacency(), adjacency)
+
+    def test_snapshot_has_its_own_cache(self):
+        network = random_network(50, 50, 5, 100, 4.0, 1.0, 0, 2.0, seed=3)
+        adjacency = network.adjacency()
+        snapshot = network.snapshot()
+        snapshot.invalidate_caches()
+        self.assertIs(network.adjacency(), adjacency)
+        self.assertIsNot(snapshot.adjacency(), adjacency)
+        snapshot.incidence()
+        self.assertNotIn(("incidence", None), network._cache)
+
+    def test_snapshot_can_not_change_the_parent(self):
+        network = single_strand(200, 200, 100, 100, 0, 5, 4)
+        network.details_of_bondtypes["polymer"] = {"r0": 1.0, "k": 1.0}
+        positions = network.positions_array()
+        snapshot = network.snapshot()
+
+        with self.assertRaises(ValueError):
+            snapshot.beads_positions[2][0] += 1.0
+        with self.assertRaises(ValueError):
+            np.asarray(snapshot.beads_positions)[0, 0] = 5.0
+        snapshot.beads_positions[1] = (3.0, 4.0)
+        snapshot.beads_positions[2, 0] = 5.0
+        snapshot.beads_types[0] = "boundary"
+        snapshot.bonds_groups.append((0, 4))
+        snapshot.bonds_types += ["cross"]
+        snapshot.details_of_bondtypes["polymer"]["k"] = 2.0
+        snapshot.domain.sizex = 100
+        snapshot.extend(bonds_groups=[(1, 4)], bonds_types=["cross"])
+
+        np.testing.assert_array_equal(network.positions_array(), positions)
+        self.assertEqual(network.beads_types, ["free"] * 5)
+        self.assertEqual(len(network.bonds_groups), 4)
+        self.assertEqual(snapshot.beads_types, ["boundary"] + ["free"] * 4)
+        self.assertEqual(snapshot.bonds_groups[4:], [(0, 4), (1, 4)])
+        self.assertEqual(network.details_of_bondtypes["polymer"]["k"], 1.0)
+        self.assertEqual(network.domain.sizex, 200)
+
+    def test_crosslinking_snapshots(self):
+        network = random_network(50, 50, 5, 300, 4.0, 1.0, 0, 2.0, seed=3)
+        positions = network.positions_array()
+        bonds = network.bonds_array()
+        par = StrandDensityCrosslinkDistributerParameters(1.0, 100, 5, 300, 2.0)
+
+        branches = []
+        for crosslinker in (
+            StrandDensityCrosslinkDistributer(par, seed=1),
+            StrandDensityCrosslinkDistributerFast(par, seed=1),
+        ):
+            branch = network.snapshot()
+            crosslinker.distribute_crosslinkers(branch)
+            crosslinker.add_crosslink_angles(branch)
+            branches.append(branch)
+
+        np.testing.assert_array_equal(network.positions_array(), positions)
+        np.testing.assert_array_equal(network.bonds_array(), bonds)
+        self.assertEqual(set(network.bonds_types), {"polymer"})
+        self.assertNotIn("cross_1", network.details_of_bondtypes)
+        for branch in branches:
+            self.assertGreater(len(branch.bonds_groups), len(bonds))
+
+    def test_extend(self):
+        network = single_strand(200, 200, 100, 100, 0, 5, 4)
+        snapshot = network.snapshot()
+        network.extend(bonds_groups=[(0, 4)], bonds_types=["cross"])
+        self.assertEqual(len(network.bonds_groups), 5)
+        self.assertEqual(len(snapshot.bonds_groups), 4)
+
+
+class TestPickle(unittest.TestCase):
+    def assertSameNetwork(self, copy, network):
+        np.testing.assert_array_equal(copy.positions_array(), network.positions_array())
+        np.testing.assert_array_equal(copy.bonds_array(), network.bonds_array())
+        np.testing.assert_array_equal(copy.angles_array(), network.angles_array())
+        self.assertEqual(copy.beads_types, network.beads_types)
+        self.assertEqual(copy.bonds_types, network.bonds_types)
+        self.assertEqual(copy.angle_types, network.angle_types)
+        self.assertEqual(copy.beads_fibers, network.beads_fibers)
+        self.assertEqual(copy.details_of_bondtypes, network.details_of_bondtypes)
+        self.assertEqual(copy.domain, network.domain)
+
+    def test_round_trip(self):
+        network = random_network(50, 50, 5, 100, 4.0, 1.0, 50, 2.0, seed=3)
+        network.adjacency()
+        copy = pickle.loads(pickle.dumps(network))
+        self.assertSameNetwork(copy, network)
+        self.assertEqual(copy._cache, {})
+
+    def test_out_of_band_buffers(self):
+        network = random_network(50, 50, 5, 100, 4.0, 1.0, 50, 2.0, seed=3)
+        buffers = []
+        data = pickle.dumps(network, protocol=5, buffer_callback=buffers.append)
+        self.assertGreaterEqual(len(buffers), 3)
+        self.assertLess(len(data), network.positions_array().nbytes)
+        # the buffers are the arrays of the network itself, not copies
+        views = [np.asarray(buffer.raw()) for buffer in buffers]
+        for field in (network.beads_positions, network.bonds_groups, network.beads_types):
+            array = field.codes if field is network.beads_types else field.array
+            self.assertTrue(any(np.shares_memory(view, array) for view in views))
+
+        copy = pickle.loads(data, buffers=buffers)
+        self.assertSameNetwork(copy, network)
+        self.assertEqual(copy.beads_types.codes.dtype, np.uint8)
+        self.assertEqual(copy.bonds_groups.dtype, network.dtypes.index)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,105 @@
+from ecmgen.network import Network
+from ecmgen.percolation import PercolationTracker, percolation_threshold
+from ecmgen.strandgens import RandomStrandGenerator, boundary_sides
+from ecmgen.stranddistributions import UniformStrandDistribution
+from ecmgen.density_crosslinker import StrandDensityCrosslinkDistributer
+from ecmgen.parameters import (
+    DomainParameters,
+    RandomStrandGeneratorParameters,
+    StrandDensityCrosslinkDistributerParameters,
+)
+from scipy.sparse.csgraph import connected_components
+
+import contextlib
+import io
+import unittest
+import numpy as np
+
+
+def two_strands():
+    # west strand from x = -1 to 5 and east strand from x = 4 to 11, both at y = 5
+    network = Network(DomainParameters(10, 10))
+    network.append_fibers([4, 4])
+    network.extend(
+        beads_positions=[(-1, 5), (1, 5), (3, 5), (5, 5), (4, 5), (6, 5), (8, 5), (11, 5)],
+        beads_types=["free"] * 8,
+        bonds_groups=[(0, 1), (1, 2), (2, 3), (4, 5), (5, 6), (6, 7)],
+        bonds_types=["polymer"] * 6,
+    )
+    return network
+
+
+def spans(network):
+    # reference implementation: sides touched by every connected component
+    _, labels = connected_components(network.adjacency(), directed=False)
+    sides = boundary_sides(network.positions_array(), network.domain)
+    touched = {side: set(labels[beyond]) for side, beyond in sides.items()}
+    return bool(touched["north"] & touched["south"] or touched["east"] & touched["west"])
+
+
+class TestPercolationTracker(unittest.TestCase):
+    def test_two_strands(self):
+        tracker = PercolationTracker(two_strands())
+        self.assertEqual(tracker.sides(1), {"west"})
+        self.assertEqual(tracker.sides(6), {"east"})
+        self.assertFalse(tracker.add_crosslink(0, 2))
+        self.assertTrue(tracker.add_crosslink(3, 4))
+        self.assertEqual(tracker.sides(1), {"east", "west"})
+        self.assertEqual(tracker.spanned_at, 2)
+        self.assertTrue(tracker.add_crosslink(1, 5))
+        self.assertEqual(tracker.spanned_at, 2)
+
+    def test_spanning_without_crosslinks(self):
+        network = two_strands()
+        network.extend(bonds_groups=[(3, 4)], bonds_types=["cross"])
+        self.assertEqual(percolation_threshold(network, []), 0)
+
+    def test_never_spanning(self):
+        self.assertIsNone(percolation_threshold(two_strands(), [(0, 1), (5, 6)]))
+
+
+class TestPercolationWhileCrosslinking(unittest.TestCase):
+    def setUp(self):
+        self.network = Network(DomainParameters(50, 50))
+        RandomStrandGenerator(
+            RandomStrandGeneratorParameters(9, 150, 20),
+            UniformStrandDistribution(50, 50, 1),
+        ).build_strands(self.network)
+        self.par = StrandDensityCrosslinkDistributerParameters(1.0, 2000, 9, 150, 1.0)
+
+    def test_threshold_is_first_spanning_count(self):
+        crosslinker = StrandDensityCrosslinkDistributer(self.par, seed=3)
+        network = self.network.snapshot()
+        crosslinker.distribute_crosslinkers(network, track_percolation=True)
+        threshold = crosslinker.percolation_threshold
+        self.assertIsNotNone(threshold)
+
+        bonds = len(self.network.bonds_groups)
+        crosslinks = network.bonds_groups[bonds:]
+        self.assertGreater(len(crosslinks), threshold)
+        for count, expected in ((threshold - 1, False), (threshold, True)):
+            prefix = self.network.snapshot()
+            prefix.extend(bonds_groups=crosslinks[:count], bonds_types=["cross"] * count)
+            self.assertEqual(spans(prefix), expected)
+
+    def test_stop_at_percolation(self):
+        tracked = StrandDensityCrosslinkDistributer(self.par, seed=3)
+        tracked.distribute_crosslinkers(self.network.snapshot(), track_percolation=True)
+
+        crosslinker = StrandDensityCrosslinkDistributer(self.par, seed=3)
+        network = self.network.snapshot()
+        crosslinker.distribute_crosslinkers(network, stop_at_percolation=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            crosslinker.add_crosslink_angles(network)
+
+        self.assertEqual(crosslinker.percolation_threshold, tracked.percolation_threshold)
+        self.assertEqual(
+            len(network.bonds_groups) - len(self.network.bonds_groups),
+            crosslinker.percolation_threshold,
+        )
+        self.assertTrue(spans(network))
+        self.assertTrue(network.validate().ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
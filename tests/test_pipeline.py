@@ -0,0 +1,83 @@
+from ecmgen.pipeline import NetworkPipeline
+from ecmgen.networktype import NetworkType
+from ecmgen.networks import laminin
+from ecmgen.strandgens import RandomStrandGenerator
+from ecmgen.stranddistributions import UniformStrandDistribution
+from ecmgen.density_crosslinker import (
+    StrandDensityCrosslinkDistributer,
+    StrandDensityCrosslinkDistributerFast,
+)
+from ecmgen.parameters import (
+    DomainParameters,
+    RandomStrandGeneratorParameters,
+    StrandDensityCrosslinkDistributerParameters,
+)
+import contextlib
+import io
+import unittest
+
+import numpy as np
+
+DOMAIN = DomainParameters(60, 60, fix_boundary=True)
+
+
+def generator():
+    return RandomStrandGenerator(
+        RandomStrandGeneratorParameters(9, 300, 8.0), UniformStrandDistribution(60, 60, 1)
+    )
+
+
+def crosslink_par(number, max_r=1.0):
+    return StrandDensityCrosslinkDistributerParameters(max_r, number, 9, 300, 2.0)
+
+
+class TestNetworkPipeline(unittest.TestCase):
+    def test_same_networks_as_network_type(self):
+        pipeline = NetworkPipeline(DOMAIN, generator())
+        with contextlib.redirect_stdout(io.StringIO()):
+            for crosslinker in (StrandDensityCrosslinkDistributer, StrandDensityCrosslinkDistributerFast):
+                for number, max_r in ((50, 1.0), (150, 1.0), (150, 1.5)):
+                    expected = NetworkType(
+                        DOMAIN, generator(), crosslinker(crosslink_par(number, max_r), seed=2)
+                    ).generate()
+                    network = pipeline.generate(crosslinker(crosslink_par(number, max_r), seed=2))
+
+                    np.testing.assert_array_equal(network.bonds_array(), expected.bonds_array())
+                    self.assertEqual(network.bonds_types, expected.bonds_types)
+                    self.assertEqual(network.beads_types, expected.beads_types)
+
+    def test_stages_are_reused(self):
+        pipeline = NetworkPipeline(DOMAIN, generator())
+        strands = pipeline.strands()
+        boundaries = pipeline.boundaries()
+        number_of_bonds = len(boundaries.bonds_groups)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            network = pipeline.generate(StrandDensityCrosslinkDistributer(crosslink_par(100), seed=2))
+        laminin(60, 60, 100, network, seed=1, x_dist_spread=30.0)
+
+        self.assertIs(pipeline.strands(), strands)
+        self.assertIs(pipeline.boundaries(), boundaries)
+        self.assertEqual(len(boundaries.bonds_groups), number_of_bonds)
+        self.assertEqual(len(boundaries.beads_positions), 300 * 9)
+
+        pipeline.domain = DomainParameters(60, 60)
+        self.assertEqual(pipeline.boundaries().beads_types.count("boundary"), 0)
+
+    def test_stages_depend_on_domain_and_generator(self):
+        pipeline = NetworkPipeline(DOMAIN, generator())
+        strands = pipeline.strands()
+
+        # strand generators read the domain, e.g. for their boundary beads
+        pipeline.domain = DomainParameters(80, 60, fix_boundary=True)
+        self.assertIsNot(pipeline.strands(), strands)
+        strands = pipeline.strands()
+        self.assertEqual(strands.domain.sizex, 80)
+
+        # a different generator with the same parameters
+        pipeline.strand_generator = generator()
+        self.assertIsNot(pipeline.strands(), strands)
+
+
+if __name__ == "__main__":
+    unittest.main()
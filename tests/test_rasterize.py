@@ -0,0 +1,68 @@
+from ecmgen.networks import single_strand, random_network
+from ecmgen.rasterize import rasterize_network, save_fields
+from ecmgen import analysis
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+
+class TestRasterize(unittest.TestCase):
+    def test_density_conserves_length(self):
+        network = single_strand(20, 20, 15.2, 10.5, 0.0, 9, 8)
+        fields = rasterize_network(network, shape=(40, 40), layers=["density"])
+        density = fields["density"]
+        self.assertEqual(density.shape, (40, 40))
+        self.assertAlmostEqual(float(density.sum()) * 0.25, 8.0, places=4)
+        # all mass is in the row containing y = 10.5
+        self.assertAlmostEqual(float(density[21].sum()) * 0.25, 8.0, places=4)
+
+    def test_chunks_split_long_bonds(self):
+        # a single bond sampled 1600 times, rasterized in chunks of 7 samples
+        network = single_strand(20, 20, 10, 10, 0.4, 2, 18)
+        whole = rasterize_network(network, shape=(400, 400), layers=["density", "order"])
+        chunked = rasterize_network(
+            network, shape=(400, 400), layers=["density", "order"], chunk_size=7
+        )
+        np.testing.assert_allclose(chunked["density"], whole["density"], rtol=1e-6)
+        np.testing.assert_allclose(chunked["order"], whole["order"], rtol=1e-6)
+        self.assertGreater(np.count_nonzero(whole["density"]), 100)
+
+    def test_orientation_of_straight_strand(self):
+        network = single_strand(20, 20, 15, 10, 0.3, 9, 8)
+        fields = rasterize_network(network, pixel_size=2.0, layers=["orientation", "order"])
+        filled = ~np.isnan(fields["orientation"])
+        self.assertTrue(filled.any())
+        np.testing.assert_allclose(fields["orientation"][filled], 0.3, rtol=1e-5)
+        np.testing.assert_allclose(fields["order"][filled], 1.0, rtol=1e-5)
+
+    def test_crosslinks_and_save(self):
+        network = random_network(
+            sizex=50,
+            sizey=50,
+            number_of_beads_per_strand=9,
+            number_of_strands=100,
+            contour_length_of_strand=20,
+            crosslink_max_r=1.0,
+            maximal_number_of_initial_crosslinks=50,
+            crosslink_bin_size=1.0,
+            seed=10,
+        )
+        fields = rasterize_network(network, shape=(64, 64), chunk_size=100)
+        pos = network.positions_array()
+        bonds = network.bonds_array()[analysis.crosslink_mask(network)]
+        mid = 0.5 * (pos[bonds[:, 0]] + pos[bonds[:, 1]])
+        number = np.count_nonzero(np.all((mid >= 0) & (mid < 50), axis=1))
+        pixel_area = (50 / 64) ** 2
+        self.assertAlmostEqual(float(fields["crosslinks"].sum()) * pixel_area, number, places=3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fields.npz")
+            save_fields(path, fields)
+            loaded = np.load(path)
+            np.testing.assert_array_equal(loaded["density"], fields["density"])
+
+
+if __name__ == "__main__":
+    unittest.main()
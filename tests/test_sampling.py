@@ -0,0 +1,111 @@
+from ecmgen.sampling import AliasTable, WeightedReservoir, ProbabilityMap, gumbel_top_k
+from ecmgen.parameters import DomainParameters
+
+import unittest
+import numpy as np
+
+
+class TestAliasTable(unittest.TestCase):
+    def _table_probabilities(self, table, n):
+        return table.prob / n + np.bincount(
+            table.alias, weights=(1 - table.prob) / n, minlength=n
+        )
+
+    def test_table_is_exact(self):
+        rng = np.random.default_rng(1)
+        for weights in [
+            rng.random(1000),
+            rng.random(1000) ** 8,
+            np.r_[1000.0, np.full(999, 1e-3)],
+            np.r_[np.zeros(20), 1.0, np.zeros(20)],
+        ]:
+            table = AliasTable(weights)
+            np.testing.assert_allclose(
+                self._table_probabilities(table, len(weights)),
+                weights / weights.sum(),
+                atol=1e-12,
+            )
+
+    def test_sample_frequencies(self):
+        weights = np.array([[1.0, 0.0], [3.0, 6.0]])
+        table = AliasTable(weights, np.random.default_rng(2))
+        counts = np.bincount(table.sample(100_000), minlength=4) / 100_000
+        np.testing.assert_allclose(counts, weights.ravel() / 10, atol=0.01)
+
+    def test_invalid_weights(self):
+        with self.assertRaises(ValueError):
+            AliasTable([0.0, 0.0])
+        with self.assertRaises(ValueError):
+            AliasTable([1.0, -1.0])
+
+
+class TestGumbelTopK(unittest.TestCase):
+    def test_distinct_and_positive(self):
+        rng = np.random.default_rng(3)
+        drawn = gumbel_top_k([0.0, 1.0, 2.0, 0.0, 5.0], 10, rng)
+        self.assertEqual(sorted(drawn.tolist()), [1, 2, 4])
+
+    def test_first_draw_frequencies(self):
+        rng = np.random.default_rng(4)
+        weights = np.array([1.0, 2.0, 7.0])
+        first = [gumbel_top_k(weights, 1, rng)[0] for _ in range(20_000)]
+        np.testing.assert_allclose(
+            np.bincount(first, minlength=3) / 20_000, weights / 10, atol=0.015
+        )
+
+
+class TestWeightedReservoir(unittest.TestCase):
+    def test_exact_size_and_distinct(self):
+        reservoir = WeightedReservoir(50, np.random.default_rng(5))
+        for start in range(0, 1000, 7):
+            items = np.arange(start, min(start + 7, 1000))
+            reservoir.offer(items, weights=(items % 3).astype(float))
+        drawn = reservoir.result()
+        self.assertEqual(len(drawn), 50)
+        self.assertEqual(len(np.unique(drawn)), 50)
+        self.assertTrue(np.all(drawn % 3 > 0))
+
+    def test_fewer_items_than_k(self):
+        reservoir = WeightedReservoir(10, np.random.default_rng(6))
+        reservoir.offer(np.array([[0, 1], [2, 3], [4, 5]]), weights=[1.0, 0.0, 2.0])
+        self.assertEqual(sorted(map(tuple, reservoir.result())), [(0, 1), (4, 5)])
+
+    def test_first_draw_frequencies(self):
+        rng = np.random.default_rng(7)
+        weights = np.array([1.0, 2.0, 7.0])
+        first = []
+        for _ in range(20_000):
+            reservoir = WeightedReservoir(2, rng)
+            reservoir.offer(np.arange(2), weights[:2])
+            reservoir.offer(np.arange(2, 3), weights[2:])
+            first.append(reservoir.result()[0])
+        np.testing.assert_allclose(
+            np.bincount(first, minlength=3) / 20_000, weights / 10, atol=0.015
+        )
+
+
+class TestProbabilityMap(unittest.TestCase):
+    domain = DomainParameters(40, 20)
+
+    def test_array(self):
+        # 2 rows (y) and 4 columns (x) of 10 x 10 pixels
+        values = np.arange(8.0).reshape(2, 4)
+        points = [(5, 5), (35, 5), (15, 15), (-3, 25), (100, -1)]
+        np.testing.assert_array_equal(ProbabilityMap(values)(points, self.domain), [0, 3, 5, 4, 3])
+
+    def test_callable(self):
+        gradient = ProbabilityMap(lambda x, y: x / 40)
+        np.testing.assert_allclose(gradient([(10, 3), (30, 7)], self.domain), [0.25, 0.75])
+        self.assertEqual(ProbabilityMap(lambda x, y: 1.0)([(1, 1), (2, 2)], self.domain).tolist(), [1, 1])
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValueError):
+            ProbabilityMap(np.array([[1.0, -1.0]]))
+        with self.assertRaises(ValueError):
+            ProbabilityMap(np.ones(3))
+        with self.assertRaises(ValueError):
+            ProbabilityMap(lambda x, y: -x)([(1, 1)], self.domain)
+
+
+if __name__ == "__main__":
+    unittest.main()
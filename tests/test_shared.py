@@ -0,0 +1,46 @@
+from ecmgen.shared import share_network, attach_network
+from ecmgen.networks import random_network
+import contextlib
+import gc
+import io
+import multiprocessing
+import unittest
+
+import numpy as np
+
+
+def make_shared_network(seed):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return share_network(random_network(50, 50, 5, 100, 4.0, 1.0, 50, 2.0, seed=seed))
+
+
+class TestSharedNetwork(unittest.TestCase):
+    def test_share_and_attach(self):
+        network = random_network(50, 50, 5, 100, 4.0, 1.0, 50, 2.0, seed=3)
+        attached = attach_network(share_network(network))
+
+        np.testing.assert_array_equal(attached.positions_array(), network.positions_array())
+        np.testing.assert_array_equal(attached.bonds_array(), network.bonds_array())
+        self.assertEqual(attached.bonds_types, network.bonds_types)
+        self.assertEqual(attached.beads_fibers, network.beads_fibers)
+        self.assertEqual(attached.details_of_bondtypes, network.details_of_bondtypes)
+
+        # rows outlive the network and the unlinked block
+        row = attached.beads_positions[7]
+        del attached
+        gc.collect()
+        np.testing.assert_array_equal(row, network.beads_positions[7])
+
+    def test_from_worker_process(self):
+        # spawn: forking after numba's parallel kernels have run can hang the interpreter
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            handle = pool.apply(make_shared_network, (4,))
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = random_network(50, 50, 5, 100, 4.0, 1.0, 50, 2.0, seed=4)
+        network = attach_network(handle)
+        np.testing.assert_array_equal(network.positions_array(), expected.positions_array())
+        self.assertEqual(network.angle_types, expected.angle_types)
+
+
+if __name__ == "__main__":
+    unittest.main()
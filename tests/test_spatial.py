@@ -0,0 +1,66 @@
+from ecmgen.networks import random_network, single_strand, laminin
+import unittest
+
+import numpy as np
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def setUp(self):
+        self.network = random_network(40, 40, 5, 150, 4.0, 1.0, 50, 2.0, seed=5)
+        self.pos = self.network.positions_array()
+
+    def test_beads_within_and_in_box(self):
+        index = self.network.spatial_index()
+        d = np.linalg.norm(self.pos - [20, 15], axis=1)
+        np.testing.assert_array_equal(index.beads_within((20, 15), 3.0), np.flatnonzero(d <= 3.0))
+
+        x, y = self.pos[:, 0], self.pos[:, 1]
+        inside = (x >= 5) & (x < 25) & (y >= 10) & (y < 14)
+        np.testing.assert_array_equal(index.beads_in_box(5, 10, 25, 14), np.flatnonzero(inside))
+
+    def test_pairs_within(self):
+        pairs = self.network.spatial_index().pairs_within(0.5)
+        d = np.linalg.norm(self.pos[:, None] - self.pos[None], axis=2)
+        i, j = np.nonzero(np.triu(d <= 0.5, k=1))
+        np.testing.assert_array_equal(pairs, np.column_stack([i, j]))
+
+    def test_nearest_bond(self):
+        points = np.random.default_rng(0).uniform(0, 40, size=(50, 2))
+        bonds, distance = self.network.spatial_index().nearest_bond(points)
+
+        P = self.pos[self.network.bonds_array()[:, 0]]
+        v = self.pos[self.network.bonds_array()[:, 1]] - P
+        t = np.clip(
+            np.einsum("kbi,bi->kb", points[:, None] - P[None], v) / (v * v).sum(axis=1), 0, 1
+        )
+        brute = np.linalg.norm(points[:, None] - (P[None] + t[..., None] * v[None]), axis=2)
+        np.testing.assert_allclose(distance, brute.min(axis=1))
+        np.testing.assert_allclose(brute[np.arange(50), bonds], distance)
+
+    def test_cache(self):
+        index = self.network.spatial_index()
+        self.assertIs(index, self.network.spatial_index())
+        self.network.set_positions(self.pos + 1.0)
+        self.assertIsNot(index, self.network.spatial_index())
+
+
+class TestLamininSites(unittest.TestCase):
+    def test_laminin_connects_beads_in_site_pixels(self):
+        network = single_strand(20, 20, 10.5, 0.5, np.pi / 2, 20, 19)
+        number_of_beads = len(network.beads_positions)
+        laminin(20, 20, 30, network, seed=1, x_dist_spread=0.1, y_dist_spread=0.0)
+
+        laminin_bonds = [
+            bond for bond, typ in zip(network.bonds_groups, network.bonds_types) if typ == "laminin"
+        ]
+        self.assertGreater(len(laminin_bonds), 0)
+        self.assertEqual(len(network.beads_positions), number_of_beads + len(laminin_bonds))
+        self.assertTrue(np.all(network.fiber_ids()[number_of_beads:] == -1))
+        for bead, anchor in laminin_bonds:
+            np.testing.assert_array_equal(
+                network.beads_positions[bead], network.beads_positions[anchor]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+from ecmgen.storage import RowArray, CategoryArray
+
+import pickle
+import unittest
+import numpy as np
+
+
+class TestRowArray(unittest.TestCase):
+    def test_conversion_and_access(self):
+        rows = RowArray.of([(0, 1), [1, 2], np.array([2, 3])], np.uint32, 2)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows.array.dtype, np.uint32)
+        self.assertEqual(list(rows[1]), [1, 2])
+        self.assertEqual(rows, [(0, 1), (1, 2), (2, 3)])
+        self.assertIs(np.asarray(rows), rows.array)
+        self.assertEqual(RowArray.of([], np.float64, 2).array.shape, (0, 2))
+
+    def test_concatenation_keeps_the_original(self):
+        first = RowArray.of([(0, 1)], np.int64, 2)
+        second = first + [(1, 2)]
+        third = second + [(2, 3)]
+        # 'second' was at the end of the buffer, so 'third' appended in place
+        self.assertIs(third._buffer, second._buffer)
+        branch = second + [(5, 6)]
+        self.assertIsNot(branch._buffer, second._buffer)
+        self.assertEqual(first, [(0, 1)])
+        self.assertEqual(second, [(0, 1), (1, 2)])
+        self.assertEqual(third, [(0, 1), (1, 2), (2, 3)])
+        self.assertEqual(branch, [(0, 1), (1, 2), (5, 6)])
+
+    def test_rows_are_read_only(self):
+        rows = RowArray.of([(0.0, 1.0)], np.float64, 2)
+        with self.assertRaises(ValueError):
+            rows[0][0] += 1
+        with self.assertRaises(ValueError):
+            rows.array[0, 0] = 1
+
+    def test_changes_in_place(self):
+        rows = RowArray.of([(0, 1)], np.int64, 2)
+        rows.append((1, 2))
+        rows.extend([(2, 3), (3, 4)])
+        rows += [(4, 5)]
+        rows[0] = (9, 9)
+        rows[1, 0] = 7
+        self.assertEqual(rows, [(9, 9), (7, 2), (2, 3), (3, 4), (4, 5)])
+
+    def test_copy_on_write(self):
+        rows = RowArray.of([(0, 1), (1, 2)], np.int64, 2)
+        longer = rows + [(2, 3)]
+        copy = rows.copy()
+        self.assertIs(copy._buffer, rows._buffer)
+        stamp = rows.stamp
+        rows[0] = (5, 5)
+        copy.append((7, 8))
+        self.assertNotEqual(rows.stamp, stamp)
+        self.assertEqual(rows, [(5, 5), (1, 2)])
+        self.assertEqual(longer, [(0, 1), (1, 2), (2, 3)])
+        self.assertEqual(copy, [(0, 1), (1, 2), (7, 8)])
+
+    def test_pickle(self):
+        rows = RowArray.of([1, 2, 3], np.int32)
+        self.assertEqual(pickle.loads(pickle.dumps(rows)), [1, 2, 3])
+
+
+class TestCategoryArray(unittest.TestCase):
+    def test_behaves_like_a_list_of_names(self):
+        types = CategoryArray.of(["free", "boundary", "free"])
+        self.assertEqual(types, ["free", "boundary", "free"])
+        self.assertEqual(types[1], "boundary")
+        self.assertEqual(types.count("free"), 2)
+        self.assertIn("boundary", types)
+        self.assertNotIn("laminin", types)
+        self.assertEqual(types.codes.dtype, np.uint8)
+        self.assertEqual(np.array(types, dtype=str).tolist(), ["free", "boundary", "free"])
+
+    def test_concatenation(self):
+        types = CategoryArray.of(["polymer"] * 3)
+        more = types + ["cross_1", "polymer"]
+        merged = CategoryArray.of(["laminin"]) + more
+        self.assertEqual(types, ["polymer"] * 3)
+        self.assertEqual(more, ["polymer"] * 3 + ["cross_1", "polymer"])
+        self.assertEqual(merged, ["laminin"] + ["polymer"] * 3 + ["cross_1", "polymer"])
+        self.assertEqual(more[3:], ["cross_1", "polymer"])
+
+    def test_changes_in_place(self):
+        types = CategoryArray.of(["free"] * 4)
+        copy = types.copy()
+        types[1] = "boundary"
+        types[np.array([False, False, True, True])] = "laminin"
+        types.append("free")
+        types += ["cross"]
+        self.assertEqual(types, ["free", "boundary", "laminin", "laminin", "free", "cross"])
+        self.assertEqual(copy, ["free"] * 4)
+
+    def test_many_names(self):
+        names = [f"cross_{k}" for k in range(300)]
+        types = CategoryArray.of(names[:200]) + names[200:]
+        self.assertEqual(types, names)
+        self.assertEqual(types.codes.dtype, np.uint16)
+
+
+if __name__ == "__main__":
+    unittest.main()
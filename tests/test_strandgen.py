@@ -1,11 +1,28 @@
 from ecmgen.network import Network
-from ecmgen.strandgens import RandomStrandGenerator
-from ecmgen.parameters import DomainParameters, RandomStrandGeneratorParameters
+from ecmgen.strandgens import RandomStrandGenerator, SemiflexibleStrandGenerator
+from ecmgen.parameters import (
+    DomainParameters,
+    RandomStrandGeneratorParameters,
+    DtypePolicy,
+    SINGLE_PRECISION,
+    SemiflexibleStrandGeneratorParameters,
+    ExcludedVolumeParameters,
+)
+from ecmgen.placement import ExcludedVolumePlacement
+from scipy.spatial import cKDTree
+from ecmgen.networks import fibrin_network
 from ecmgen.stranddistributions import (
     UniformStrandDistribution,
+    VonMisesStrandDistribution,
     StrandDistributionGeneral,
+    DensityMapStrandDistribution,
+    JointStrandDistribution,
+    BufferedStrandDistribution,
+    DeterministicStrandDistribution,
 )
 from ecmgen.crosslink_distributors import TipToTailCrosslinkDistributer
+import gc
+import tracemalloc
 import unittest
 
 from numpy.random import default_rng
@@ -30,6 +47,15 @@ class TestStringMethods(unittest.TestCase):
         self.assertEqual(len(network.angle_groups), 200 * 7)
         self.assertEqual(len(network.angle_types), 200 * 7)
 
+    def test_seed_zero_is_reproducible(self):
+        # ensembles of the batch CLI start at seed 0
+        for make in (
+            lambda: UniformStrandDistribution(100, 100, 0),
+            lambda: VonMisesStrandDistribution(100, 100, 0.0, 1.0, 0),
+        ):
+            first, second = make(), make()
+            np.testing.assert_array_equal(first.sample(20), second.sample(20))
+
     def test_lenghtOfSingleStrand(self):
         rng = default_rng(1)
         network = Network(DomainParameters(200, 200))
@@ -158,5 +184,249 @@ class TestStringMethods(unittest.TestCase):
             self.assertEqual(pos[i, 1], 2.0 + j*0.0)
 
 
+class TestDtypePolicy(unittest.TestCase):
+    def test_singlePrecisionStrands(self):
+        network = Network(DomainParameters(200, 200), dtypes=SINGLE_PRECISION)
+        strand_par = RandomStrandGeneratorParameters(9, 20, 6.25)
+        rsg = RandomStrandGenerator(
+            strand_par,
+            UniformStrandDistribution(network.domain.sizex, network.domain.sizey, 1),
+        )
+        rsg.build_strands(network)
+
+        self.assertEqual(network.beads_positions[0].dtype, np.float32)
+        self.assertEqual(network.bonds_groups[0].dtype, np.uint32)
+        self.assertEqual(network.angle_groups[0].dtype, np.uint32)
+        self.assertEqual(network.positions_array().dtype, np.float32)
+        self.assertEqual(network.bonds_array().shape, (20 * 8, 2))
+
+    def test_indicesMustFit(self):
+        network = Network(DomainParameters(200, 200), dtypes=DtypePolicy(index=np.uint8))
+        strand_par = RandomStrandGeneratorParameters(9, 30, 6.25)
+        rsg = RandomStrandGenerator(
+            strand_par,
+            UniformStrandDistribution(network.domain.sizex, network.domain.sizey, 1),
+        )
+        with self.assertRaises(OverflowError):
+            rsg.build_strands(network)
+
+    def test_singlePrecisionCrosslinks(self):
+        network = fibrin_network(
+            sizex=50,
+            sizey=50,
+            number_of_beads_per_strand=9,
+            number_of_strands=100,
+            direction_spread=1.0,
+            direction_angle=0.0,
+            contour_length_of_strand=20,
+            crosslink_max_r=1.0,
+            maximal_number_of_initial_crosslinks=50,
+            crosslink_bin_size=1.0,
+            seed=3,
+            dtypes=SINGLE_PRECISION,
+        )
+        self.assertEqual(network.bonds_array().dtype, np.uint32)
+        self.assertTrue(all(bond.dtype == np.uint32 for bond in network.bonds_groups))
+
+    def _memory(self, dtypes):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            network = Network(DomainParameters(500, 500), dtypes=dtypes)
+            generator = RandomStrandGenerator(
+                RandomStrandGeneratorParameters(10, 5000, 20.0),
+                UniformStrandDistribution(500, 500, 1),
+            )
+            generator.build_strands(network)
+            generator.fix_boundaries(network)
+            del generator
+            gc.collect()
+            return tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+    def test_singlePrecisionHalvesMemory(self):
+        double = self._memory(DtypePolicy())
+        single = self._memory(SINGLE_PRECISION)
+        # contiguous storage: no per-bead Python objects (this used to be over 400 bytes per bead)
+        self.assertLess(double / 50_000, 100)
+        self.assertLess(single / double, 0.6)
+
+
+class TestSemiflexibleStrands(unittest.TestCase):
+    def _build(self, persistence_length, number_of_strands=2000, beads=21):
+        network = Network(DomainParameters(200, 200))
+        SemiflexibleStrandGenerator(
+            SemiflexibleStrandGeneratorParameters(beads, number_of_strands, 20.0, persistence_length),
+            UniformStrandDistribution(200, 200, 1),
+            seed=2,
+        ).build_strands(network)
+        return network
+
+    def test_topology_and_bond_lengths(self):
+        network = self._build(10.0, number_of_strands=5)
+        self.assertEqual(len(network.beads_positions), 5 * 21)
+        self.assertEqual(len(network.bonds_groups), 5 * 20)
+        self.assertEqual(len(network.angle_groups), 5 * 19)
+        pos = network.positions_array()
+        bonds = network.bonds_array()
+        lengths = np.linalg.norm(pos[bonds[:, 0]] - pos[bonds[:, 1]], axis=1)
+        np.testing.assert_allclose(lengths, 1.0)
+
+    def test_tangent_correlation(self):
+        persistence_length = 10.0
+        pos = self._build(persistence_length).positions_array().reshape(2000, 21, 2)
+        tangents = np.diff(pos, axis=1)
+        correlation = np.mean(np.sum(tangents[:, 0] * tangents[:, 10], axis=1))
+        # 2-D worm-like chain
+        self.assertAlmostEqual(correlation, np.exp(-10 / (2 * persistence_length)), delta=0.05)
+
+    def test_stiff_limit_is_straight(self):
+        pos = self._build(1e12, number_of_strands=3).positions_array().reshape(3, 21, 2)
+        tangents = np.diff(pos, axis=1)
+        np.testing.assert_allclose(tangents, np.repeat(tangents[:, :1], 20, axis=1), atol=1e-4)
+
+
+class TestExcludedVolume(unittest.TestCase):
+    def _generator(self, number_of_strands, min_distance, max_attempts=100):
+        return RandomStrandGenerator(
+            RandomStrandGeneratorParameters(11, number_of_strands, 10),
+            UniformStrandDistribution(100, 100, 1),
+            placement=ExcludedVolumePlacement(
+                ExcludedVolumeParameters(
+                    min_distance, batch_size=64, max_attempts=max_attempts
+                )
+            ),
+        )
+
+    def test_no_overlaps(self):
+        network = Network(DomainParameters(100, 100))
+        self._generator(300, 1.0).build_strands(network)
+
+        pos = network.positions_array()
+        self.assertEqual(len(pos), 300 * 11)
+        pairs = cKDTree(pos).query_pairs(0.999, output_type="ndarray")
+        self.assertFalse(np.any(pairs[:, 0] // 11 != pairs[:, 1] // 11))
+
+    def test_too_dense(self):
+        network = Network(DomainParameters(100, 100))
+        with self.assertRaises(RuntimeError):
+            self._generator(2000, 2.0, max_attempts=5).build_strands(network)
+
+
+class TestDensityMapDistribution(unittest.TestCase):
+    # 2 rows (y) and 4 columns (x) of 25 x 25 pixels on a 100 x 50 domain
+    density = np.array([[0.0, 1.0, 0.0, 3.0], [0.0, 0.0, 0.0, 0.0]])
+
+    def test_centers_follow_the_density(self):
+        dist = DensityMapStrandDistribution(self.density, 100, 50, seed=1)
+        n = 40000
+        x, y, angle = dist.pos_x_dist(n), dist.pos_y_dist(n), dist.angle_dist(n)
+        self.assertTrue(np.all(y < 25))
+        in_second = (x >= 25) & (x < 50)
+        in_fourth = x >= 75
+        self.assertTrue(np.all(in_second | in_fourth))
+        self.assertAlmostEqual(np.mean(in_fourth), 0.75, delta=0.01)
+        # uniform within the pixels
+        self.assertAlmostEqual(np.mean(y), 12.5, delta=0.2)
+        self.assertTrue(np.all((angle >= 0) & (angle < 2 * np.pi)))
+
+    def test_angle_field(self):
+        angles = np.array([[0.0, 0.5, 0.0, 2.0], [0.0, 0.0, 0.0, 0.0]])
+        exact = DensityMapStrandDistribution(self.density, 100, 50, angles, seed=1)
+        n = 20000
+        x, y, angle = exact.pos_x_dist(n), exact.pos_y_dist(n), exact.angle_dist(n)
+        np.testing.assert_array_equal(angle, np.where(x >= 75, 2.0, 0.5))
+
+        noisy = DensityMapStrandDistribution(self.density, 100, 50, angles, kappa=4.0, seed=1)
+        x, y, angle = noisy.pos_x_dist(n), noisy.pos_y_dist(n), noisy.angle_dist(n)
+        deviation = angle - np.where(x >= 75, 2.0, 0.5)
+        self.assertAlmostEqual(np.mean(np.cos(deviation)), 0.8635, delta=0.01)
+
+    def test_generated_strands(self):
+        network = Network(DomainParameters(100, 50))
+        RandomStrandGenerator(
+            RandomStrandGeneratorParameters(5, 500, 4.0),
+            DensityMapStrandDistribution(self.density, 100, 50, seed=2),
+        ).build_strands(network)
+        centers = network.positions_array().reshape(500, 5, 2)[:, 2]
+        self.assertTrue(np.all(centers[:, 1] < 25))
+        self.assertTrue(np.all((centers[:, 0] >= 75) | ((centers[:, 0] >= 25) & (centers[:, 0] < 50))))
+
+
+class TestSampleInterface(unittest.TestCase):
+    def test_default_sample(self):
+        strands = UniformStrandDistribution(100, 50, 3).sample(1000)
+        separate = UniformStrandDistribution(100, 50, 3)
+        self.assertEqual(strands.shape, (1000, 3))
+        np.testing.assert_array_equal(strands[:, 0], separate.pos_x_dist(1000))
+        np.testing.assert_array_equal(strands[:, 1], separate.pos_y_dist(1000))
+        np.testing.assert_array_equal(strands[:, 2], separate.angle_dist(1000))
+
+    def test_generators_use_sample(self):
+        class Diagonal(JointStrandDistribution):
+            # strands on the diagonal, pointing along it
+            def __init__(self):
+                self._rng = default_rng(1)
+
+            def sample(self, n):
+                t = self._rng.uniform(0, 100, size=n)
+                return np.column_stack([t, t, np.full(n, np.pi / 4)])
+
+        for generator in (
+            RandomStrandGenerator(RandomStrandGeneratorParameters(5, 50, 4.0), Diagonal()),
+            SemiflexibleStrandGenerator(
+                SemiflexibleStrandGeneratorParameters(5, 50, 4.0, 1e9), Diagonal(), seed=1
+            ),
+        ):
+            network = Network(DomainParameters(100, 100))
+            generator.build_strands(network)
+            pos = network.positions_array()
+            np.testing.assert_allclose(pos[:, 0], pos[:, 1], atol=1e-3)
+
+        dist = Diagonal()
+        dist.pos_x_dist(10)
+        x, y = dist.pos_x_dist(10), dist.pos_y_dist(10)
+        np.testing.assert_array_equal(x, y)
+        np.testing.assert_array_equal(dist.angle_dist(10), np.pi / 4)
+
+    def test_buffered(self):
+        calls = []
+
+        class Counting(UniformStrandDistribution):
+            def sample(self, n):
+                calls.append(n)
+                return super().sample(n)
+
+        buffered = BufferedStrandDistribution(Counting(100, 50, 3), chunk_size=1000)
+        strands = np.concatenate([buffered.sample(7) for _ in range(300)] + [buffered.sample(2500)])
+        self.assertEqual(calls, [1000, 1000, 1000, 1600])
+        self.assertEqual(strands.shape, (4600, 3))
+        # every drawn strand is handed out once
+        self.assertEqual(len(np.unique(strands[:, 0])), 4600)
+        self.assertTrue(np.all((strands[:, 0] >= 0) & (strands[:, 0] < 100)))
+        self.assertTrue(np.all((strands[:, 1] >= 0) & (strands[:, 1] < 50)))
+
+        network = Network(DomainParameters(100, 50))
+        RandomStrandGenerator(RandomStrandGeneratorParameters(5, 20, 4.0), buffered).build_strands(network)
+        self.assertEqual(len(network.beads_positions), 100)
+
+        with self.assertRaises(ValueError):
+            BufferedStrandDistribution(DeterministicStrandDistribution([1.0], [2.0], [0.0]))
+
+    def test_separate_calls_draw_new_strands(self):
+        for dist in (
+            DensityMapStrandDistribution(np.ones((2, 2)), 100, 50, seed=1),
+            BufferedStrandDistribution(UniformStrandDistribution(100, 50, 3), chunk_size=100),
+        ):
+            first_x = dist.pos_x_dist(10)
+            second_x = dist.pos_x_dist(10)
+            self.assertFalse(np.any(first_x == second_x))
+            # y and angle belong to the strands of the last pos_x_dist call
+            y, angle = dist.pos_y_dist(10), dist.angle_dist(10)
+            self.assertFalse(np.any(dist.pos_y_dist(10) == y))
+            self.assertFalse(np.any(dist.angle_dist(10) == angle))
+
+
 if __name__ == "__main__":
     unittest.main()